@@ -15,9 +15,12 @@
 # WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
 
 import gettext
+from globalconf import conf, LATENCYBUCKETS
+from latency import CONNECTSTAGES
+from html import escape
 from version import VERSION
+from pixmapcache import get_pixmap
 from PyQt5.QtWidgets import QPushButton, QDesktopWidget, QDialog, QLabel, QGridLayout
-from PyQt5.QtGui import QImage, QPixmap 
 from PyQt5.QtCore import Qt
 
 class About(QDialog):
@@ -41,10 +44,8 @@ class About(QDialog):
         self.resize(450, 150)
 
         # About image
-        filename = 'imgs/about.png'
-        image = QImage(filename)
         imageLabel = QLabel()
-        imageLabel.setPixmap(QPixmap.fromImage(image))
+        imageLabel.setPixmap(get_pixmap('about'))
         imageLabel.setAlignment(Qt.AlignCenter)
 
         # Labels for info
@@ -58,6 +59,12 @@ class About(QDialog):
         lab_unoff = QLabel('<b>' + _('unofficial_project') + '</b>')
         lab_unoff.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
         lab_unoff.setWordWrap(True)
+        lab_engines = QLabel(self.engine_stats())
+        lab_engines.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        lab_engines.setWordWrap(True)
+        lab_connect = QLabel(self.connect_stats())
+        lab_connect.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        lab_connect.setWordWrap(True)
 
         # OK button
         okButton = QPushButton(_("ok"))
@@ -74,8 +81,10 @@ class About(QDialog):
         grid.addWidget(lab_desc, 2, 1, 1, 2)
         grid.addWidget(lab_author, 3, 1, 1, 2)
         grid.addWidget(lab_unoff, 4, 1, 1, 2)
+        grid.addWidget(lab_engines, 5, 1, 1, 2)
+        grid.addWidget(lab_connect, 6, 1, 1, 2)
 
-        grid.addWidget(okButton, 6, 1)                       # Button
+        grid.addWidget(okButton, 7, 1)                       # Button
         
         self.setLayout(grid) 
 
@@ -84,6 +93,44 @@ class About(QDialog):
         self.setWindowTitle(_('about'))
         self.show()
 
+    def engine_stats(self):
+        """
+            Description: Summarizes the requests sent to each oVirt engine in this session, so a
+                         slow or failing engine can be spotted.
+            Arguments: None
+            Returns: The rich text to show
+        """
+
+        global conf
+
+        lines = []
+        for engine in conf.ENGINES.values():
+            stats = engine.stats
+            line = '<b>%s</b>: %d %s, %s %.0f/%.0f ms, %d %s' % (engine.name, stats.requests, _('engine_requests'), _('engine_latency'), stats.average() * 1000, stats.maxtime * 1000, stats.errors, _('engine_errors'))
+            if stats.lasterror:
+                line += ' (%s: %s)' % (_('engine_last_error'), escape(stats.lasterror))
+            lines.append(line)
+        return '<u>%s</u><br>%s' % (_('engine_stats'), '<br>'.join(lines))
+
+    def connect_stats(self):
+        """
+            Description: Summarizes the last connections: the median and 95th percentile of each
+                         stage, so the slow one can be spotted, and how total times are distributed.
+            Arguments: None
+            Returns: The rich text to show
+        """
+
+        global conf
+
+        times = conf.CONNECTTIMES
+        if not times:
+            return '<u>%s</u><br>%s' % (_('connect_stats') % (0), _('no_connections_yet'))
+
+        stages = ['%s %.0f/%.0f ms' % (stage, times.percentile(stage, 0.5) * 1000, times.percentile(stage, 0.95) * 1000) for stage in CONNECTSTAGES + ('total',)]
+        bounds = ['&le;%d ms' % (bound) for bound in LATENCYBUCKETS] + ['&gt;%d ms' % (LATENCYBUCKETS[-1])]
+        buckets = ['%s: %d' % (bound, count) for bound, count in zip(bounds, times.buckets())]
+        return '<u>%s</u><br>%s<br>%s: %s' % (_('connect_stats') % (len(times)), ', '.join(stages), _('connect_histogram'), ', '.join(buckets))
+
     def center(self):
         """
             Description: Just centers the window
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+from globalconf import conf
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+# Operations that change something on the engine. Once they have begun they're never reported
+# as timed out, as they can't be called off and the user would be told they failed when they
+# may well succeed. They only time out while they're still waiting for a worker.
+SIDEEFFECTOPERATIONS = ('change_status', 'bulk_change_status', 'acquire_vm')
+
+class OperationTimeout(Exception):
+    """
+        Passed to the error callback when an operation takes longer than its timeout
+    """
+
+    pass
+
+class TaskSignals(QObject):
+    """
+        Signals used by a worker to hand its result over to the GUI thread
+    """
+
+    started = pyqtSignal()                          # Emitted when a worker begins running the operation
+    finished = pyqtSignal(object)                   # Emitted with the return value of the operation
+    failed = pyqtSignal(object)                     # Emitted with the exception raised by the operation
+
+class ApiTask(QRunnable):
+    """
+        A single blocking operation (usually one or more oVirt API calls) run by the worker pool
+    """
+
+    def __init__(self, function, args):
+        QRunnable.__init__(self)
+        self.function = function
+        self.args = args
+        self.signals = TaskSignals()
+        self.done = False                           # Set once a callback has been invoked
+
+    def run(self):
+        """
+            Description: Runs the operation in a worker thread. Callbacks are not called from here,
+                         results are emitted instead so they're delivered in the GUI thread.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.signals.started.emit()
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(e)
+            return
+        self.signals.finished.emit(result)
+
+class ApiExecutor(QObject):
+    """
+        This class runs blocking operations in a pool of worker threads so the GUI thread never
+        waits for the network. Results and errors are delivered to callbacks in the GUI thread.
+        If an operation waits for a worker longer than its timeout, it's taken out of the queue
+        and never run. If it runs longer than its timeout, the error callback is called with
+        OperationTimeout and its result, if it ever comes, is discarded (handed to the discard
+        callback first, if it holds something to release). Operations with side effects are
+        never timed out once they're running.
+    """
+
+    def __init__(self, workers):
+        QObject.__init__(self)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(workers)
+        self.tasks = set()                          # Running tasks, referenced until their worker is done
+
+    def timeout_for(self, operation):
+        """
+            Description: Returns the timeout for a named operation, as defined in the [timeouts]
+                         section of the config file, or the app->operation_timeout value.
+            Arguments: The operation name
+            Returns: The timeout in seconds, 0 means no timeout.
+        """
+
+        global conf
+
+        return conf.CONFIG['timeouts'].get(operation, conf.CONFIG['operation_timeout'])
+
+    def submit(self, operation, function, args=(), onresult=None, onerror=None, ondiscard=None):
+        """
+            Description: Queues an operation in the worker pool. Must be called from the GUI thread.
+            Arguments: 1. operation: The operation name, used to find out its timeout.
+                       2. function: The callable to run in a worker thread.
+                       3. args: Tuple of arguments to pass to the callable.
+                       4. onresult: Called in the GUI thread with the return value of the callable.
+                       5. onerror: Called in the GUI thread with the raised exception.
+                       6. ondiscard: Called in the GUI thread with the return value of the callable
+                          if it arrives after the timeout, so it can be released.
+            Returns: The ApiTask object
+        """
+
+        task = ApiTask(function, args)
+        task.signals.started.connect(lambda t=task: self.task_started(t, operation, onerror))
+        task.signals.finished.connect(lambda result, t=task: self.complete(t, onresult, result, ondiscard))
+        task.signals.failed.connect(lambda e, t=task: self.complete(t, onerror, e))
+        # The task must be referenced until the worker is done with it, even if it timed out
+        task.signals.finished.connect(lambda result, t=task: self.tasks.discard(t))
+        task.signals.failed.connect(lambda e, t=task: self.tasks.discard(t))
+        self.tasks.add(task)
+
+        timeout = self.timeout_for(operation)
+        if timeout:
+            QTimer.singleShot(int(timeout * 1000), lambda t=task: self.queue_timeout(t, operation, onerror))
+
+        self.pool.start(task)
+        return task
+
+    def queue_timeout(self, task, operation, onerror):
+        """
+            Description: Invoked in the GUI thread once a task has been queued for its timeout. If no
+                         worker has picked it up yet, it's taken out of the queue so it never runs.
+            Arguments: 1. task: The ApiTask
+                       2. operation: The operation name
+                       3. onerror: The error callback of the task
+            Returns: Nothing
+        """
+
+        if task.done or not self.pool.tryTake(task):
+            # Running or over, the timer started by task_started applies from now on
+            return
+        self.tasks.discard(task)
+        self.complete(task, onerror, OperationTimeout(operation))
+
+    def task_started(self, task, operation, onerror):
+        """
+            Description: Invoked in the GUI thread when a worker begins running a task. Its timeout
+                         is counted from here, so time spent waiting for a worker is not taken
+                         into account, except for operations with side effects, which are not
+                         timed out once they're running.
+            Arguments: 1. task: The ApiTask
+                       2. operation: The operation name
+                       3. onerror: The error callback of the task
+            Returns: Nothing
+        """
+
+        timeout = self.timeout_for(operation)
+        if timeout and operation not in SIDEEFFECTOPERATIONS:
+            QTimer.singleShot(int(timeout * 1000), lambda t=task: self.complete(t, onerror, OperationTimeout(operation)))
+
+    def complete(self, task, callback, value, ondiscard=None):
+        """
+            Description: Invoked in the GUI thread when a task finishes, fails or times out. Only
+                         the first of these events is taken into account.
+            Arguments: 1. task: The ApiTask
+                       2. callback: The callback to invoke
+                       3. value: The value to pass to the callback
+                       4. ondiscard: The callback to invoke instead if the task is over already
+            Returns: Nothing
+        """
+
+        if task.done:
+            # A result arriving after the timeout
+            if ondiscard:
+                ondiscard(value)
+            return
+        task.done = True
+
+        if callback:
+            callback(value)
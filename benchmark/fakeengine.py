@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+import json
+import gzip
+import threading
+from time import sleep
+from collections import Counter
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+APIPATH = '/ovirt-engine/api'
+OSTYPES = ['rhel_7x64', 'ubuntu_14_04', 'windows_10x64', 'debian_8', 'other_linux', 'centos_7', 'other']
+
+class FakeVm:
+    """
+        A VM as seen by the fake engine
+    """
+
+    def __init__(self, vmid, name, ostype, status):
+        self.vmid = vmid
+        self.name = name
+        self.ostype = ostype
+        self.status = status
+
+class FakeEngine:
+    """
+        A local stand-in for the oVirt REST API. It implements just the subset of endpoints the
+        client uses, with configurable VM/pool counts and an artificial per-request latency.
+        Every request is accounted so the number of API calls per operation can be measured.
+        Half of the VMs are up, the other half are down.
+    """
+
+    def __init__(self, numvms=10, numpools=0, latency=0.0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.sentbytes = 0                          # Response body bytes sent, as transferred
+        self.vms = {}
+        self.pools = {}
+        self.events = []
+        self.lasteventid = 1000
+        self.tokengen = 0                           # Bumped to expire the current SSO token
+        self.unavailable = False                    # If True, API requests fail as if the engine was down
+        self.transitiontime = None                  # Seconds a VM takes to power up or down, None means forever
+        for i in range(numvms):
+            vmid = '00000000-0000-0000-0000-%012d' % (i)
+            self.vms[vmid] = FakeVm(vmid, 'vm-%04d' % (i), OSTYPES[i % len(OSTYPES)], 'up' if i % 2 else 'down')
+        for i in range(numpools):
+            poolid = '11111111-0000-0000-0000-%012d' % (i)
+            self.pools[poolid] = 'pool-%04d' % (i)
+
+        engine = self
+
+        class Handler(EngineRequestHandler):
+            pass
+        Handler.engine = engine
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """
+            Description: The API URL of the engine, as it would be set in the ovirt->url setting.
+            Arguments: None
+            Returns: The URL string
+        """
+
+        return 'http://%s:%d%s' % (self.server.server_address[0], self.server.server_address[1], APIPATH)
+
+    def start(self):
+        """
+            Description: Starts serving requests in a background thread.
+            Arguments: None
+            Returns: The FakeEngine itself
+        """
+
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+            Description: Stops serving requests and closes the listening socket.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_calls(self):
+        """
+            Description: Resets the request counters.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        with self.lock:
+            self.calls.clear()
+            self.sentbytes = 0
+
+    def total_calls(self):
+        """
+            Description: Counts the requests served since the last reset, SSO requests included.
+            Arguments: None
+            Returns: The number of requests
+        """
+
+        with self.lock:
+            return sum(self.calls.values())
+
+    def expire_tokens(self):
+        """
+            Description: Invalidates the issued SSO tokens, as the engine does when they time out.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        with self.lock:
+            self.tokengen += 1
+
+    def set_status(self, vmid, status):
+        """
+            Description: Changes the status of a VM and records the corresponding event.
+            Arguments: 1. vmid: The VM id
+                       2. status: The new oVirt-like status
+            Returns: Nothing
+        """
+
+        with self.lock:
+            self.vms[vmid].status = status
+            self.lasteventid += 1
+            self.events.append((self.lasteventid, vmid))
+
+    def add_vm(self, name, ostype='other', status='down'):
+        """
+            Description: Adds a VM, as if the user had been granted permissions on it.
+            Arguments: 1. name: The VM name
+                       2. ostype: The OS type
+                       3. status: The oVirt-like status
+            Returns: The id of the new VM
+        """
+
+        with self.lock:
+            vmid = '22222222-0000-0000-0000-%012d' % (len(self.vms))
+            self.vms[vmid] = FakeVm(vmid, name, ostype, status)
+            self.lasteventid += 1
+            self.events.append((self.lasteventid, vmid))
+            return vmid
+
+    def remove_vm(self, vmid):
+        """
+            Description: Removes a VM, as if the user had lost the permissions on it.
+            Arguments: The VM id
+            Returns: Nothing
+        """
+
+        with self.lock:
+            del self.vms[vmid]
+            self.lasteventid += 1
+            self.events.append((self.lasteventid, vmid))
+
+def vm_xml(vm):
+    """
+        Description: Renders a VM as the API does, including the attributes the client doesn't use.
+        Arguments: The FakeVm
+        Returns: The XML string
+    """
+
+    return ('<vm href="%(api)s/vms/%(id)s" id="%(id)s"><name>%(name)s</name><description></description>'
+            '<status>%(status)s</status><os><type>%(os)s</type><boot><devices><device>hd</device></devices></boot></os>'
+            '<memory>2147483648</memory><cpu><topology><cores>1</cores><sockets>2</sockets><threads>1</threads></topology></cpu>'
+            '<display><type>spice</type><monitors>1</monitors><smartcard_enabled>false</smartcard_enabled></display>'
+            '<link href="%(api)s/vms/%(id)s/nics" rel="nics"/><link href="%(api)s/vms/%(id)s/diskattachments" rel="diskattachments"/>'
+            '<link href="%(api)s/vms/%(id)s/graphicsconsoles" rel="graphicsconsoles"/></vm>') % {
+                'api': APIPATH, 'id': vm.vmid, 'name': escape(vm.name), 'status': vm.status, 'os': vm.ostype}
+
+def vm_json(vm):
+    """
+        Description: Renders a VM as the API does when JSON is requested.
+        Arguments: The FakeVm
+        Returns: A dict ready to be serialized
+    """
+
+    return {'id': vm.vmid, 'href': '%s/vms/%s' % (APIPATH, vm.vmid), 'name': vm.name, 'status': vm.status,
+            'os': {'type': vm.ostype, 'boot': {'devices': {'device': ['hd']}}}, 'memory': '2147483648',
+            'display': {'type': 'spice', 'monitors': '1'}}
+
+class EngineRequestHandler(BaseHTTPRequestHandler):
+    """
+        Serves the oVirt API endpoints used by the client. HTTP/1.1 is used so keep-alive
+        connections behave like with the real engine.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True                  # Headers and body are written separately
+    engine = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, code, body, ctype='application/xml'):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', ctype)
+        if len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, 1)
+            self.send_header('Content-Encoding', 'gzip')
+        with self.engine.lock:
+            self.engine.sentbytes += len(body)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def authorized(self):
+        auth = self.headers.get('Authorization', '')
+        if auth.startswith('Basic '):
+            self.account('basic_auth')
+            return True
+        return auth == 'Bearer fake-token-%d' % (self.engine.tokengen)
+
+    def account(self, key):
+        engine = self.engine
+        with engine.lock:
+            engine.calls[key] += 1
+        if engine.latency:
+            sleep(engine.latency)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        parts = urlsplit(self.path)
+        path = parts.path
+        if path.endswith('/sso/oauth/token'):
+            self.account('sso')
+            return self.reply(200, json.dumps({'access_token': 'fake-token-%d' % (self.engine.tokengen), 'token_type': 'bearer'}), 'application/json')
+        if path.endswith('/sso-logout'):
+            self.account('sso_logout')
+            return self.reply(200, '{}', 'application/json')
+        if not self.authorized():
+            return self.reply(401, '<fault><reason>Unauthorized</reason></fault>')
+        rel = path[len(APIPATH):].strip('/').split('/')
+        if len(rel) == 3 and rel[0] == 'vms' and rel[2] in ('start', 'shutdown', 'stop'):
+            self.account('vm_action')
+            vm = self.engine.vms.get(rel[1])
+            if not vm:
+                return self.reply(404, '<fault><reason>Not found</reason></fault>')
+            self.engine.set_status(vm.vmid, 'powering_up' if rel[2] == 'start' else 'powering_down')
+            if self.engine.transitiontime is not None:
+                timer = threading.Timer(self.engine.transitiontime, self.engine.set_status, (vm.vmid, 'up' if rel[2] == 'start' else 'down'))
+                timer.daemon = True
+                timer.start()
+            return self.reply(200, '<action><status>complete</status></action>')
+        if len(rel) == 3 and rel[0] == 'vmpools' and rel[2] == 'allocatevm':
+            self.account('vmpool_allocate')
+            vmid = self.engine.add_vm('%s-allocated' % (self.engine.pools.get(rel[1], 'pool')))
+            return self.reply(200, '<action><status>complete</status><vm id="%s"/></action>' % (vmid))
+        return self.reply(404, '<fault><reason>Not found</reason></fault>')
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        path = parts.path
+        if not path.startswith(APIPATH):
+            return self.reply(404, '')
+        if not self.authorized():
+            return self.reply(401, '<fault><reason>Unauthorized</reason></fault>')
+        rel = [p for p in path[len(APIPATH):].split('/') if p]
+        engine = self.engine
+        if engine.unavailable:
+            self.account('unavailable')
+            return self.reply(503, '<fault><reason>Service Unavailable</reason></fault>')
+        wantjson = 'application/json' in self.headers.get('Accept', '')
+
+        if not rel:
+            self.account('api')
+            return self.reply(200, '<api><product_info><name>Fake oVirt Engine</name></product_info></api>')
+
+        if rel == ['vms']:
+            self.account('vms_list')
+            with engine.lock:
+                vms = list(engine.vms.values())
+            search = query.get('search', [''])[0]
+            if search:
+                ids = set(term.strip()[3:] for term in search.split(' or ') if term.strip().startswith('id='))
+                vms = [vm for vm in vms if vm.vmid in ids]
+            if wantjson:
+                return self.reply(200, json.dumps({'vm': [vm_json(vm) for vm in vms]}), 'application/json')
+            return self.reply(200, '<vms>%s</vms>' % (''.join(vm_xml(vm) for vm in vms)))
+
+        if len(rel) == 2 and rel[0] == 'vms':
+            self.account('vm_get')
+            vm = engine.vms.get(rel[1])
+            if not vm:
+                return self.reply(404, '<fault><reason>Not found</reason></fault>')
+            return self.reply(200, vm_xml(vm))
+
+        if rel == ['vmpools']:
+            self.account('vmpools_list')
+            with engine.lock:
+                pools = list(engine.pools.items())
+            return self.reply(200, '<vm_pools>%s</vm_pools>' % (''.join(
+                '<vm_pool href="%s/vmpools/%s" id="%s"><name>%s</name><size>10</size></vm_pool>' % (APIPATH, pid, pid, escape(name))
+                for pid, name in pools)))
+
+        if len(rel) == 3 and rel[0] == 'vms' and rel[2] == 'graphicsconsoles':
+            self.account('graphicsconsoles_list')
+            vmid = rel[1]
+            return self.reply(200, '<graphics_consoles>'
+                              '<graphics_console href="%(api)s/vms/%(id)s/graphicsconsoles/7370696365" id="7370696365"><protocol>spice</protocol></graphics_console>'
+                              '<graphics_console href="%(api)s/vms/%(id)s/graphicsconsoles/766e63" id="766e63"><protocol>vnc</protocol></graphics_console>'
+                              '</graphics_consoles>' % {'api': APIPATH, 'id': vmid})
+
+        if len(rel) == 4 and rel[0] == 'vms' and rel[2] == 'graphicsconsoles':
+            self.account('graphicsconsole_vv')
+            vm = engine.vms.get(rel[1])
+            proto = 'spice' if rel[3] == '7370696365' else 'vnc'
+            vv = ('[virt-viewer]\ntype=%s\nhost=127.0.0.1\nport=5900\npassword=secret\n'
+                  'delete-this-file=1\nfullscreen=0\ntitle=%s:%%d\ntoggle-fullscreen=shift+f11\n'
+                  'release-cursor=shift+f12\nsecure-attention=ctrl+alt+end\ntls-port=5901\n'
+                  'enable-smartcard=0\nenable-usb-autoshare=1\nusb-filter=-1,-1,-1,-1,0\n'
+                  'tls-ciphers=DEFAULT\nhost-subject=O=fake,CN=127.0.0.1\nca=-----BEGIN CERTIFICATE-----\\nFAKE\\n-----END CERTIFICATE-----\\n\n'
+                  'secure-channels=main;inputs;cursor;playback;record;display;smartcard;usbredir\n'
+                  '\n[ovirt]\nhost=127.0.0.1:443\nvm-guid=%s\n') % (proto, vm.name if vm else 'unknown', rel[1])
+            return self.reply(200, vv, 'application/x-virt-viewer')
+
+        if rel == ['events']:
+            self.account('events_list')
+            since = int(query.get('from', ['0'])[0] or 0)
+            maxevents = int(query.get('max', ['0'])[0] or 0)
+            with engine.lock:
+                events = [e for e in engine.events if e[0] > since]
+                if not events and not since:
+                    events = [(engine.lasteventid, None)]
+            events = sorted(events, reverse=True)
+            if maxevents:
+                events = events[:maxevents]
+            return self.reply(200, '<events>%s</events>' % (''.join(
+                '<event href="%s/events/%d" id="%d"><code>1</code>%s</event>' % (APIPATH, eid, eid, '<vm id="%s"/>' % (vmid) if vmid else '')
+                for eid, vmid in events)))
+
+        return self.reply(404, '<fault><reason>Not found</reason></fault>')
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Runs a fake oVirt engine for local testing')
+    parser.add_argument('--vms', type=int, default=10)
+    parser.add_argument('--pools', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+    engine = FakeEngine(args.vms, args.pools, args.latency, port=args.port)
+    print(engine.url)
+    engine.server.serve_forever()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+"""
+    Runs the client against a local fake oVirt engine under the offscreen Qt platform and
+    reports, for each operation and VM count, the number of API calls, the size of the
+    answers, the wall time and the peak of memory allocated by Python. The behavior of the
+    client is checked by the tests in the tests directory instead. Usage:
+
+        python3 benchmark/runbench.py [--vms 10,100,1000] [--latency 0.005] [--repeat 5] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+from time import monotonic
+from tempfile import mkdtemp
+from shutil import rmtree
+
+BENCHDIR = os.path.dirname(os.path.abspath(__file__))
+ROOTDIR = os.path.dirname(BENCHDIR)
+sys.path.insert(0, ROOTDIR)
+sys.path.insert(0, BENCHDIR)
+os.chdir(ROOTDIR)                                   # Translations are loaded from the relative 'lang' dir
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from fakeengine import FakeEngine
+from globalconf import conf
+from engines import Engine, connect_engines
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEventLoop
+import ovirtclient
+import vmlisting
+import vvfile
+
+VVLOOPS = 1000                                      # Console file operations per measured run
+
+class Bench:
+    """
+        This class runs every measured operation against one fake engine with a given number
+        of VMs. A fresh OvirtClient is created for each engine, without the Credentials dialog.
+    """
+
+    def __init__(self, app, workdir, numvms, latency, repeat):
+        self.app = app
+        self.workdir = workdir
+        self.numvms = numvms
+        self.repeat = repeat
+        self.results = []
+        self.engine = FakeEngine(numvms, max(1, numvms // 10), latency).start()
+        self.configure()
+        self.login()
+        self.client = ovirtclient.OvirtClient()
+        self.client.refreshing = True               # So loading the board doesn't start the status threads
+
+    def configure(self):
+        """
+            Description: Writes a settings file pointing to the fake engine and loads it, so the
+                         defaults of every setting are the same as in a real run. The console
+                         prefetch is disabled so it doesn't add up to the measured operations.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        global conf
+
+        cafile = os.path.join(self.workdir, 'ca.crt')
+        open(cafile, 'w').close()
+
+        conf.CONFIGFILE = os.path.join(self.workdir, 'settings.conf')
+        with open(conf.CONFIGFILE, 'w') as handle:
+            handle.write('[ovirt]\nurl=%s\ndomain=internal\ncafile=%s\n\n' % (self.engine.url, cafile))
+            handle.write('[app]\nremote_viewer_path=/bin/true\nconsole_prefetch=0\n')
+        conf.USERCREDSFILE = os.path.join(self.workdir, 'creds')
+
+        ovirtclient.checkConfig().install()
+        self.listing = conf.CONFIG['vm_listing']
+
+    def login(self):
+        """
+            Description: Authenticates to the fake engine the same way the Credentials dialog does.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        global conf
+
+        settings = conf.CONFIG['engines'][0]
+        self.ovirt = Engine(settings['name'], settings['url'], settings['cafile'], settings['domain'])
+        failures = connect_engines([self.ovirt], 'bench', 'bench', int(conf.CONFIG['conntimeout']))
+        if failures:
+            sys.exit('[ERROR] Cannot authenticate to the fake engine: %s' % (failures[self.ovirt.name]))
+
+        conf.ENGINES = {self.ovirt.name: self.ovirt}
+        conf.USERNAME = 'bench'
+        conf.PASSWORD = 'bench'
+
+    def close(self):
+        """
+            Description: Logs out and stops the fake engine.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.client.logout(reconnect=False)
+        self.client.deleteLater()
+        self.engine.stop()
+
+    def wait_for(self, predicate, timeout=120):
+        """
+            Description: Runs the Qt event loop until a condition is met, so operations completed
+                         by worker callbacks can be measured.
+            Arguments: 1. predicate: Callable returning True once the operation is over
+                       2. timeout: Maximum number of seconds to wait
+            Returns: Nothing
+        """
+
+        deadline = monotonic() + timeout
+        while not predicate():
+            if monotonic() > deadline:
+                sys.exit('[ERROR] Operation did not complete in %d seconds' % (timeout))
+            self.app.processEvents(QEventLoop.AllEvents, 10)
+
+    def measure(self, name, operation):
+        """
+            Description: Runs an operation several times and records the API calls, the bytes
+                         received and the median wall time. One more run is traced to get the memory peak, as
+                         tracing slows everything down.
+            Arguments: 1. name: The operation name shown in the report
+                       2. operation: Callable running the operation to completion
+            Returns: Nothing
+        """
+
+        walltimes = []
+        for i in range(self.repeat):
+            self.engine.reset_calls()
+            start = monotonic()
+            operation()
+            walltimes.append(monotonic() - start)
+            calls = self.engine.total_calls()
+            received = self.engine.sentbytes
+
+        tracemalloc.start()
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        walltimes.sort()
+        self.results.append({
+            'vms': self.numvms,
+            'operation': name,
+            'calls': calls,
+            'received_kib': round(received / 1024.0, 1),
+            'wall_ms': round(walltimes[len(walltimes) // 2] * 1000, 2),
+            'peak_kib': round(peak / 1024.0, 1),
+        })
+
+    def load_vms(self):
+        """
+            Description: Loads the VM list and renders the board, as when the user logs in or
+                         the board has to be reloaded.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.client.load_vms()
+        self.wait_for(lambda: not self.client.loading)
+
+    def refresh_statuses(self):
+        """
+            Description: One iteration of the background status refresh.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.ovirt.statusengine.update(self.client.enginevmdata[self.ovirt.name])
+
+    def list_vms_with(self, listing):
+        """
+            Description: Returns an operation listing the VMs with the given method, to compare them.
+            Arguments: The app->vm_listing value ('lean' or 'sdk')
+            Returns: The operation callable
+        """
+
+        def operation():
+            conf.CONFIG['vm_listing'] = listing
+            try:
+                vmlisting.list_vms(self.ovirt)
+            finally:
+                conf.CONFIG['vm_listing'] = self.listing
+
+        return operation
+
+    def running_vm(self):
+        """
+            Description: Picks a running VM to connect to.
+            Arguments: None
+            Returns: The VM id
+        """
+
+        for vmid, vmd in self.client.enginevmdata[self.ovirt.name].items():
+            if vmd.vmtype == 'vm' and vmd.vmstatus == 'up':
+                return vmid
+
+    def get_viewer_ticket(self):
+        """
+            Description: Gets the console ticket of a running VM whose consoles are not cached.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        vmid = self.running_vm()
+        self.ovirt.consolecache.invalidate(vmid)
+        self.client.get_viewer_ticket(self.ovirt, vmid)
+
+    def get_cached_viewer_ticket(self):
+        """
+            Description: Gets the console ticket of a running VM whose consoles are cached.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.client.get_viewer_ticket(self.ovirt, self.running_vm())
+
+    def store_vv_file(self):
+        """
+            Description: Downloads and stores the .vv file of a running VM. The ticket is obtained
+                         beforehand so only the .vv request is measured.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        vmid = self.running_vm()
+        ticket = self.client.get_viewer_ticket(self.ovirt, vmid)
+        self.engine.reset_calls()
+        vvfile = self.client.store_vv_file(self.ovirt, vmid, ticket)
+        if vvfile:
+            vvfile.close()
+
+    def raw_vv(self):
+        """
+            Description: Downloads the console file of a running VM as sent by oVirt.
+            Arguments: None
+            Returns: The file contents (bytes)
+        """
+
+        vmid = self.running_vm()
+        ticket = self.client.get_viewer_ticket(self.ovirt, vmid)
+        return self.ovirt.restsession.get('/vms/%s/graphicsconsoles/%s' % (vmid, ticket), {'Accept': 'application/x-virt-viewer'})
+
+    def vv_with(self, function, *args):
+        """
+            Description: Returns an operation running a console file function VVLOOPS times, as a
+                         single run is too short to be measured.
+            Arguments: 1. function: The vvfile function
+                       2. args: Its arguments
+            Returns: The operation callable
+        """
+
+        def operation():
+            for i in range(VVLOOPS):
+                function(*args)
+        return operation
+
+    def run(self):
+        """
+            Description: Measures every operation. The first load also warms up the board.
+            Arguments: None
+            Returns: The list of results
+        """
+
+        self.measure('load_vms', self.load_vms)
+        self.measure('refresh_statuses', self.refresh_statuses)
+        self.measure('list_vms (sdk)', self.list_vms_with('sdk'))
+        self.measure('list_vms (lean)', self.list_vms_with('lean'))
+        self.measure('get_viewer_ticket', self.get_viewer_ticket)
+        self.measure('get_viewer_ticket (cached)', self.get_cached_viewer_ticket)
+        self.measure('store_vv_file', self.store_vv_file)
+        vv = self.raw_vv()
+        overrides = {'fullscreen': '1', 'enable-usbredir': '0', 'monitors': '0', 'proxy': ''}
+        self.measure('parse_vv (x%d)' % (VVLOOPS), self.vv_with(vvfile.parse_vv, vv))
+        self.measure('rewrite_vv (x%d)' % (VVLOOPS), self.vv_with(vvfile.rewrite_vv, vv, overrides))
+        return self.results
+
+def print_report(results):
+    """
+        Description: Prints the results as a table.
+        Arguments: The list of results
+        Returns: Nothing
+    """
+
+    print('%6s  %-28s %8s %14s %12s %12s' % ('VMs', 'Operation', 'Calls', 'Received (KiB)', 'Wall (ms)', 'Peak (KiB)'))
+    for result in results:
+        print('%(vms)6d  %(operation)-28s %(calls)8d %(received_kib)14.1f %(wall_ms)12.2f %(peak_kib)12.1f' % result)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the client against a local fake oVirt engine')
+    parser.add_argument('--vms', default='10,100,1000', help='Comma-separated list of VM counts (default: 10,100,1000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Artificial latency of each API request, in seconds (default: 0)')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each operation, the median is reported (default: 5)')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON, i.e. to compare them between versions')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    ovirtclient.preload_pixmaps()
+    workdir = mkdtemp(prefix='ovirtclient-bench-')
+
+    results = []
+    try:
+        for numvms in [int(n) for n in args.vms.split(',')]:
+            bench = Bench(app, workdir, numvms, args.latency, args.repeat)
+            results.extend(bench.run())
+            bench.close()
+    finally:
+        rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+if __name__ == '__main__':
+    main()
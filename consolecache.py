@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+import threading
+import xml.etree.ElementTree as ET
+from globalconf import conf, CONSOLEPREFETCHBATCH
+
+class ConsoleCache:
+    """
+        This class keeps the graphics console ids of the running VMs, per VM and protocol,
+        so connecting to a machine only requires fetching its short-lived .vv file. Console
+        lists are prefetched in the background, a few VMs at a time, and the entries of a VM
+        are dropped whenever its status changes.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine                        # Engine the VMs belong to
+        self.consoles = {}                          # VM id -> {protocol: console id}
+        self.generation = {}                        # VM id -> invalidation counter, so a fetch that was
+                                                    # in progress when the VM changed is not stored
+        self.lock = threading.Lock()
+        self.failed = set()                         # VMs whose prefetch failed, not retried until they change
+        self.prefetching = False                    # Whether a prefetch task is in progress
+        self.vmdata = {}                            # Last board seen by prefetch, to chain the next batch
+        self.hits = 0                               # Connections that found their console cached
+        self.misses = 0                             # Connections that had to fetch the console list
+
+    def fetch_consoles(self, vmid):
+        """
+            Description: Gets the graphics consoles of a VM from oVirt and caches them.
+                         Runs in a worker thread.
+            Arguments: The VM UUID in oVirt-format
+            Returns: A dict of protocol -> console id
+        """
+
+        with self.lock:
+            generation = self.generation.get(vmid, 0)
+
+        xmlcontent = ET.fromstring(self.engine.restsession.get('/%s/%s/%s' % ('vms', vmid, 'graphicsconsoles')))
+
+        consoles = {}
+        for data in xmlcontent.findall('graphics_console'):
+            proto = data.find('protocol')
+            if proto is not None and proto.text:
+                consoles[proto.text.lower()] = data.get('id')
+
+        with self.lock:
+            if self.generation.get(vmid, 0) == generation:
+                self.consoles[vmid] = consoles
+
+        return consoles
+
+    def ticket(self, vmid, prefproto):
+        """
+            Description: Returns the console id to connect to a VM, preferably the one of the
+                         protocol defined in the settings file. The cache is used if possible,
+                         otherwise the console list is fetched. Runs in a worker thread.
+            Arguments: 1. vmid: The VM UUID in oVirt-format
+                       2. prefproto: The preferred protocol
+            Returns: The console id, or None if the VM has no graphics console
+        """
+
+        with self.lock:
+            consoles = self.consoles.get(vmid)
+            if consoles is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if consoles is None:
+            consoles = self.fetch_consoles(vmid)
+
+        prefproto = prefproto.lower()
+        if prefproto in consoles:
+            return consoles[prefproto]
+        for proto in sorted(consoles):
+            return consoles[proto]
+        return None
+
+    def invalidate(self, vmid):
+        """
+            Description: Drops the cached consoles of a VM, i.e. because its status changed.
+            Arguments: The VM UUID in oVirt-format
+            Returns: Nothing
+        """
+
+        with self.lock:
+            self.consoles.pop(vmid, None)
+            self.failed.discard(vmid)
+            self.generation[vmid] = self.generation.get(vmid, 0) + 1
+
+    def sync(self, vmdata):
+        """
+            Description: Drops the cached consoles of the VMs that are no longer running or no
+                         longer on the board. Must be called from the GUI thread.
+            Arguments: The VM id -> VmData dict of the board
+            Returns: Nothing
+        """
+
+        with self.lock:
+            for vmid in list(self.consoles):
+                vmd = vmdata.get(vmid)
+                if vmd is None or vmd.vmstatus != 'up':
+                    del self.consoles[vmid]
+                    self.generation[vmid] = self.generation.get(vmid, 0) + 1
+            self.failed.intersection_update(vmdata)
+
+    def missing(self, vmdata):
+        """
+            Description: Finds the running VMs whose consoles are not cached yet.
+            Arguments: The VM id -> VmData dict of the board
+            Returns: A list of at most CONSOLEPREFETCHBATCH VM ids
+        """
+
+        global CONSOLEPREFETCHBATCH
+
+        missing = []
+        with self.lock:
+            for vmid, vmd in vmdata.items():
+                if vmd.vmtype == 'vm' and vmd.vmstatus == 'up' and vmid not in self.consoles and vmid not in self.failed:
+                    missing.append(vmid)
+                    if len(missing) == CONSOLEPREFETCHBATCH:
+                        break
+        return missing
+
+    def prefetch_batch(self, vmids):
+        """
+            Description: Fetches the consoles of several VMs in a row. Runs in a worker thread.
+                         Failures are ignored, the console list will be fetched on connection.
+            Arguments: The list of VM ids
+            Returns: Nothing
+        """
+
+        for vmid in vmids:
+            try:
+                self.fetch_consoles(vmid)
+            except Exception:
+                with self.lock:
+                    self.failed.add(vmid)
+
+    def prefetch(self, vmdata):
+        """
+            Description: Queues the prefetch of the next batch of running VMs whose consoles are
+                         not cached yet. Only one batch is in progress at a time so the worker
+                         pool is always available for user-triggered operations. Must be called
+                         from the GUI thread.
+            Arguments: The VM id -> VmData dict of the board
+            Returns: Nothing
+        """
+
+        global conf
+
+        self.vmdata = vmdata
+        if self.prefetching or not conf.CONFIG['console_prefetch']:
+            return
+
+        vmids = self.missing(vmdata)
+        if not vmids:
+            return
+
+        self.prefetching = True
+        conf.EXECUTOR.submit('console_prefetch', self.prefetch_batch, (vmids,), self.prefetch_done, self.prefetch_done)
+
+    def prefetch_done(self, result):
+        """
+            Description: Invoked in the GUI thread once a prefetch batch is over. Goes on with
+                         the next batch, if any.
+            Arguments: The result of the batch, ignored
+            Returns: Nothing
+        """
+
+        self.prefetching = False
+        self.prefetch(self.vmdata)
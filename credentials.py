@@ -18,18 +18,23 @@ import gettext
 import os
 import configparser
 from re import sub
+from html import escape
 from codecs import encode, decode
 from os.path import isfile
-from globalconf import conf, IMGDIR
+from globalconf import conf
+from pixmapcache import get_pixmap
+from engines import Engine
+from apiworkers import OperationTimeout
 from PyQt5.QtWidgets import QProgressBar, QPushButton, QDesktopWidget, QDialog, QLabel, QLineEdit, QGridLayout, QCheckBox, QMessageBox
-from PyQt5.QtGui import QImage, QPixmap, QIcon
-from PyQt5.QtCore import QBasicTimer, Qt
-from ovirtsdk4 import Connection, Error
+from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt
 
 class CheckCreds(QDialog):
     """
         This class manages the authentication process for oVirt. If credentials are saved, they're
-        tried automatically. If they are wrong, the username/password dialog is shown.
+        tried automatically. If they are wrong, the username/password dialog is shown. Engines are
+        authenticated in background workers, the progress bar advances as each of them answers
+        and the dialog is closed as soon as all of them have. The process can be cancelled.
     """
 
     def __init__(self, parent, username, password, remember):
@@ -37,14 +42,19 @@ class CheckCreds(QDialog):
         self.uname = username
         self.pw = password
         self.remember = False if conf.CONFIG['allow_remember'] == '0' else remember
+        self.engines = []                           # Engines being authenticated
+        self.answered = set()                       # Names of the engines that have answered
+        self.failures = {}                          # Engine name -> exception, for engines that could not be authenticated
+        self.cancelled = False                      # Whether the user has cancelled the authentication
         self.setModal(True)
 
         self.initUI()
+        self.authenticate()
 
     def initUI(self):
         """
-            Description: A progress bar, a status message will be shown and a timer() method will
-                         be invoked as part of the authentication process.
+            Description: A progress bar, a status message and a cancel button will be shown while
+                         the authentication is in progress.
             Arguments: None
             Returns: Nothing
         """
@@ -55,73 +65,138 @@ class CheckCreds(QDialog):
         self.status = QLabel(self)
         self.status.setGeometry(30, 75, 200, 20)
 
-        self.timer = QBasicTimer()
-        self.step = 0
+        self.cancelButton = QPushButton(_('cancel'), self)
+        self.cancelButton.setGeometry(155, 105, 75, 25)
+        self.cancelButton.clicked.connect(self.reject)
         
-        self.setGeometry(300, 300, 255, 100)
+        self.setGeometry(300, 300, 255, 140)
         self.center()
         self.setWindowTitle(_('loading'))
         self.show()
 
-        self.timer.start(100, self)
-    
-    def timerEvent(self, e):
+    def authenticate(self):
         """
-            Description: Called periodically as part of the QBasicTimer() object.
-                         Authentication will be handled within this method.
-            Arguments: The event. Won't be used, though.
-            Returns: Nothing, just exits when progress bar reaches 100%
+            Description: Queues the authentication against every configured engine, each one in
+                         a worker thread, so they're authenticated in parallel and the GUI
+                         thread never waits for the network.
+            Arguments: None
+            Returns: Nothing
         """
 
         global conf
 
-        err = QMessageBox()
+        self.engines = [Engine(engine['name'], engine['url'], engine['cafile'], engine['domain']) for engine in conf.CONFIG['engines']]
+
+        # One step per engine, plus storing the credentials
+        self.pbar.setRange(0, len(self.engines) + 1)
+        self.pbar.setValue(0)
         self.status.setText(_('authenticating'))
 
-        if not conf.USERNAME:
-            try:
-                conn = Connection(
-                  url=conf.CONFIG['ovirturl'],
-                  username=self.uname + '@' + conf.CONFIG['ovirtdomain'],
-                  password=self.pw,
-                  ca_file=conf.CONFIG['cafile'],
-                  insecure=True,
-                  timeout=int(conf.CONFIG['conntimeout']),
-                  headers={'filter':True}
-                )
-
-                conn.test(raise_exception=True)
-
-                conf.SOCKOBJ = conn
-                conf.OVIRTCONN = conn.system_service()
-                conf.USERNAME = self.uname
-                conf.PASSWORD = self.pw
-                self.status.setText(_('authenticated_and_storing'))
-                self.step = 49
-            except Error as e:
-                err.critical(self, _('apptitle') + ': ' + _('error'), _('ovirt_connection_error') + ': ' + str(e))
-                self.status.setText(_('error_while_authenticating'))
-                self.step = 100
-        
-        if self.step >= 100:
-            # Authenticacion process has concluded
-            self.timer.stop()
-            self.close()
+        # An engine authenticated after its timeout is logged out at once, it's not used anymore
+        for engine in self.engines:
+            conf.EXECUTOR.submit('authenticate', engine.connect, (self.uname, self.pw, int(conf.CONFIG['conntimeout'])), lambda result, engine=engine: self.engine_answered(engine, None), lambda e, engine=engine: self.engine_answered(engine, e), lambda result, engine=engine: engine.close())
+
+    def engine_answered(self, engine, e):
+        """
+            Description: Invoked in the GUI thread once an engine has answered, or its
+                         authentication has timed out.
+            Arguments: 1. engine: The Engine
+                       2. e: The exception raised by the worker, None if the engine was authenticated
+            Returns: Nothing
+        """
+
+        if self.cancelled:
+            # Too late, the user doesn't want to log in anymore
+            engine.close()
             return
-        elif self.step == 50:
-            # Credentials were ok, we check whether we should store them for further uses
-            if self.remember:
-                self.status.setText(_('storing_credentials'))
-                with os.fdopen(os.open(conf.USERCREDSFILE, os.O_WRONLY | os.O_CREAT, 0o600), 'w') as handle:
-                    handle.write('[credentials]\nusername=%s\npassword=%s' % (self.uname, encode(self.pw, 'rot_13')))
-                    handle.close()
-                self.step = 99
+
+        self.answered.add(engine.name)
+        if e is not None:
+            self.failures[engine.name] = e
+        else:
+            # The VM list is fetched meanwhile, so the board is ready as soon as it's shown
+            engine.start_listing()
+        self.pbar.setValue(len(self.answered))
+
+        if len(self.answered) == len(self.engines):
+            self.authenticated()
+
+    def error_message(self, e):
+        """
+            Description: Returns the text shown to the user for an authentication error.
+            Arguments: The exception raised by the worker
+            Returns: The error message, escaped as it's shown as rich text
+        """
+
+        if isinstance(e, OperationTimeout):
+            return _('operation_timed_out')
+        return escape(str(e))
+
+    def authenticated(self):
+        """
+            Description: Called once every engine has answered. If no engine could be authenticated,
+                         the error is shown. Otherwise, the session is set up with the engines that
+                         could, and the credentials are stored if the user asked for it.
+            Arguments: None
+            Returns: Nothing, just closes the dialog.
+        """
+
+        global conf
+
+        err = QMessageBox()
+        self.cancelButton.setDisabled(True)
+
+        # Engines that timed out are logged out when they answer, see authenticate
+        for engine in self.engines:
+            if engine.name in self.failures:
+                engine.close()
+
+        if len(self.failures) == len(self.engines):
+            if len(self.engines) == 1:
+                errmsg = self.error_message(self.failures[self.engines[0].name])
             else:
-                self.status.setText(_('successfully_authenticated'))
-                self.step = 99
-            
-        self.step = self.step + 1
-        self.pbar.setValue(self.step)
+                errmsg = '<br>'.join('<b>%s</b>: %s' % (engine.name, self.error_message(self.failures[engine.name])) for engine in self.engines)
+            self.status.setText(_('error_while_authenticating'))
+            err.critical(self, _('apptitle') + ': ' + _('error'), _('ovirt_connection_error') + ': ' + errmsg)
+            self.close()
+            return
+
+        if self.failures:
+            # The board will just show the VMs of the engines that could be authenticated
+            err.warning(self, _('apptitle') + ': ' + _('warning'), _('engines_unavailable') + ':<br>' + '<br>'.join('<b>%s</b>: %s' % (engine.name, self.error_message(self.failures[engine.name])) for engine in self.engines if engine.name in self.failures))
+
+        conf.ENGINES = dict((engine.name, engine) for engine in self.engines if engine.name not in self.failures)
+        conf.USERNAME = self.uname
+        conf.PASSWORD = self.pw
+
+        # Credentials were ok, we check whether we should store them for further uses
+        if self.remember:
+            self.status.setText(_('storing_credentials'))
+            with os.fdopen(os.open(conf.USERCREDSFILE, os.O_WRONLY | os.O_CREAT, 0o600), 'w') as handle:
+                handle.write('[credentials]\nusername=%s\npassword=%s' % (self.uname, encode(self.pw, 'rot_13')))
+                handle.close()
+        else:
+            self.status.setText(_('successfully_authenticated'))
+        self.pbar.setValue(self.pbar.maximum())
+
+        self.close()
+
+    def reject(self):
+        """
+            Description: Invoked when the user clicks on the cancel button, or closes the dialog.
+                         If the authentication is still in progress, it's cancelled: The engines
+                         that have already answered are logged out, and the ones that haven't
+                         will be once they do.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        if not self.cancelled and len(self.answered) < len(self.engines):
+            self.cancelled = True
+            for engine in self.engines:
+                if engine.name in self.answered:
+                    engine.close()
+        QDialog.reject(self)
 
     def center(self):
         """
@@ -210,10 +285,8 @@ class Credentials(QDialog):
         self.setFixedSize(400, 150)
 
         # Keys image
-        filename = 'imgs/credentials.png'
-        image = QImage(filename)
         imageLabel = QLabel()
-        imageLabel.setPixmap(QPixmap.fromImage(image))
+        imageLabel.setPixmap(get_pixmap('credentials'))
         imageLabel.setAlignment(Qt.AlignCenter)
 
         # Labels for both username and password
@@ -264,7 +337,7 @@ class Credentials(QDialog):
 
         self.setModal(True)
         self.center()
-        self.setWindowIcon(QIcon(IMGDIR + 'credentials.png'))
+        self.setWindowIcon(QIcon(get_pixmap('credentials')))
         self.setWindowTitle(_('apptitle') + ': ' + _('credentials'))
         self.show()
 
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+import threading
+from time import monotonic
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
+from restsession import RestSession, RestError
+from statusengine import StatusEngine
+from consolecache import ConsoleCache
+from pollscheduler import PollScheduler
+import vmlisting
+from ovirtsdk4 import Connection, Error
+
+class EngineStats:
+    """
+        Request counters of an oVirt engine, so a slow or failing engine can be spotted
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0                           # Requests sent to the engine
+        self.errors = 0                             # Requests that failed
+        self.lasterror = None                       # Message of the last error
+        self.totaltime = 0.0                        # Sum of the latencies, in seconds
+        self.maxtime = 0.0                          # Highest latency, in seconds
+        self.lasttime = 0.0                         # Latency of the last request, in seconds
+        self.mintime = None                         # Lowest latency of a successful request, in seconds
+
+    def record(self, elapsed, error=None):
+        """
+            Description: Accounts for one request.
+            Arguments: 1. elapsed: Seconds the request took
+                       2. error: The exception raised by the request, if any
+            Returns: Nothing
+        """
+
+        with self.lock:
+            self.requests += 1
+            self.totaltime += elapsed
+            self.maxtime = max(self.maxtime, elapsed)
+            self.lasttime = elapsed
+            if error is not None:
+                self.errors += 1
+                self.lasterror = str(error)
+            elif self.mintime is None or elapsed < self.mintime:
+                self.mintime = elapsed
+
+    @contextmanager
+    def measure(self):
+        """
+            Description: Accounts for the request(s) sent within a 'with' block.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        start = monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.record(monotonic() - start, e)
+            raise
+        self.record(monotonic() - start)
+
+    def average(self):
+        """
+            Description: Returns the average latency.
+            Arguments: None
+            Returns: The average latency in seconds, 0 if no request has been sent yet
+        """
+
+        with self.lock:
+            return self.totaltime / self.requests if self.requests else 0.0
+
+    def rtt(self):
+        """
+            Description: Estimates the round trip time to the engine as the lowest latency seen, which
+                         is the one least inflated by the size of the answer or the engine load.
+            Arguments: None
+            Returns: The estimate in seconds, None if no request has succeeded yet
+        """
+
+        with self.lock:
+            return self.mintime
+
+class Engine:
+    """
+        This class holds everything related to one oVirt engine: its settings, the SDK connection,
+        the raw REST session, and the status sweeper and console cache of its VMs. Several engines
+        can be configured (multitenant mode), their VMs are shown together on the board.
+    """
+
+    def __init__(self, name, url, cafile, domain):
+        self.name = name                            # Name shown on the board, unique per engine
+        self.url = url
+        self.cafile = cafile
+        self.domain = domain
+        self.sockobj = None                         # ovirtsdk4 Connection
+        self.ovirtconn = None                       # System service of the connection
+        self.restsession = None                     # RestSession for raw requests
+        self.stats = EngineStats()
+        self.statusengine = StatusEngine(self)
+        self.consolecache = ConsoleCache(self)
+        self.scheduler = PollScheduler()
+        self.listing = None                         # (vms, vmpools) futures of a listing started ahead, see start_listing
+        self.lock = threading.Lock()
+
+    def connect(self, username, password, timeout):
+        """
+            Description: Authenticates to the engine. Runs in a worker thread.
+            Arguments: 1. username: The user name, without domain
+                       2. password: The password
+                       3. timeout: Connection timeout in seconds
+            Returns: Nothing. ovirtsdk4.Error is raised if the authentication fails, the connection
+                     is closed then.
+        """
+
+        conn = Connection(
+          url=self.url,
+          username=username + '@' + self.domain,
+          password=password,
+          ca_file=self.cafile,
+          insecure=True,
+          timeout=timeout,
+          headers={'filter':True}
+        )
+
+        with self.stats.measure():
+            try:
+                conn.test(raise_exception=True)
+            except Exception:
+                # The SSO session may have been opened before the failure
+                try:
+                    conn.close()
+                except Error:
+                    pass
+                raise
+
+        self.sockobj = conn
+        self.ovirtconn = conn.system_service()
+        self.restsession = RestSession(
+          url=self.url,
+          connection=conn,
+          cafile=self.cafile,
+          timeout=timeout,
+          stats=self.stats
+        )
+
+    def listing_futures(self):
+        """
+            Description: Starts fetching the VM and VmPool lists concurrently.
+            Arguments: None
+            Returns: A tuple of futures (vms, vmpools) whose results are lists of VmRecord
+        """
+
+        pool = ThreadPoolExecutor(max_workers=2)
+        futures = (pool.submit(vmlisting.list_vms, self), pool.submit(vmlisting.list_vmpools, self))
+        pool.shutdown(wait=False)
+        return futures
+
+    def start_listing(self):
+        """
+            Description: Starts fetching the VM and VmPool lists without waiting for them. It's called
+                         as soon as the engine has been authenticated, so the lists are on their way
+                         while the credentials are stored and the login dialog is dismissed.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        futures = self.listing_futures()
+        with self.lock:
+            self.listing = futures
+
+    def list_all(self):
+        """
+            Description: Gets the VM and VmPool lists. The listing started by start_listing is used if
+                         any (just once), otherwise both lists are fetched now, concurrently. Runs in
+                         a worker thread.
+            Arguments: None
+            Returns: A tuple (vms, vmpools) of VmRecord lists. ovirtsdk4.Error is raised on connection problems.
+        """
+
+        with self.lock:
+            futures, self.listing = self.listing, None
+        if futures is None:
+            futures = self.listing_futures()
+
+        vms, vmpools = futures
+        return vms.result(), vmpools.result()
+
+    def vm_action(self, vmid, action):
+        """
+            Description: Asks oVirt to perform an action on a VM. The request is sent on the pooled
+                         connections of the REST session rather than on the SDK connection, which
+                         sends one request at a time, so actions on several VMs can run concurrently.
+                         Connection and HTTP errors are converted to ovirtsdk4.Error, as the SDK
+                         would raise.
+            Arguments: 1. vmid: The VM UUID in oVirt-format
+                       2. action: The action name (i.e, 'start' or 'shutdown')
+            Returns: Nothing
+        """
+
+        path = '/vms/%s/%s' % (vmid, action)
+        try:
+            self.restsession.post(path, b'<action/>', {'Content-Type': 'application/xml', 'Accept': 'application/xml'})
+        except RestError as e:
+            raise Error('%s: %s' % (path, e.reason), code=e.code)
+        except (HTTPException, OSError) as e:
+            raise Error('%s: %s' % (path, e))
+
+    def close(self):
+        """
+            Description: Logs out from the engine.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        with self.lock:
+            self.listing = None
+        if self.sockobj:
+            try:
+                self.sockobj.close()
+            except Error:
+                pass
+            self.restsession.close()
+        self.sockobj = None
+        self.ovirtconn = None
+        self.restsession = None
+
+def connect_engines(engines, username, password, timeout):
+    """
+        Description: Authenticates to several engines in parallel, so the slowest engine
+                     determines the login time instead of the sum of all of them.
+        Arguments: 1. engines: List of Engine objects
+                   2. username: The user name, without domain
+                   3. password: The password
+                   4. timeout: Connection timeout in seconds
+        Returns: A dict of engine name -> exception for the engines that could not be authenticated.
+    """
+
+    failures = {}
+    with ThreadPoolExecutor(max_workers=len(engines)) as pool:
+        futures = [(engine, pool.submit(engine.connect, username, password, timeout)) for engine in engines]
+        for engine, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failures[engine.name] = e
+    return failures
@@ -18,15 +18,37 @@ from os.path import expanduser
 class Configs:
     CONFIGFILE='settings.conf'
     USERCREDSFILE=expanduser('~') + '/.ovirtclient'
+    SNAPSHOTDIR=expanduser('~') + '/.ovirtclient-snapshots'
     USERNAME=None
     PASSWORD=None
-    OVIRTCONN=None
+    ENGINES={}
+    EXECUTOR=None
+    CONNECTTIMES=None
     CONFIG={}
 conf = Configs()
 
 IMGDIR = 'imgs/'
 UPDATESLEEPINTERVAL = 5
+FASTPOLLINTERVAL = 1
+POLLBACKOFF = 2
+HIDDENPOLLFACTOR = 4
+MAXERRORINTERVAL = 300
+POLLJITTER = 0.1
+VMWATCHINTERVAL = 1
+VMWATCHTIMEOUT = 180
+EVENTSBATCH = 100
+CONSOLEPREFETCHBATCH = 20
+VIEWERHISTORY = 50
+VIEWERCLOSETIMEOUT = 2000
+VIEWERFILEGRACE = 10
+CONNECTHISTORY = 200
+LATENCYBUCKETS = (100, 250, 500, 1000, 2500, 5000)
 MAXWIDTH = 500
 MAXHEIGHT = 600
 BACKGROUNDCSS = 'background: black; color: white'
-STANDARDCELLCSS = 'background: #1a1a1a; padding: 5px;'
+CELLCOLOR = '#1a1a1a'
+SELECTEDCELLCOLOR = '#203a56'
+TEXTCOLOR = 'white'
+CELLPADDING = 5
+ROWHEIGHT = 85
+STALEOPACITY = 0.4
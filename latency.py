@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+# Timings of the connect path, from the click on 'connect' until the viewer process is
+# running. Each connection is logged as a [LATENCY] line holding a JSON object, so client
+# logs can be aggregated, and the last ones are kept in memory for the About dialog.
+
+import json
+from math import ceil
+from time import monotonic
+from collections import deque
+from globalconf import CONNECTHISTORY, LATENCYBUCKETS
+
+# Stages of a connection, in order:
+#   queue: Waiting for a worker
+#   ticket: Getting the console ticket (usually prefetched)
+#   vvfetch: Downloading the console file
+#   vvwrite: Rewriting the console file and storing it in memory
+#   dispatch: Handing the console file back to the GUI thread
+#   spawn: Starting remote-viewer, until its process is running
+CONNECTSTAGES = ('queue', 'ticket', 'vvfetch', 'vvwrite', 'dispatch', 'spawn')
+
+class ConnectTiming:
+    """
+        Monotonic timestamps of one connection. It's handed from the GUI thread to the
+        worker and back, so only one thread marks it at a time.
+    """
+
+    def __init__(self, vmname, engine):
+        self.vmname = vmname
+        self.engine = engine                        # Engine name
+        self.profile = None                         # Name of the viewer profile, if any
+        self.started = monotonic()                  # When the user clicked on 'connect'
+        self.last = self.started                    # When the last stage ended
+        self.stages = {}                            # Stage -> seconds, stages run more than once are added up
+
+    def mark(self, stage):
+        """
+            Description: Ends a stage, which began when the previous one ended.
+            Arguments: The stage name, one of CONNECTSTAGES
+            Returns: Nothing
+        """
+
+        now = monotonic()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last
+        self.last = now
+
+    def elapsed(self, stage):
+        """
+            Description: Returns the time spent in a stage.
+            Arguments: The stage name, or 'total' for the whole connection
+            Returns: Seconds, 0 if the stage was not reached
+        """
+
+        if stage == 'total':
+            return self.last - self.started
+        return self.stages.get(stage, 0.0)
+
+    def logline(self, outcome):
+        """
+            Description: Builds the log line of the connection.
+            Arguments: The outcome: 'ok', 'error' or 'viewer_failed'
+            Returns: The line, '[LATENCY] ' followed by a JSON object with milliseconds per stage
+        """
+
+        record = {'event': 'connect', 'vm': self.vmname, 'engine': self.engine, 'profile': self.profile, 'outcome': outcome}
+        for stage in CONNECTSTAGES + ('total',):
+            record[stage + '_ms'] = round(self.elapsed(stage) * 1000, 1)
+        return '[LATENCY] ' + json.dumps(record)
+
+class LatencyHistogram:
+    """
+        The last successful connections, so their times can be summarized
+    """
+
+    def __init__(self, size=CONNECTHISTORY):
+        self.timings = deque(maxlen=size)           # ConnectTimings, the most recent last
+
+    def __len__(self):
+        return len(self.timings)
+
+    def add(self, timing):
+        """
+            Description: Accounts for a connection, forgetting the oldest one if full.
+            Arguments: The ConnectTiming
+            Returns: Nothing
+        """
+
+        self.timings.append(timing)
+
+    def percentile(self, stage, fraction):
+        """
+            Description: Computes a percentile of a stage (nearest rank).
+            Arguments: 1. stage: The stage name, or 'total'
+                       2. fraction: The percentile, i.e. 0.95
+            Returns: Seconds, 0 if there are no connections
+        """
+
+        values = sorted(timing.elapsed(stage) for timing in self.timings)
+        if not values:
+            return 0.0
+        return values[max(0, ceil(fraction * len(values)) - 1)]
+
+    def buckets(self, stage='total'):
+        """
+            Description: Counts the connections by time spent in a stage.
+            Arguments: The stage name, or 'total'
+            Returns: A list of counts, one per LATENCYBUCKETS bound (in milliseconds) and a last
+                     one for those above all of them
+        """
+
+        counts = [0] * (len(LATENCYBUCKETS) + 1)
+        for timing in self.timings:
+            elapsed = timing.elapsed(stage) * 1000
+            counts[next((i for i, bound in enumerate(LATENCYBUCKETS) if elapsed <= bound), len(LATENCYBUCKETS))] += 1
+        return counts
@@ -17,34 +17,55 @@
 import sys
 import gettext
 import configparser
-import urllib.request
+import shlex
 import threading
-from time import sleep, time
-from base64 import encodestring
-from xml.etree import cElementTree as ET
-from random import randint
-from subprocess import Popen
+from time import sleep, time, monotonic
+from concurrent.futures import ThreadPoolExecutor
 from os import remove, access, X_OK
 from os.path import isfile
-from ssl import SSLContext, PROTOCOL_TLSv1
+from operator import attrgetter
 from globalconf import *
+from urllib.parse import urlparse
+from html import escape
 from credentials import Credentials
+from snapshotcache import snapshot_path, load_snapshot, save_snapshot, remove_snapshot
+from pixmapcache import get_pixmap, preload_pixmaps
+from apiworkers import ApiExecutor, OperationTimeout
+from restsession import RestError
+from vmboard import VmTableModel, VmItemDelegate, COLSTATUS, COLCONNECT
 from about import About
+from viewers import ViewerSupervisor, ViewerFile
+from vvfile import rewrite_vv, VVOVERRIDES
+from profiles import Profile, choose_profile
+from latency import ConnectTiming, LatencyHistogram
+from pollscheduler import STABLESTATUSES
 from version import VERSION
 from ovirtsdk4 import Error
-from PyQt5.QtWidgets import QApplication, QDesktopWidget, QMessageBox, QGridLayout, QLabel, QWidget, QProgressBar, QScrollArea, QVBoxLayout, QAction, QToolBar
-from PyQt5.QtGui import QImage, QPixmap, QIcon
-from PyQt5.QtCore import Qt, QObjectCleanupHandler, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QDesktopWidget, QMessageBox, QGridLayout, QLabel, QWidget, QProgressBar, QVBoxLayout, QAction, QToolBar, QTableView, QHeaderView, QAbstractItemView, QFrame
+from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QEvent, pyqtSignal
 
 class VmData:
     """
-        A simple class whose objects will store (VMid, VMname, VMstatus, VMtype) tuples
+        A simple class whose objects will store (VMengine, VMid, VMname, VMstatus, VMtype, VMos) tuples
     """
 
+    vmengine = None
     vmid = None
     vmname = None
     vmstatus = None
     vmtype = None
+    vmos = None
+    sortkey = None                                  # Position of the row on the board, see set_sortkey
+
+    @property
+    def key(self):
+        """ Board key of the VM. Ids are only unique within an engine. """
+        return (self.vmengine, self.vmid)
+
+    def set_sortkey(self):
+        """ Precomputes the board position: VmPools first, then by casefolded name. Engine and id break ties. """
+        self.sortkey = (self.vmtype != 'vmpool', (self.vmname or '').casefold(), self.vmengine, self.vmid)
 
 class OvirtClient(QWidget):
     """
@@ -56,9 +77,8 @@ class OvirtClient(QWidget):
 
     stopThread = False                              # Sentinel for stopping the Thread execution
     autologoutWarn = False                          # Has the user been warned about autologout yet?
-    openviewer_vms = []                             # Initiated VMs in terms of the viewer
-    updatesignal = pyqtSignal(int, str)             # Signal to update the status icons on status changes
-    reloadsignal = pyqtSignal()                     # Signal to reload the main widget
+    updatesignal = pyqtSignal(object, str)          # Signal to update the status icons on status changes
+    membershipsignal = pyqtSignal(str, object, object, object) # Signal to add or remove VMs and VmPools from the board
     warnlogoutsignal = pyqtSignal()                 # Signal to warn the user about an imminent autologout
     logoutsignal = pyqtSignal(bool)                 # Signal to logout the current user and require credentials again
     lastclick = int(time())                         # Timestamp of the last click. If a timeout policy is defined and
@@ -66,6 +86,24 @@ class OvirtClient(QWidget):
 
     def __init__(self):
         QWidget.__init__(self)
+        self.model = None                           # VmTableModel behind the board, created on the first load
+        self.board_shown = False                    # Whether the first load has concluded
+        self.loading = False                        # Whether a VM list request is in progress
+        self.loadresults = {}                       # Engine name -> (vms, vmpools) or exception of the load in progress
+        self.session = 0                            # Incremented on logout, so answers to a previous session are dropped
+        self.threads = []                           # Background threads using the engines: one per engine plus the VM watches
+        self.stopping = threading.Event()           # Set on logout, so the VM watches stop waiting at once
+        self.refreshing = False                     # Whether the status threads of the session have been started
+        self.windowhidden = False                   # Whether the window is minimized or hidden
+        self.windowactive = True                    # Whether the window has the focus
+        self.viewers = ViewerSupervisor(self)       # Viewers opened by the user
+        self.viewers.exited.connect(self.viewer_exit)
+        self.viewers.launched.connect(self.viewer_launched)
+        self.connecting = {}                        # Board key -> ConnectTiming of the viewers being opened
+        if not conf.EXECUTOR:
+            conf.EXECUTOR = ApiExecutor(conf.CONFIG['api_workers'])
+        if not conf.CONNECTTIMES:
+            conf.CONNECTTIMES = LatencyHistogram()
         self.initUI()
 
     def vm_based_resize(self, vmnum):
@@ -84,13 +122,13 @@ class OvirtClient(QWidget):
         if not vmnum:
             # If user has no machines, resize window to the minimum
             winheight = 150
-            no_machines = QLabel(_('no_vms'))
-            no_machines.setWordWrap(True)
-            no_machines.setAlignment(Qt.AlignCenter)
-            self.grid.addWidget(no_machines, 0, 0)
+            self.no_machines.show()
+            self.table.hide()
             self.setMinimumHeight(winheight)
         else:
             # User has at least one VM
+            self.no_machines.hide()
+            self.table.show()
             if vmnum > 5:
                 # More than 5 means resizing the window to the maximum
                 winheight = MAXHEIGHT
@@ -131,88 +169,43 @@ class OvirtClient(QWidget):
             Returns: Nothing
         """
 
-        global IMGDIR, conf
+        global conf
 
         self.toolBar = QToolBar(self)
 
-        refreshAction = QAction(QIcon(IMGDIR + 'refresh.png'), _('refresh'), self)
+        refreshAction = QAction(QIcon(get_pixmap('refresh')), _('refresh'), self)
         refreshAction.setShortcut('Ctrl+R')
         refreshAction.triggered.connect(self.refresh_grid)
         self.toolBar.addAction(refreshAction)
-        
-        self.forgetCredsAction = QAction(QIcon(IMGDIR + 'forget.png'), _('forget_credentials'), self)
+
+        powerOnAction = QAction(QIcon(get_pixmap('up')), _('power_on_selected'), self)
+        powerOnAction.setShortcut('Ctrl+U')
+        powerOnAction.triggered.connect(lambda: self.bulk_change_status('down'))
+        self.toolBar.addAction(powerOnAction)
+
+        shutDownAction = QAction(QIcon(get_pixmap('down')), _('shut_down_selected'), self)
+        shutDownAction.setShortcut('Ctrl+D')
+        shutDownAction.triggered.connect(lambda: self.bulk_change_status('up'))
+        self.toolBar.addAction(shutDownAction)
+
+        self.forgetCredsAction = QAction(QIcon(get_pixmap('forget')), _('forget_credentials'), self)
         self.forgetCredsAction.setShortcut('Ctrl+F')
         self.forgetCredsAction.triggered.connect(self.forget_creds)
         if not isfile(conf.USERCREDSFILE):
             self.forgetCredsAction.setDisabled(True)
         self.toolBar.addAction(self.forgetCredsAction)
 
-        aboutAction = QAction(QIcon(IMGDIR + 'about.png'), _('about'), self)
+        aboutAction = QAction(QIcon(get_pixmap('about')), _('about'), self)
         aboutAction.setShortcut('Ctrl+I')
         aboutAction.triggered.connect(self.about)
         self.toolBar.addAction(aboutAction)
 
-        exitAction = QAction(QIcon(IMGDIR + 'exit.png'), _('exit'), self)
+        exitAction = QAction(QIcon(get_pixmap('exit')), _('exit'), self)
         exitAction.setShortcut('Ctrl+Q')
         exitAction.triggered.connect(self.quit_button)
         self.toolBar.addAction(exitAction)
 
-        self.grid.addWidget(self.toolBar, 0, 3, Qt.AlignRight)
-
-    def make_button(self, filename, tooltip, alignment=Qt.AlignCenter):
-        """
-            Description: Creates a QLabel which will contain an image and will
-                         simulate a button. No associated text will be shown.
-            Arguments: 1. filename: The filename of the icon/image to show 
-                       2. tooltip: Some text to show as a tooltip to the image
-                       3. alignment: Alignment of the button (center by default)
-            Returns: The created QLabel button
-        """
-
-        global STANDARDCELLCSS, IMGDIR
-
-        filepath = '%s%s%s' % (IMGDIR, filename, '.png')
-        icon = QImage(filepath)
-        image = QLabel()
-        image.setToolTip('<span style="color:#B9B900">%s</span>' % (tooltip))
-        image.setStyleSheet(STANDARDCELLCSS)
-        image.setPixmap(QPixmap.fromImage(icon))
-        image.setAlignment(alignment)
-
-        return image
-
-    def compare_vms(self, vm1, vm2):
-        """
-            Description: VM list will be sorted by names. This method is the comparison
-                         method for two VMs. We just sort them alphabetically.
-            Arguments: Two VMs (oVirt VM objects)
-            Returns: -1, 0 or 1 depending on the name-based sorting
-        """
-
-        if vm1.name.lower() < vm2.name.lower():
-            return -1
-        if vm1.name.lower() == vm2.name.lower():
-            return 0
-        return 1
-
-    def p22p3_compare_vms(self, cmpfunct):
-        """ Wrapper for Python 2 -> 3 conversion for the old cmp= method of sorted()"""
-        class K:
-            def __init__(self, obj, *args):
-                self.obj = obj
-            def __lt__(self, other):
-                return cmpfunct(self.obj, other.obj) < 0
-            def __gt__(self, other):
-                return cmpfunct(self.obj, other.obj) > 0
-            def __eq__(self, other):
-                return cmpfunct(self.obj, other.obj) == 0
-            def __le__(self, other):
-                return cmpfunct(self.obj, other.obj) <= 0
-            def __ge__(self, other):
-                return cmpfunct(self.obj, other.obj) >= 0
-            def __ne__(self, other):
-                return cmpfunct(self.obj, other.obj) != 0
-        return K
+        self.grid.addWidget(self.toolBar, 0, 1, Qt.AlignRight)
 
     def current_vm_status(self, vmstatus):
         """
@@ -269,12 +262,12 @@ class OvirtClient(QWidget):
 
         return rettxt
 
-    def change_status(self, rowid):
+    def change_status(self, key):
         """
             Description: If the user clicks on the column which determines VM's status, we'll allow them
                          to change VM's status. This method shows a confirmation dialog and if accepted,
                          it will be notified to oVirt.
-            Arguments: The row id that has been clicked. This relationship is stored using the VmData class.
+            Arguments: The board key of the row that has been clicked. This relationship is stored using the VmData class.
             Returns: Nothing
         """
 
@@ -282,7 +275,7 @@ class OvirtClient(QWidget):
 
         self.lastclick = int(time())         # Last click timestamp update
 
-        curvmstatus = self.vmdata[rowid].vmstatus
+        curvmstatus = self.vmdata[key].vmstatus
         if curvmstatus != 'up' and curvmstatus != 'down':
             QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('vm_in_unchangeable_status'))
             return
@@ -290,69 +283,176 @@ class OvirtClient(QWidget):
         reply = QMessageBox.question(None, _('apptitle') + ': ' + _('confirm'), '%s <b>%s</b>. %s: <b>%s</b>.' % (_('current_vm_status'), self.current_vm_status(curvmstatus), _('confirm_vm_status_change'), self.toggle_vm_action(curvmstatus)), QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            try:
-                vms_service = conf.OVIRTCONN.vms_service()
-                vm = vms_service.list(search='id=%s' % (self.vmdata[rowid].vmid))[0]
-            except Error:
-                QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('unexpected_connection_drop'))
-                quit()
+            conf.EXECUTOR.submit('change_status', self.power_action, (conf.ENGINES[key[0]], key[1], curvmstatus), lambda result: self.power_action_done(key, result), self.power_action_failed)
 
-            if curvmstatus == 'up':
-                try:
-                    vm_service = vms_service.vm_service(id=self.vmdata[rowid].vmid)
-                    vm_service.shutdown()
-                    QMessageBox.information(None, _('apptitle') + ': ' + _('success'), _('shutting_down_vm'))
-                except Error:
-                    QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('vm_in_unchangeable_status'))
-            if curvmstatus == 'down':
-                try:
-                    vm_service = vms_service.vm_service(id=self.vmdata[rowid].vmid)
-                    vm_service.start()
-                    QMessageBox.information(None, _('apptitle') + ': ' + _('success'), _('powering_up_vm'))
-                except Error:
-                    QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('vm_in_unchangeable_status'))
+    def power_action(self, engine, vmid, curvmstatus):
+        """
+            Description: Runs in a worker thread. Asks oVirt to shut down the VM if it's up, or to
+                         power it on if it's down.
+            Arguments: 1. engine: The Engine the VM belongs to.
+                       2. vmid: The VM UUID in oVirt-format.
+                       3. curvmstatus: The status of the VM when the user clicked on it.
+            Returns: The status the VM was in, so the right message can be shown.
+        """
+
+        if curvmstatus == 'up':
+            engine.vm_action(vmid, 'shutdown')
+        if curvmstatus == 'down':
+            engine.vm_action(vmid, 'start')
+        return curvmstatus
 
-    def get_viewer_ticket(self, vmid):
+    def power_action_done(self, key, curvmstatus):
         """
-            Description: Connecting to the machine involves two steps, the first one is obtaining a 'ticket' string
-                         for the connection request. This is done making a request to the oVirt API and then parsing
-                         the resulting XML document to get the ticket hash. Also, the request may return more than
-                         one ticket: One for SPICE and another for VNC. In this case, we'll return the one that
-                         the user defined in the settings file (SPICE as default).
-            Arguments: The VM UUID in oVirt-format
-            Returns: The ticket hash string
+            Description: Invoked in the GUI thread once oVirt has accepted the power action. The VM
+                         is watched until it's up or down, so its icon changes as soon as it does.
+            Arguments: 1. key: The board key of the VM.
+                       2. curvmstatus: The status the VM was in before the action.
+            Returns: Nothing
         """
 
         global conf
 
-        req = urllib.request.Request('%s/%s/%s/%s' % (conf.CONFIG['ovirturl'], 'vms', vmid, 'graphicsconsoles'))
-        # Python 2 -> 3 conversion: encodestring expects a byte-like string, not str
-        base64str = encodestring(('%s:%s' % (conf.USERNAME + '@' + conf.CONFIG['ovirtdomain'], conf.PASSWORD)).encode()).decode().replace('\n', '')
-        req.add_header('Authorization', 'Basic ' + base64str)
-        req.add_header('filter', 'true')
+        engine = conf.ENGINES.get(key[0])
+        if engine:
+            thread = threading.Thread(target=self.watch_vm, args=(engine, key[1], 'down' if curvmstatus == 'up' else 'up', curvmstatus))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
 
-        unverified_ctxt = SSLContext(PROTOCOL_TLSv1)
-        tickethash = urllib.request.urlopen(req, context=unverified_ctxt).read()
-        xmlcontent = ET.fromstring(tickethash)
+        if curvmstatus == 'up':
+            QMessageBox.information(None, _('apptitle') + ': ' + _('success'), _('shutting_down_vm'))
+        if curvmstatus == 'down':
+            QMessageBox.information(None, _('apptitle') + ': ' + _('success'), _('powering_up_vm'))
 
-        ticket = None
-        for data in xmlcontent.findall('graphics_console'):
-            proto = data.findall('protocol')[0]
+    def power_action_failed(self, e):
+        """
+            Description: Invoked in the GUI thread if the power action could not be performed.
+            Arguments: The exception raised by the worker.
+            Returns: Nothing
+        """
 
-            if proto.text.lower() == conf.CONFIG['prefproto'].lower():
-                return data.get('id')
-            else:
-                ticket = data.get('id')
+        if isinstance(e, OperationTimeout):
+            QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('operation_timed_out'))
+        else:
+            QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('vm_in_unchangeable_status'))
 
-        return ticket
+    def selected_vms(self):
+        """
+            Description: Returns the VMs selected on the board, VmPools are left out.
+            Arguments: None
+            Returns: A list of VmData in board order, empty while the board is stale
+        """
+
+        if self.model.stale:
+            return []
+
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        return [self.model.vms[row] for row in rows if self.model.vms[row].vmtype == 'vm']
+
+    def bulk_change_status(self, curvmstatus):
+        """
+            Description: Powers on (or shuts down) all the selected VMs at once. The selected VMs
+                         which are not down (or up) are skipped. A single confirmation is asked.
+            Arguments: The status the VMs must be in: 'down' to power them on, 'up' to shut them down.
+            Returns: Nothing
+        """
+
+        global conf
+
+        self.lastclick = int(time())         # Last click timestamp update
+
+        vmds = [vmd for vmd in self.selected_vms() if vmd.vmstatus == curvmstatus]
+        if not vmds:
+            QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('no_vms_selected_for_action'))
+            return
+
+        names = ', '.join(escape(vmd.vmname) for vmd in vmds)
+        reply = QMessageBox.question(None, _('apptitle') + ': ' + _('confirm'), '%s: <b>%s</b> (%d): %s' % (_('confirm_bulk_status_change'), self.toggle_vm_action(curvmstatus), len(vmds), names), QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+
+        if reply == QMessageBox.Yes:
+            vms = [(conf.ENGINES[vmd.vmengine], vmd.vmid, vmd.vmname) for vmd in vmds if vmd.vmengine in conf.ENGINES]
+            conf.EXECUTOR.submit('bulk_change_status', self.bulk_power_action, (vms, curvmstatus), self.bulk_power_action_done, self.power_action_failed)
 
-    def store_vv_file(self, vmid, ticket):
+    def bulk_power_action(self, vms, curvmstatus):
+        """
+            Description: Runs in a worker thread. Sends the power action of every VM concurrently,
+                         at most app->bulk_workers at a time, and waits for all of them.
+            Arguments: 1. vms: List of (Engine, VM UUID, VM name) tuples.
+                       2. curvmstatus: The status the VMs were in when the user chose the action.
+            Returns: A tuple (results, elapsed, curvmstatus), results being a list of (Engine, VM name,
+                     exception) tuples in the same order as vms, the exception being None on success,
+                     and elapsed the number of seconds all the actions took.
+        """
+
+        global conf
+
+        start = monotonic()
+        results = []
+        with ThreadPoolExecutor(max_workers=min(conf.CONFIG['bulk_workers'], len(vms))) as pool:
+            futures = [(engine, vmname, pool.submit(self.power_action, engine, vmid, curvmstatus)) for engine, vmid, vmname in vms]
+            for engine, vmname, future in futures:
+                try:
+                    future.result()
+                    results.append((engine, vmname, None))
+                except Exception as e:
+                    results.append((engine, vmname, e))
+        return results, monotonic() - start, curvmstatus
+
+    def bulk_power_action_done(self, result):
+        """
+            Description: Invoked in the GUI thread once all the power actions have been answered.
+                         A single summary with the result of each VM is shown. Instead of watching
+                         each VM on its own, the status threads of the engines are woken up: the
+                         VMs are in a transitional status now, so they are refreshed every second
+                         with one request per engine until they're done.
+            Arguments: The (results, elapsed, curvmstatus) tuple returned by bulk_power_action.
+            Returns: Nothing
+        """
+
+        results, elapsed, curvmstatus = result
+
+        for engine in set(engine for engine, vmname, e in results if e is None):
+            engine.scheduler.wake()
+
+        failed = [(vmname, e) for engine, vmname, e in results if e is not None]
+        summary = _('bulk_action_summary') % (self.toggle_vm_action(curvmstatus), len(results) - len(failed), len(results), elapsed)
+        lines = ['<b>%s</b>: %s' % (escape(vmname), escape(str(e))) for vmname, e in failed]
+        lines += ['<b>%s</b>: %s' % (escape(vmname), _('success')) for engine, vmname, e in results if e is None]
+
+        if failed:
+            QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), summary + '<br><br>' + '<br>'.join(lines))
+        else:
+            QMessageBox.information(None, _('apptitle') + ': ' + _('success'), summary + '<br><br>' + '<br>'.join(lines))
+
+    def get_viewer_ticket(self, engine, vmid):
+        """
+            Description: Connecting to the machine involves two steps, the first one is obtaining a 'ticket' string
+                         for the connection request. The console list of the running VMs is usually prefetched
+                         (see ConsoleCache), otherwise it's requested to the oVirt API now. Also, there may be more
+                         than one ticket: One for SPICE and another for VNC. In this case, we'll return the one that
+                         the user defined in the settings file (SPICE as default).
+            Arguments: 1. engine: The Engine the VM belongs to
+                       2. vmid: The VM UUID in oVirt-format
+            Returns: The ticket hash string
+        """
+
+        global conf
+
+        return engine.consolecache.ticket(vmid, conf.CONFIG['prefproto'])
+
+    def store_vv_file(self, engine, vmid, ticket, profile=None, timing=None):
         """
             Description: Connecting to the machine involves two steps, the second one is obtaining a 'vv' file with the
                          connection parameters, which we can later pipe to virt-viewer and the connection will be opened.
-            Arguments: 1. vmid: The VM UUID in oVirt-format.
-                       2. ticket: The ticket obtained in the first step (method get_viewer_ticket)
-            Returns: The temporary filename with all the parameters to connect to the machine (piped to virt-viewer)
+                         The [vv] settings and those of the profile are applied to it, and it's kept in
+                         memory, see ViewerFile.
+            Arguments: 1. engine: The Engine the VM belongs to.
+                       2. vmid: The VM UUID in oVirt-format.
+                       3. ticket: The ticket obtained in the first step (method get_viewer_ticket)
+                       4. profile: The Profile of the viewer, if any
+                       5. timing: The ConnectTiming of the connection, if any
+            Returns: The ViewerFile with all the parameters to connect to the machine (piped to virt-viewer)
+                     RestError is propagated if the request fails, VvError if the file is not valid.
         """
 
         global conf
@@ -360,118 +460,250 @@ class OvirtClient(QWidget):
         if not ticket:
             return False
 
-        req = urllib.request.Request('%s/%s/%s/%s/%s' % (conf.CONFIG['ovirturl'], 'vms', vmid, 'graphicsconsoles', ticket))
-        # Python 2 -> 3 conversion: encodestring expects a byte-like string, not str
-        base64str = encodestring(('%s:%s' % (conf.USERNAME + '@' + conf.CONFIG['ovirtdomain'], conf.PASSWORD)).encode()).decode().replace('\n', '')
-        req.add_header('Authorization', 'Basic ' + base64str)
-        req.add_header('Content-Type', 'application/xml')
-        req.add_header('Accept', 'application/x-virt-viewer')
-        req.add_header('filter', 'true')
+        contents = engine.restsession.get('/%s/%s/%s/%s' % ('vms', vmid, 'graphicsconsoles', ticket), {'Content-Type': 'application/xml', 'Accept': 'application/x-virt-viewer'})
+        if timing:
+            timing.mark('vvfetch')
+
+        overrides = conf.CONFIG['vv_overrides']
+        if profile:
+            overrides = dict(overrides)
+            overrides.update(profile.vv)
+
+        vvfile = ViewerFile(rewrite_vv(contents, overrides))
+        if timing:
+            timing.mark('vvwrite')
+        return vvfile
+
+    def viewer_exit(self, session):
+        """
+            Description: Invoked in the GUI thread when a viewer exits. The 'connect' icon is restored,
+                         and the statuses of the engine are refreshed at once, as the user may have
+                         shut down the VM from within the viewer.
+            Arguments: The ViewerSession of the viewer
+            Returns: Nothing
+        """
 
-        unverified_ctxt = SSLContext(PROTOCOL_TLSv1)
-        try:
-            contents = urllib.request.urlopen(req, context=unverified_ctxt).read()
-            if conf.CONFIG['fullscreen'] == '1':
-               contents = contents.replace('fullscreen=0', 'fullscreen=1')
-            filename = '/tmp/viewer-' + str(randint(10000, 99999))
-            f = open(filename, 'wb')
-            f.write(contents)
-            f.close()
-
-            return filename
-        except urllib.request.HTTPError as em:
-            QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('unexpected_request_error') + '(' + str(em.code) + '): ' + em.reason + '. ' + _('check_vm_config_updated'))
-            return None
-
-    def viewer_exit(self, vmname):
-        self.openviewer_vms.remove(vmname)         # Remove the VM from the list of opened viewers
-        self.reloadsignal.emit()                   # Enforce a reload signal to update the status icon ASAP
-
-    def create_viewer_thread(self, vmname, filename):
         global conf
 
-        def runInThread(vmname, onExit, popenArgs):
-            viewer = Popen(popenArgs)
-            viewer.wait()
-            onExit(vmname)
-            return
+        timing = self.connecting.pop(session.key, None)
+        if timing:
+            # The viewer exited before running, i.e. remote-viewer could not be executed
+            timing.mark('spawn')
+            print(timing.logline('viewer_failed'), file=sys.stderr)
+
+        if session.error or session.exitcode:
+            print('[WARNING] %s: %s (%s), %.0f s' % (_('viewer_exited_abnormally'), session.vmname, session.error or session.exitcode, session.lifetime), file=sys.stderr)
+
+        if self.model:
+            self.model.refresh_vm(session.key)
+        engine = conf.ENGINES.get(session.key[0])
+        if engine:
+            engine.scheduler.wake()
+
+    def viewer_launched(self, session):
+        """
+            Description: Invoked in the GUI thread when a viewer process is running. This ends the
+                         connection, whose timings are logged and added to conf.CONNECTTIMES.
+            Arguments: The ViewerSession of the viewer
+            Returns: Nothing
+        """
+
+        global conf
+
+        timing = self.connecting.pop(session.key, None)
+        if timing:
+            timing.mark('spawn')
+            print(timing.logline('ok'), file=sys.stderr)
+            conf.CONNECTTIMES.add(timing)
+
+    def open_viewer(self, key, vmname, vvfile, profile):
+        """
+            Description: Opens the viewer of a VM. It's supervised by self.viewers, which calls
+                         viewer_exit when it's closed.
+            Arguments: 1. key: The board key of the VM.
+                       2. vmname: The VM name, used as the viewer title
+                       3. vvfile: The ViewerFile of the VM console
+                       4. profile: The Profile of the viewer, whose arguments are added, if any
+            Returns: Nothing
+        """
+
+        global conf
 
-        thread = threading.Thread(target=runInThread, args=(vmname, self.viewer_exit, [conf.CONFIG['remote_viewer_path'], '-t', vmname, '-f', '--', 'file://%s' % (filename)]))
-        thread.start()
+        arguments = ['-t', vmname, '-f']
+        if profile:
+            arguments += profile.args
+        arguments += ['--', 'file://%s' % (vvfile.path)]
 
-        # Returns immediately after the thread starts
-        return thread
+        self.viewers.start(key, vmname, conf.CONFIG['remote_viewer_path'], arguments, vvfile)
 
-    def connect2machine(self, vmid, vmname):
+    def fetch_viewer_file(self, engine, vmid, profile=None, timing=None):
+        """
+            Description: Runs in a worker thread. Performs both steps needed to connect to the machine.
+            Arguments: 1. engine: The Engine the VM belongs to.
+                       2. vmid: The VM UUID in oVirt-format.
+                       3. profile: The Profile of the viewer, if any
+                       4. timing: The ConnectTiming of the connection, if any
+            Returns: The ViewerFile to pass to virt-viewer, or a falsy value if no ticket was found.
         """
-            Description: Connecting to the machine involves two steps, this method does both and
-                         makes sure everything is ok to call virt-viewer afterwards.
-            Arguments: 1. vmid: The VM UUID in oVirt-format.
+
+        if timing:
+            timing.mark('queue')
+
+        viewer_ticket = self.get_viewer_ticket(engine, vmid)
+        if timing:
+            timing.mark('ticket')
+        try:
+            return self.store_vv_file(engine, vmid, viewer_ticket, profile, timing)
+        except RestError as e:
+            if e.code != 404:
+                raise
+            if timing:
+                timing.mark('vvfetch')
+            # The cached console is gone (i.e, the VM was reconfigured), retry with a fresh one
+            engine.consolecache.invalidate(vmid)
+            viewer_ticket = self.get_viewer_ticket(engine, vmid)
+            if timing:
+                timing.mark('ticket')
+            return self.store_vv_file(engine, vmid, viewer_ticket, profile, timing)
+
+    def connect2machine(self, key, vmname):
+        """
+            Description: Connecting to the machine involves two steps, this method queues both in the
+                         worker pool and calls virt-viewer afterwards if everything is ok. The
+                         performance profile of the viewer is chosen beforehand. Each stage is timed
+                         in the ConnectTiming of the VM, see self.connecting.
+            Arguments: 1. key: The board key of the VM.
                        2. vmname: Just for displaying purposes, the VM name
-            Returns: Nothing. Opens the view-viewer display.
+            Returns: Nothing. Opens the view-viewer display once the worker finishes.
         """
 
-        viewer_ticket = self.get_viewer_ticket(vmid)
-        filename = self.store_vv_file(vmid, viewer_ticket)
+        global conf
+
+        engine = conf.ENGINES[key[0]]
+        profile = choose_profile(conf.CONFIG['profiles'], conf.CONFIG['profile'], conf.USERNAME, vmname, engine.stats.rtt())
+        timing = self.connecting[key]
+        timing.profile = profile.name if profile else None
+
+        conf.EXECUTOR.submit('connect', self.fetch_viewer_file, (engine, key[1], profile, timing), lambda vvfile: self.viewer_file_ready(key, vmname, vvfile, profile), lambda e: self.viewer_file_failed(key, vmname, e), self.discard_viewer_file)
+
+    def viewer_file_ready(self, key, vmname, vvfile, profile):
+        """
+            Description: Invoked in the GUI thread once the viewer file has been stored.
+            Arguments: 1. key: The board key of the VM.
+                       2. vmname: The VM name
+                       3. vvfile: The ViewerFile, or a falsy value if no ticket was found
+                       4. profile: The Profile of the viewer, if any
+            Returns: Nothing
+        """
 
-        if filename:
-            self.create_viewer_thread(vmname, filename)
+        if vvfile:
+            self.connecting[key].mark('dispatch')
+            self.open_viewer(key, vmname, vvfile, profile)
         else:
-            if vmname in self.openviewer_vms:
-                self.openviewer_vms.remove(vmname)         # Remove the VM from the list of opened viewers
+            self.viewer_file_failed(key, vmname, None)
+
+    def discard_viewer_file(self, vvfile):
+        """
+            Description: Invoked in the GUI thread if the viewer file arrives after the connection
+                         timed out. It's released, as it holds the console ticket.
+            Arguments: The ViewerFile, or a falsy value if no ticket was found
+            Returns: Nothing
+        """
+
+        if vvfile:
+            vvfile.close()
+
+    def viewer_file_failed(self, key, vmname, e):
+        """
+            Description: Invoked in the GUI thread if the viewer file could not be obtained.
+            Arguments: 1. key: The board key of the VM.
+                       2. vmname: The VM name
+                       3. e: The exception raised by the worker, if any
+            Returns: Nothing
+        """
+
+        self.viewers.release(key)
+        self.model.refresh_vm(key)
 
+        timing = self.connecting.pop(key)
+        timing.mark('dispatch')
+        print(timing.logline('error'), file=sys.stderr)
+
+        if isinstance(e, RestError):
+            QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('unexpected_request_error') + '(' + str(e.code) + '): ' + e.reason + '. ' + _('check_vm_config_updated'))
+        elif isinstance(e, OperationTimeout):
+            QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('operation_timed_out'))
+        else:
             QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('no_viewer_file'))
 
-    def connect(self, rowid):
+    def connect(self, key):
         """
             Description: Whenever the user clicks on the 'connect' row, this method will make
                          sure the VM status is up and only then will call the connect2machine method.
-            Arguments: The row id that has been clicked. This relationship is stored using the VmData class.
+            Arguments: The board key of the row that has been clicked. This relationship is stored using the VmData class.
             Returns: Nothing
         """
 
         self.lastclick = int(time())         # Last click timestamp update
 
-        vmid = self.vmdata[rowid].vmid
-        vmname = self.vmdata[rowid].vmname
-        vmstatus = self.vmdata[rowid].vmstatus
+        vmname = self.vmdata[key].vmname
+        vmstatus = self.vmdata[key].vmstatus
 
         if vmstatus != 'up':
             QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('cannot_connect_if_vm_not_up'))
             return
 
-        if vmname in self.openviewer_vms:
+        if not self.viewers.reserve(key):
             QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('cannot_open_more_viewer_sessions'))
             return
 
-        self.openviewer_vms.append(vmname)
-        self.refresh_grid()                  # Enforce a dashboard reload to make the icon refresh
+        self.model.refresh_vm(key)           # Make the icon refresh
 
-        self.connect2machine(vmid, vmname)
+        self.connecting[key] = ConnectTiming(vmname, key[0])
+        self.connect2machine(key, vmname)
     
-    def acquire_vm_from_vmpool(self, rowid):
+    def acquire_vm_from_vmpool(self, key):
         """
             Description: A machine will be acquired by a user if they click on the icon of a VmPool
-            Arguments: The row id that has been clicked. This relationship is stored using the VmData class.
+            Arguments: The board key of the row that has been clicked. This relationship is stored using the VmData class.
             Returns: Nothing
         """
         
         self.lastclick = int(time())         # Last click timestamp update
 
-        vmtype = self.vmdata[rowid].vmtype
+        vmtype = self.vmdata[key].vmtype
 
         if vmtype == 'vmpool':
-            try:
-                QMessageBox.information(None, _('apptitle') + ': ' + _('info'), _('acquiring_vm_from_pool'))
-                vmpool_service = conf.OVIRTCONN.vm_pools_service()
-                vmp = vmpool_service.pool_service(id=self.vmdata[rowid].vmid)
-                vmp.allocate_vm()
-                self.refresh_grid()
-            except Error as e:
-                QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), str(e))
+            QMessageBox.information(None, _('apptitle') + ': ' + _('info'), _('acquiring_vm_from_pool'))
+            conf.EXECUTOR.submit('acquire_vm', self.allocate_vm, (conf.ENGINES[key[0]], key[1]), lambda result: self.refresh_grid(), self.allocate_vm_failed)
         else:
             QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('object_is_not_a_vmpool'))
 
+    def allocate_vm(self, engine, vmid):
+        """
+            Description: Runs in a worker thread. Asks oVirt to allocate a VM from a VmPool.
+            Arguments: 1. engine: The Engine the VmPool belongs to.
+                       2. vmid: The VmPool UUID in oVirt-format.
+            Returns: Nothing
+        """
+
+        vmpool_service = engine.ovirtconn.vm_pools_service()
+        vmp = vmpool_service.pool_service(id=vmid)
+        with engine.stats.measure():
+            vmp.allocate_vm()
+
+    def allocate_vm_failed(self, e):
+        """
+            Description: Invoked in the GUI thread if no VM could be acquired from the VmPool.
+            Arguments: The exception raised by the worker.
+            Returns: Nothing
+        """
+
+        if isinstance(e, OperationTimeout):
+            QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('operation_timed_out'))
+        else:
+            QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), str(e))
+
     def refresh_grid(self):
         """
             Description: Invoked when the user clicks on the 'Refresh' button in the toolbar. Reloads the board.
@@ -510,196 +742,445 @@ class OvirtClient(QWidget):
             self.forgetCredsAction.setDisabled(True)
             QMessageBox.information(None, _('apptitle') + ': ' + _('success'), _('creds_forgotten'))
 
-    def list_vmpools(self, row, delta, step, vmpools):
+    def list_vmpools(self, engine, vmpools):
         """
-            Description: Creates one row per VmPool that the user has access to.
-            Arguments: 1. The index of the first row to loop over.
-                       2. Delta step to sum to the progress bar.
-                       3. The current step of the progress bar
-                       4. The oVirt list of VmPools.
-            Returns: The final step of the progress bar
+            Description: Builds the board data for the VmPools that the user has access to.
+            Arguments: 1. engine: The name of the engine the VmPools belong to.
+                       2. vmpools: The list of VmPools (VmRecord objects).
+            Returns: A list of VmData objects, one per VmPool.
         """
 
-        # For cleanness reasons, we'll firstly show available VmPools
+        vmdata = []
         for vm in vmpools:
-            vmname = vm.name
-
-            # OS icon
-            ostype = 'vmpool'
-            imageOsicon = self.make_button(ostype, '<b>' + _('vmpool') + '</b>')
-
-            # Machine name
-            gridvmname = QLabel(vmname)
-            gridvmname.setStyleSheet(STANDARDCELLCSS)
-            gridvmname.setAlignment(Qt.AlignCenter)
+            vmd = VmData()
+            vmd.vmengine = engine
+            vmd.vmid = vm.id
+            vmd.vmname = vm.name
+            vmd.vmstatus = None
+            vmd.vmtype = 'vmpool'
+            vmd.vmos = 'vmpool'
+            vmd.set_sortkey()
+            vmdata.append(vmd)
 
-            # Acquire VM button
-            connect = self.make_button('grab', _('grab_vm_vmpool'));
-            connect.mousePressEvent = lambda x, r=row: self.acquire_vm_from_vmpool(r)
+        return vmdata
 
-            # Fill row with known info
-            self.grid.addWidget(imageOsicon, row, 0)
-            self.grid.addWidget(gridvmname, row, 1)
-            self.grid.addWidget(connect, row, 2)
+    def list_vms(self, engine, vms):
+        """
+            Description: Builds the board data for the VMs that the user has access to.
+            Arguments: 1. engine: The name of the engine the VMs belong to.
+                       2. vms: The list of VMs (VmRecord objects).
+            Returns: A list of VmData objects, one per VM.
+        """
 
-            # Store the correspondence between row number <-> VMPool data
+        vmdata = []
+        for vm in vms:
             vmd = VmData()
+            vmd.vmengine = engine
             vmd.vmid = vm.id
             vmd.vmname = vm.name
-            vmd.vmstatus = None
-            vmd.vmtype = 'vmpool'
-            self.vmdata[row] = vmd
+            vmd.vmstatus = vm.status
+            vmd.vmtype = 'vm'
+            vmd.vmos = self.get_os_icon((vm.ostype or '').lower())
+            vmd.set_sortkey()
+            vmdata.append(vmd)
 
-            row += 1
+        return vmdata
 
-            step += delta
-            self.pbar.setValue(step)
+    def sort_board(self, vmdatalist):
+        """
+            Description: Sorts the rows of several engines together, by name. VmPools go first.
+                         The sort keys are precomputed, so no name is casefolded while sorting.
+            Arguments: A list of VmData objects
+            Returns: The list of VmData in board order
+        """
 
-        return step
+        return sorted(vmdatalist, key=attrgetter('sortkey'))
 
-    def list_vms(self, row, delta, step, vms):
+    def init_board(self):
         """
-            Description: Creates one row per VM that the user has access to.
-            Arguments: 1. The index of the first row to loop over.
-                       2. Delta step to sum to the progress bar.
-                       3. The current step of the progress bar
-                       4. The oVirt list of VMs.
+            Description: Creates the board skeleton (progress bar, header, toolbar and the VM table).
+                         This is done only once, further reloads will reuse it.
+            Arguments: None
             Returns: Nothing
         """
-        # Now we'll show up the VMs
-        for vm in vms:
-            vmname = vm.name
-            vmstatus = vm.status.value
-
-            # OS icon
-            ostype = self.get_os_icon(vm.os.type.lower())
-            imageOsicon = self.make_button(ostype, '<b>%s</b> OS' % (ostype.capitalize()))
-
-            # Machine name
-            gridvmname = QLabel(vmname)
-            gridvmname.setStyleSheet(STANDARDCELLCSS)
-            gridvmname.setAlignment(Qt.AlignCenter)
-
-            # Connect button. Depending on whether it has already been hit, a different icon
-            # will be shown and the behavior will also be different.
-            if vmname not in self.openviewer_vms:
-                connect = self.make_button('connect', _('connect'));
-                connect.mousePressEvent = lambda x, r=row: self.connect(r)
-            else:
-                connect = self.make_button('viewer', _('viewer_already_opened'));
 
-            # Status icon
-            curaction = self.current_vm_status(vmstatus)
-            imageSticon = self.make_button(vmstatus, self.toggle_action_text(vmstatus))
-            imageSticon.mousePressEvent = lambda x, r=row: self.change_status(r)
+        global BACKGROUNDCSS, ROWHEIGHT
 
-            # Fill row with known info
-            self.grid.addWidget(imageOsicon, row, 0)
-            self.grid.addWidget(gridvmname, row, 1)
-            self.grid.addWidget(imageSticon, row, 2)
-            self.grid.addWidget(connect, row, 3)
+        self.vmdata = {}
+        self.enginevmdata = {}
 
-            # Store the correspondence between row number <-> VM data
-            vmd = VmData()
-            vmd.vmid = vm.id
-            vmd.vmname = vm.name
-            vmd.vmstatus = vmstatus
-            vmd.vmtype = 'vm'
-            self.vmdata[row] = vmd
+        self.pbar = QProgressBar(self)
+        self.grid = QGridLayout()
+        self.grid.setHorizontalSpacing(0)
+
+        # The progress bar is shown as busy until the VM list arrives
+        self.pbar.setGeometry(250, 250, 200, 100)
+        self.pbar.setRange(0, 0)
+
+        self.setStyleSheet(BACKGROUNDCSS)
+
+        # First row is special: Number of VMs + Toolbar
+        self.total_machines = QLabel(self)
+        self.grid.addWidget(self.total_machines, 0, 0, Qt.AlignCenter)
+        self.generate_toolbar()
+
+        # The VM table. Only the visible rows are painted, by the delegate.
+        self.model = VmTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(VmItemDelegate(self.table))
+        self.table.horizontalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(ROWHEIGHT)
+        self.table.setShowGrid(False)
+        self.table.setFrameShape(QFrame.NoFrame)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setFocusPolicy(Qt.NoFocus)
+        self.table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.table.clicked.connect(self.cell_clicked)
+
+        # Shown instead of the table if the user has no machines
+        self.no_machines = QLabel(_('no_vms'))
+        self.no_machines.setWordWrap(True)
+        self.no_machines.setAlignment(Qt.AlignCenter)
+
+        # The header followed by the VM table, both hidden until the first load concludes
+        self.header = QWidget()
+        self.header.setLayout(self.grid)
+        layout = QVBoxLayout()
+        layout.addWidget(self.pbar)
+        layout.addWidget(self.header)
+        layout.addWidget(self.table)
+        layout.addWidget(self.no_machines)
+
+        layout.setContentsMargins(0, 0, 0, 20)
+        self.setLayout(layout)
+        self.show_progress()
+
+    def show_progress(self):
+        """
+            Description: Shows just the progress bar, until the VM list of the user arrives.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.header.hide()
+        self.table.hide()
+        self.no_machines.hide()
+        self.pbar.show()
+
+    def show_board(self):
+        """
+            Description: Once the first load has concluded, progress bar is dismissed and the
+                         header shown. The VM table or the 'no machines' notice is shown by
+                         vm_based_resize.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.pbar.hide()
+        self.header.show()
+
+    def clear_board(self):
+        """
+            Description: Empties the board when the user logs out, so the next user neither sees
+                         nor acts on the previous rows. The progress bar, or the last known board
+                         of the next user, is shown until their VM list arrives.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        if self.model is None:
+            return
 
-            row += 1
+        self.table.clearSelection()
+        self.model.clear()
+        self.vmdata = {}
+        self.enginevmdata = {}
+        self.board_shown = False
+        self.show_progress()
+
+    def cell_clicked(self, index):
+        """
+            Description: Invoked when the user clicks on a board cell. Depending on the column and
+                         the kind of row, the corresponding action is performed. Clicks with Ctrl or
+                         Shift pressed only select rows, for bulk power actions. Rows of the last
+                         known snapshot take no action until the first load confirms them.
+            Arguments: The QModelIndex of the clicked cell
+            Returns: Nothing
+        """
+
+        if self.model.stale or QApplication.keyboardModifiers() & (Qt.ControlModifier | Qt.ShiftModifier):
+            return
+
+        vmd = self.model.vms[index.row()]
 
-            step += delta
-            self.pbar.setValue(step)
+        if vmd.vmtype == 'vmpool':
+            if index.column() == COLSTATUS:
+                self.acquire_vm_from_vmpool(vmd.key)
+        elif index.column() == COLSTATUS:
+            self.change_status(vmd.key)
+        elif index.column() == COLCONNECT:
+            self.connect(vmd.key)
 
     def load_vms(self):
         """
             Description: Main core VM loader method. Will connect to oVirt, get the VM list and render them.
+                         The board is built the first time, further calls just reconcile it. The VM list
+                         of each engine is fetched in a worker thread, so engines are queried concurrently,
+                         and rendering happens once all of them are available.
             Arguments: None
             Returns: Nothing
         """
 
-        global conf, MAXHEIGHT, BACKGROUNDCSS, STANDARDCELLCSS
-
+        global conf
 
-        QObjectCleanupHandler().add(self.layout())
         if not conf.USERNAME:
             quit()
 
-        # Used to store row <-> VM correspondence
-        self.vmdata = {}
+        if self.model is None:
+            self.init_board()
 
-        step = 0
+        if not self.board_shown:
+            # The last known board is shown meanwhile, if any
+            self.show_snapshot()
 
-        self.pbarlayout = QGridLayout(self)
-        self.pbar = QProgressBar(self)
-        self.grid = QGridLayout()
-        self.grid.setHorizontalSpacing(0)
+        if self.loading:
+            # There's already a load in progress, its result will be recent enough
+            return
 
-        # Initially, set the layout to the progress bar
-        self.pbar.setGeometry(250, 250, 200, 100)
-        self.pbar.setValue(0)
-        self.pbarlayout.addWidget(self.pbar, 0, 0)
-        self.setLayout(self.pbarlayout)
+        self.loading = True
+        self.loadresults = {}
+        session = self.session
+        for engine in conf.ENGINES.values():
+            conf.EXECUTOR.submit('load_vms', self.fetch_vms, (engine,), lambda result, name=engine.name: self.vms_loaded(name, result, session), lambda e, name=engine.name: self.vms_loaded(name, e, session))
 
-        self.setStyleSheet(BACKGROUNDCSS)
+    def fetch_vms(self, engine):
+        """
+            Description: Runs in a worker thread. Gets the VM and VmPool lists of an engine, both
+                         concurrently. Right after logging in, the lists have usually been fetched
+                         already (see Engine.start_listing).
+            Arguments: The Engine to query
+            Returns: A tuple (vms, vmpools) of VmRecord lists. They're sorted along with the
+                     rows of the other engines once all of them have answered.
+        """
 
-        try:
-            # Try getting the VM list from oVirt
-            vms_serv = conf.OVIRTCONN.vms_service()
-            vmpools_serv = conf.OVIRTCONN.vm_pools_service()
-            vms = sorted(vms_serv.list(), key=self.p22p3_compare_vms(self.compare_vms))
-            vmpools = sorted(vmpools_serv.list(), key=self.p22p3_compare_vms(self.compare_vms))
-        except Error:
+        return engine.list_all()
+
+    def vms_loaded(self, engine, result, session):
+        """
+            Description: Invoked in the GUI thread once the VM list of an engine has been fetched, or
+                         could not be fetched. When every engine has answered, the board is rendered.
+                         If no engine could be queried, the application quits as the session is lost.
+                         If just some of them failed, their rows are kept as they were and the user
+                         is warned.
+            Arguments: 1. engine: The name of the engine
+                       2. result: The (vms, vmpools) tuple returned by fetch_vms, or the exception
+                          raised by the worker.
+                       3. session: The value of self.session when the load was started
+            Returns: Nothing
+        """
+
+        global conf
+
+        if session != self.session:
+            # A load of a previous session
+            return
+
+        self.loadresults[engine] = result
+        if len(self.loadresults) < len(conf.ENGINES):
+            return
+        self.loading = False
+
+        failed = [name for name in conf.ENGINES if isinstance(self.loadresults[name], Exception)]
+        if len(failed) == len(conf.ENGINES):
             QMessageBox.critical(None, _('apptitle') + ': ' + _('error'), _('unexpected_connection_drop'))
             quit()
 
-        # Set the main widget height based on the number of VMs 
-        winheight = self.vm_based_resize(len(vms) + len(vmpools))
-        if len(vms) + len(vmpools) > 0:
-            delta = int(100 / (len(vms) + len(vmpools)))
+        vmdatalist = []
+        for name in conf.ENGINES:
+            if name in failed:
+                if not self.model.stale:
+                    vmdatalist += [vmd for vmd in self.model.vms if vmd.vmengine == name]
+            else:
+                vms, vmpools = self.loadresults[name]
+                vmdatalist += self.list_vmpools(name, vmpools) + self.list_vms(name, vms)
+        self.loadresults = {}
+
+        self.render_board(self.sort_board(vmdatalist))
+
+        if not self.refreshing:
+            # First load of the session, statuses are refreshed from now on. Starting earlier
+            # would list every VM again while the first load is still in progress.
+            self.restart_thread()
+
+        if failed:
+            QMessageBox.warning(None, _('apptitle') + ': ' + _('warning'), _('engines_unavailable') + ': <b>' + ', '.join(failed) + '</b>')
+
+    def show_snapshot(self):
+        """
+            Description: Shows the last known board of the user, stored on disk, in a stale state
+                         until the actual VM list is fetched.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        global conf
+
+        if not conf.CONFIG['snapshot_cache']:
+            remove_snapshot()
+            return
+
+        rows = load_snapshot()
+        if rows is None:
+            return
+
+        vmdatalist = []
+        for vmengine, vmid, vmname, vmtype, vmos, vmstatus in rows:
+            if vmengine not in conf.ENGINES:
+                # The engine could not be authenticated this time
+                continue
+            vmd = VmData()
+            vmd.vmengine = vmengine
+            vmd.vmid = vmid
+            vmd.vmname = vmname
+            vmd.vmtype = vmtype
+            vmd.vmos = vmos
+            vmd.vmstatus = vmstatus
+            vmd.set_sortkey()
+            vmdatalist.append(vmd)
+
+        # Rows are stored in board order, sorting them again is linear. Still needed in case
+        # the order rules have changed since the snapshot was stored.
+        self.render_board(self.sort_board(vmdatalist), stale=True)
+
+    def store_snapshot(self, background=True):
+        """
+            Description: Stores the current board on disk, so it can be shown on the next login.
+            Arguments: background: If True, the file is written by a worker thread
+            Returns: Nothing
+        """
+
+        global conf
+
+        if not conf.CONFIG['snapshot_cache'] or self.model is None or self.model.stale:
+            return
+
+        rows = [[vmd.vmengine, vmd.vmid, vmd.vmname, vmd.vmtype, vmd.vmos, vmd.vmstatus] for vmd in self.model.vms]
+        if background:
+            conf.EXECUTOR.submit('save_snapshot', save_snapshot, (snapshot_path(), rows))
+            return
+        try:
+            save_snapshot(snapshot_path(), rows)
+        except OSError:
+            pass
+
+    def render_board(self, vmdatalist, stale=False):
+        """
+            Description: Shows the given VmPools and VMs on the board, touching only the rows that changed.
+            Arguments: 1. vmdatalist: List of VmData in board order, as returned by sort_board
+                       2. stale: True if the list comes from the last known snapshot
+            Returns: Nothing
+        """
+
+        self.model.reconcile(vmdatalist)
+        self.model.set_stale(stale)
+        self.board_updated()
+
+    def board_updated(self):
+        """
+            Description: Brings everything that depends on the board rows up to date after they have
+                         been replaced or some of them inserted or removed: the lookup dicts, the
+                         totals, the console prefetch, the snapshot and the window height.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        global conf
+
+        firstload = not self.board_shown
+        vmdatalist = self.model.vms
+        stale = self.model.stale
+
+        # Store the correspondence between board key <-> VM data, and the VM id <-> VM data one of
+        # each engine. New dicts are assigned so the background threads never iterate over a dict
+        # that is being modified.
+        self.vmdata = dict(self.model.bykey)
+        enginevmdata = dict((name, {}) for name in conf.ENGINES)
+        for vmd in vmdatalist:
+            enginevmdata.setdefault(vmd.vmengine, {})[vmd.vmid] = vmd
+        self.enginevmdata = enginevmdata
+
+        numvmpools = sum(1 for vmd in vmdatalist if vmd.vmtype == 'vmpool')
+        totals = _('total_machines') + ': <font color="#AA8738">' + str(len(vmdatalist) - numvmpools) + '</font>, ' + _('total_vmpools') + ': <font color="#AA8738">' + str(numvmpools) + '</font>'
+        if stale:
+            self.total_machines.setText(totals + ' <i>' + _('board_stale') + '</i>')
         else:
-            delta = int(100)
-
-        if vmpools:
-            step = self.list_vmpools(1, delta, step, vmpools)
-        if vms:
-            self.list_vms(len(vmpools) + 1, delta, step, vms)
-            
-        # Once loading has concluded, progress bar is dismissed and the layout set to the QGridLayout
-        self.pbar.hide()
-        QObjectCleanupHandler().add(self.layout())
+            self.total_machines.setText(totals)
 
-        # First row is special: Number of VMs + Toolbar
-        total_machines = QLabel(_('total_machines') + ': <font color="#AA8738">' + str(len(vms)) + '</font>, ' + _('total_vmpools') + ': <font color="#AA8738">' + str(len(vmpools)) + '</font>', self)
-        self.grid.addWidget(total_machines, 0, 0, 1, 3, Qt.AlignCenter)
-        self.generate_toolbar()
+            # Consoles of the running VMs are prefetched so connecting to them is faster
+            for engine in conf.ENGINES.values():
+                engine.consolecache.sync(enginevmdata[engine.name])
+                engine.consolecache.prefetch(enginevmdata[engine.name])
 
-        # We wrap the main widget inside another widget with a vertical scrollbar
-        wrapper = QWidget()
-        wrapper.setLayout(self.grid)
-        scroll = QScrollArea()
-        scroll.setWidget(wrapper)
-        scroll.setWidgetResizable(True)
-        scroll.setFixedHeight(winheight)
-        layout = QVBoxLayout()
-        layout.addWidget(scroll)
+            self.store_snapshot()
 
-        layout.setContentsMargins(0, 0, 0, 20)
-        self.setLayout(layout) 
+        if firstload:
+            self.show_board()
+            self.board_shown = True
+
+        # Set the main widget height based on the number of VMs
+        self.vm_based_resize(len(vmdatalist))
+
+    def update_membership(self, engine, newvms, newvmpools, removed):
+        """
+            Description: Invoked when a background thread emits the signal announcing that VMs or
+                         VmPools have appeared or disappeared. Only the affected rows are inserted
+                         or removed, each at its sorted position, no request is sent to oVirt.
+            Arguments: 1. engine: The name of the engine whose VMs have changed
+                       2. newvms: VmRecords of the VMs that are not on the board yet
+                       3. newvmpools: VmRecords of the VmPools that are not on the board yet
+                       4. removed: Ids of the board rows of the engine that no longer exist
+            Returns: Nothing
+        """
 
-    def update_status_icon(self, i, newstatus):
+        removed = [(engine, vmid) for vmid in removed if (engine, vmid) in self.model.bykey]
+        added = [vmd for vmd in self.list_vmpools(engine, newvmpools) + self.list_vms(engine, newvms) if vmd.key not in self.model.bykey]
+
+        if not added and not removed:
+            # Already applied, i.e. the signal was emitted again before the board was updated
+            return
+
+        for key in removed:
+            self.model.remove_vm(key)
+        for vmd in added:
+            self.model.insert_vm(vmd)
+        self.board_updated()
+
+    def update_status_icon(self, key, newstatus):
         """
-            Description: Invoked when the background thread emits the signal announcing a status
+            Description: Invoked when a background thread emits the signal announcing a status
                          change, so the corresponding VM status icon should be updated.
-            Arguments: i: Row that has changed their status. The VM can be matched with VmData().
+            Arguments: key: Board key of the VM that has changed their status. The VM can be matched with VmData().
                        newstatus: The new status for the VM.
             Returns: Nothing
         """
 
-        imageSticon = self.make_button(newstatus, self.toggle_action_text(newstatus))
-        imageSticon.mousePressEvent = lambda x, r=i: self.change_status(r)
-        self.grid.addWidget(imageSticon, i, 2)
+        global conf
+
+        self.model.refresh_vm(key)
+
+        engine = conf.ENGINES.get(key[0])
+        if engine:
+            # A console of a VM that changed its status can't be trusted anymore
+            engine.consolecache.invalidate(key[1])
+            if not self.model.stale:
+                engine.consolecache.prefetch(self.enginevmdata.get(engine.name, {}))
 
     def logout_warn(self):
         """
@@ -723,22 +1204,46 @@ class OvirtClient(QWidget):
         """
             Description: Invoked when the autologout parameter is set in the config and the
                          idle time is overreached. This should require authentication again.
-            Arguments: None
+                         Also invoked when the user quits.
+            Arguments: reconnect: True on autologout, the Credentials dialog is shown again
             Returns: Nothing
         """
 
-        if conf.OVIRTCONN:
-            try:
-                conf.SOCKOBJ.close()
-            except Error:
-                pass
+        # Statuses may have changed since the board was last stored
+        self.store_snapshot(background=False)
+
+        # Next user won't have access to the same connections. Consoles are closed only if
+        # configured so, otherwise they're left running.
+        if conf.CONFIG['close_viewers'] == 'always' or (conf.CONFIG['close_viewers'] == 'autologout' and reconnect):
+            self.viewers.close_all()
+        else:
+            self.viewers.detach_all()
 
+        # The threads using the engines must be over before the engines are closed
         self.stopThread = True
+        self.stopping.set()
+        engines = list(conf.ENGINES.values())
+        for engine in engines:
+            engine.scheduler.wake()                 # So the status threads notice at once
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        self.refreshing = False
+
+        for engine in engines:
+            engine.close()
+        conf.ENGINES = {}
         conf.USERNAME = None
+
+        # A load in progress belongs to this session, the next one must be able to start its own
+        self.session += 1
+        self.loading = False
+        self.loadresults = {}
         self.autologoutWarn = False
 
         # Hide the layout so next user doesn't see the previous content
         self.hide()
+        self.clear_board()
 
         try:
             self.autologoutwarnwin.accept()
@@ -762,93 +1267,211 @@ class OvirtClient(QWidget):
         self.lastclick = int(time())
         self.autologoutWarn = False   # This will make the warning be shown next times as well
 
-    def refresh_statuses(self):
+    def refresh_statuses(self, engine):
         """
-            Description: Background thread that will look for VM status changes and
+            Description: Background thread that will look for VM status changes in one engine and
                          send a signal to the main thread so the corresponding icons
-                         are updated. Also, if there's a change in the number of VMs
-                         that the user controls, the main Widgets will be reloaded.
-                         It'll also check the autologout setting & act accordingly.
-            Arguments: None
+                         are updated. Statuses are fetched in one request per sweep
+                         or from the events feed (see StatusEngine), and only changed
+                         rows are signaled. Also, if VMs or VmPools that the user controls
+                         have appeared or disappeared, just those rows are added or removed.
+                         There's one thread per engine, so a slow engine doesn't delay the others.
+                         The time between refreshes is decided by the engine's PollScheduler: short
+                         while VMs are changing their status, longer while nothing happens or the
+                         board is hidden, and backing off if the engine cannot be reached.
+            Arguments: The Engine to poll
             Returns: Nothing ("infinite" loop)
         """
 
-        global UPDATESLEEPINTERVAL
+        # The board has just been loaded, so the first refresh is due after an interval too
+        engine.scheduler.wait(self.enginevmdata.get(engine.name, {}), self.board_hidden())
 
-        autologout = False
         while 1 and not self.stopThread:
-            if conf.OVIRTCONN:
+            if engine.ovirtconn:
+                # The board may be reconciled meanwhile, so we stick to the current VmData
+                vmdata = self.enginevmdata.get(engine.name, {})
                 try:
-                    vms_service = conf.OVIRTCONN.vms_service()
-                    ovirt_num_machines = len(vms_service.list())
-                except Error:
-                    sys.exit('[ERROR] ' + _('unexpected_connection_drop'))
-
-                if ovirt_num_machines != len(self.vmdata):
-                     # If the number of VMs has changed, we should reload the main widget
-                     self.reloadsignal.emit()
+                    # One single request for all the VM statuses, regardless of the number of VMs,
+                    # or just the VMs referenced by new events if the events feed is used
+                    changes, membership = engine.statusengine.update(vmdata)
+                except Error as e:
+                    # The engine may be back later, its rows are kept meanwhile
+                    if not engine.scheduler.errors:
+                        print('[WARNING] %s: %s (%s)' % (engine.name, _('engine_unreachable'), e), file=sys.stderr)
+                    engine.scheduler.failed()
                 else:
-                    for i in self.vmdata:
-                        vmid = self.vmdata[i].vmid
-                        vmstatus = self.vmdata[i].vmstatus
-                        try:
-                            ovirtvm = vms_service.list(search='id=%s' % (vmid))[0]
-                        except Error:
-                            sys.exit('[ERROR] ' + _('unexpected_connection_drop'))
-
-                        if ovirtvm:
-                            curstatus = ovirtvm.status.value
-                            if vmstatus != curstatus:
-                                # If there has been a status change, emit the signal to update icons
-                                self.vmdata[i].vmstatus = curstatus
-                                self.updatesignal.emit(i, curstatus)
-
-                # If there is any currently open viewer, we'll reset the idle time so we don't close the session
-                # while there still is any open session.
-                if self.openviewer_vms:
-                    self.lastclick = int(time())         # Last click timestamp update
-
-                # If the autologout warning has not been shown yet and it's configured, we do so
-                if conf.CONFIG['autologout'] != 0 and conf.CONFIG['notify_autologout'] != 0 and not self.autologoutWarn and \
-                   (int(time() - self.lastclick) >= (conf.CONFIG['autologout'] - conf.CONFIG['notify_autologout']) * 60):
-                       self.autologoutWarn = True
-                       self.warnlogoutsignal.emit()
-
-                # If there's no credentials file and autologout is set, we check for the last
-                # click and if surpassed, a logout will be performed.
-                if conf.CONFIG['autologout'] != 0 and not isfile(conf.USERCREDSFILE):
-                    if (int(time()) - self.lastclick) >= (conf.CONFIG['autologout'] * 60):
-                        self.stopThread = True
-                        autologout = True
-
-                sleep(UPDATESLEEPINTERVAL)
+                    engine.scheduler.succeeded(changes or membership)
+
+                    for vmid, curstatus in changes:
+                        # If there has been a status change, emit the signal to update icons
+                        vmdata[vmid].vmstatus = curstatus
+                        self.updatesignal.emit((engine.name, vmid), curstatus)
+
+                    if membership:
+                        # VMs or VmPools have appeared or disappeared, only those rows will be updated
+                        self.membershipsignal.emit(engine.name, *membership)
+
+                engine.scheduler.wait(vmdata, self.board_hidden())
             else:
                 return
 
+    def watch_vm(self, engine, vmid, target, origin):
+        """
+            Description: Background thread that polls a single VM after a power action, every
+                         VMWATCHINTERVAL seconds, until it reaches the expected status, or any
+                         other stable status once it has left the one it was in (i.e. it's down
+                         again because it failed to start), or VMWATCHTIMEOUT seconds have
+                         elapsed. Status changes are signaled as in refresh_statuses. The VM
+                         doesn't make the engine's refresh thread poll faster meanwhile.
+            Arguments: 1. engine: The Engine the VM belongs to
+                       2. vmid: The VM UUID in oVirt-format
+                       3. target: The status the VM is expected to reach ('up' or 'down')
+                       4. origin: The status the VM was in before the power action
+            Returns: Nothing
+        """
+
+        global VMWATCHINTERVAL, VMWATCHTIMEOUT
+
+        engine.scheduler.watched.add(vmid)
+        left = False                                # Whether the VM has left its origin status
+        try:
+            deadline = monotonic() + VMWATCHTIMEOUT
+            while not self.stopThread and engine.ovirtconn and monotonic() < deadline:
+                if self.stopping.wait(VMWATCHINTERVAL):
+                    return
+                try:
+                    vm = engine.statusengine.fetch_vm(vmid)
+                except Error:
+                    continue
+                if vm is None:
+                    # Removed meanwhile, the next sweep will remove its row
+                    return
+
+                vmd = self.enginevmdata.get(engine.name, {}).get(vmid)
+                if vmd is not None and vmd.vmstatus != vm.status:
+                    vmd.vmstatus = vm.status
+                    self.updatesignal.emit((engine.name, vmid), vm.status)
+
+                left = left or vm.status != origin
+                if vm.status == target or (left and vm.status in STABLESTATUSES):
+                    return
+        finally:
+            engine.scheduler.watched.discard(vmid)
+
+    def board_hidden(self):
+        """
+            Description: Checks whether the user is not looking at the board: the window is
+                         minimized or hidden, or a viewer has the focus.
+            Arguments: None
+            Returns: True if the board is not visible to the user
+        """
+
+        return self.windowhidden or (bool(self.viewers) and not self.windowactive)
+
+    def wake_threads(self):
+        """
+            Description: Makes the status threads of every engine refresh right now.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        global conf
+
+        for engine in list(conf.ENGINES.values()):
+            engine.scheduler.wake()
+
+    def update_visibility(self):
+        """
+            Description: Keeps track of whether the window is minimized and whether it has the focus,
+                         so statuses are refreshed less often while the user is not looking at the
+                         board. When the user is back, statuses are refreshed at once.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        wasvisible = not self.board_hidden()
+        self.windowhidden = self.isMinimized() or not self.isVisible()
+        self.windowactive = self.isActiveWindow()
+        if not wasvisible and not self.board_hidden():
+            self.wake_threads()
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.WindowStateChange, QEvent.ActivationChange):
+            self.update_visibility()
+        QWidget.changeEvent(self, event)
+
+    def hideEvent(self, event):
+        QWidget.hideEvent(self, event)
+        self.update_visibility()
+
+    def showEvent(self, event):
+        QWidget.showEvent(self, event)
+        self.update_visibility()
+
+    def watch_autologout(self):
+        """
+            Description: Background thread that will check the autologout setting & act accordingly.
+            Arguments: None
+            Returns: Nothing ("infinite" loop)
+        """
+
+        global UPDATESLEEPINTERVAL
+
+        autologout = False
+        while 1 and not self.stopThread:
+            # If there is any currently open viewer, we'll reset the idle time so we don't close the session
+            # while there still is any open session.
+            if self.viewers:
+                self.lastclick = int(time())         # Last click timestamp update
+
+            # If the autologout warning has not been shown yet and it's configured, we do so
+            if conf.CONFIG['autologout'] != 0 and conf.CONFIG['notify_autologout'] != 0 and not self.autologoutWarn and \
+               (int(time() - self.lastclick) >= (conf.CONFIG['autologout'] - conf.CONFIG['notify_autologout']) * 60):
+                   self.autologoutWarn = True
+                   self.warnlogoutsignal.emit()
+
+            # If there's no credentials file and autologout is set, we check for the last
+            # click and if surpassed, a logout will be performed.
+            if conf.CONFIG['autologout'] != 0 and not isfile(conf.USERCREDSFILE):
+                if (int(time()) - self.lastclick) >= (conf.CONFIG['autologout'] * 60):
+                    self.stopThread = True
+                    autologout = True
+
+            sleep(UPDATESLEEPINTERVAL)
+
         if autologout:
             self.logoutsignal.emit(True)
 
     def restart_thread(self):
         """
-            Description: Simply starts or restarts the background thread
+            Description: Simply starts or restarts the background threads: one per engine, plus
+                         the autologout watcher.
             Arguments: None
             Returns: Nothing
         """
 
+        global conf
+
         self.stopThread = False
+        self.stopping.clear()
+        self.refreshing = True
         self.lastclick = int(time())
-        self.thread = threading.Thread(target=self.refresh_statuses, args=())
-        self.thread.daemon = True                            # Daemonize thread
-        self.thread.start()
+        for engine in conf.ENGINES.values():
+            # Wakes while the first load was in progress are moot, the board has just been loaded
+            engine.scheduler.event.clear()
+        self.threads = [threading.Thread(target=self.refresh_statuses, args=(engine,)) for engine in conf.ENGINES.values()]
+        for thread in self.threads + [threading.Thread(target=self.watch_autologout, args=())]:
+            thread.daemon = True                             # Daemonize thread
+            thread.start()
 
     def start_vmpane(self):
         """
             Description: This method will be called when the Credentials dialog is closed.
                          This should happen on successful authentication. We should then
                          load the main widget and fill it with the VMs that the user has
-                         permissions on. Additionally, a background thread will be started
-                         to check VM status changed so the main widget is updated should
-                         this happen.
+                         permissions on. Once they're loaded, background threads will be
+                         started to check VM status changes so the main widget is updated
+                         should this happen (see vms_loaded).
             Arguments: None
             Returns: Nothing
         """
@@ -858,8 +1481,6 @@ class OvirtClient(QWidget):
         self.load_vms()
         self.center()
 
-        self.restart_thread()
-
     def confirm_quit(self):
         """
             Description: Asks for confirmation from the user's side to close the app.
@@ -911,19 +1532,19 @@ class OvirtClient(QWidget):
             Returns: Nothing.
         """
 
-        global conf, MAXWIDTH, MAXHEIGHT, IMGDIR, VERSION
+        global conf, MAXWIDTH, MAXHEIGHT, VERSION
 
         self.setFixedSize(MAXWIDTH, MAXHEIGHT)
         self.center()
 
         self.setWindowTitle(_('apptitle') + ' ' + VERSION)
-        self.setWindowIcon(QIcon(IMGDIR + 'appicon.png'))
+        self.setWindowIcon(QIcon(get_pixmap('appicon')))
         self.show()
 
         self.updatesignal.connect(self.update_status_icon)
         self.logoutsignal.connect(self.logout)
         self.warnlogoutsignal.connect(self.logout_warn)
-        self.reloadsignal.connect(self.load_vms)
+        self.membershipsignal.connect(self.update_membership)
 
         if not conf.USERNAME:
             creds = Credentials(self)
@@ -957,23 +1578,41 @@ def checkConfig():
     config = configparser.ConfigParser()
     config.read(conf.CONFIGFILE)
 
-    try:
-        ovirturl = config.get('ovirt', 'url')
-    except configparser.NoOptionError:
-        sys.exit("[ERROR] Configuration file (%s) is missing a mandatory parameter: Section: ovirt, parameter: url. Check config." % (conf.CONFIGFILE))
+    # oVirt engines: the [ovirt] section, and/or one [ovirt:NAME] section per engine (multitenant mode)
+    engines = []
+    for section in config.sections():
+        if section != 'ovirt' and not section.startswith('ovirt:'):
+            continue
 
-    try:
-        cafile = config.get('ovirt', 'cafile')
-    except configparser.NoOptionError:
-        sys.exit("[ERROR] Configuration file (%s) is missing a mandatory parameter: Section: ovirt, parameter: cafile. Check config." % (conf.CONFIGFILE))
+        try:
+            ovirturl = config.get(section, 'url')
+        except configparser.NoOptionError:
+            sys.exit("[ERROR] Configuration file (%s) is missing a mandatory parameter: Section: %s, parameter: url. Check config." % (conf.CONFIGFILE, section))
 
-    if not isfile(cafile):
-        sys.exit("[ERROR] Cannot find the CA file (%s). Check if file exists and if so, check if you have reading permissions in your config file." % (cafile))
+        try:
+            cafile = config.get(section, 'cafile')
+        except configparser.NoOptionError:
+            sys.exit("[ERROR] Configuration file (%s) is missing a mandatory parameter: Section: %s, parameter: cafile. Check config." % (conf.CONFIGFILE, section))
 
-    try:
-        ovirtdomain = config.get('ovirt', 'domain')
-    except configparser.NoOptionError:
-        sys.exit("[ERROR] Configuration file (%s) is missing a mandatory parameter: Section: ovirt, parameter: domain. Check config." % (conf.CONFIGFILE))
+        if not isfile(cafile):
+            sys.exit("[ERROR] Cannot find the CA file (%s). Check if file exists and if so, check if you have reading permissions in your config file." % (cafile))
+
+        try:
+            ovirtdomain = config.get(section, 'domain')
+        except configparser.NoOptionError:
+            sys.exit("[ERROR] Configuration file (%s) is missing a mandatory parameter: Section: %s, parameter: domain. Check config." % (conf.CONFIGFILE, section))
+
+        if section == 'ovirt':
+            name = urlparse(ovirturl).hostname or ovirturl
+        else:
+            name = section[len('ovirt:'):].strip()
+        if not name or name in [engine['name'] for engine in engines]:
+            sys.exit("[ERROR] Configuration file (%s) has an invalid section name: %s. Engine names must be unique. Check config." % (conf.CONFIGFILE, section))
+
+        engines.append({'name': name, 'url': ovirturl, 'cafile': cafile, 'domain': ovirtdomain})
+
+    if not engines:
+        sys.exit("[ERROR] Configuration file (%s) is missing a mandatory section: ovirt. Check config." % (conf.CONFIGFILE))
 
     try:
         applang = config.get('app', 'lang')
@@ -1024,6 +1663,149 @@ def checkConfig():
     except configparser.NoOptionError:
         notify_autologout = 0
 
+    try:
+        api_workers = int(config.get('app', 'api_workers'))
+        if api_workers < 1:
+            api_workers = 4
+    except ValueError:
+        api_workers = 4
+    except configparser.NoOptionError:
+        api_workers = 4
+
+    try:
+        bulk_workers = int(config.get('app', 'bulk_workers'))
+        if bulk_workers < 1:
+            bulk_workers = 8
+    except ValueError:
+        bulk_workers = 8
+    except configparser.NoOptionError:
+        bulk_workers = 8
+
+    try:
+        operation_timeout = int(config.get('app', 'operation_timeout'))
+        if operation_timeout < 0:
+            operation_timeout = 0
+    except ValueError:
+        operation_timeout = 30
+    except configparser.NoOptionError:
+        operation_timeout = 30
+
+    try:
+        console_prefetch = config.get('app', 'console_prefetch')
+        if console_prefetch != '0' and console_prefetch != '1':
+            console_prefetch = '1'
+    except configparser.NoOptionError:
+        console_prefetch = '1'
+
+    try:
+        snapshot_cache = config.get('app', 'snapshot_cache')
+        if snapshot_cache != '0' and snapshot_cache != '1':
+            snapshot_cache = '1'
+    except configparser.NoOptionError:
+        snapshot_cache = '1'
+
+    try:
+        vm_listing = config.get('app', 'vm_listing')
+        if vm_listing != 'lean' and vm_listing != 'sdk':
+            vm_listing = 'lean'
+    except configparser.NoOptionError:
+        vm_listing = 'lean'
+
+    try:
+        close_viewers = config.get('app', 'close_viewers')
+        if close_viewers != 'never' and close_viewers != 'autologout' and close_viewers != 'always':
+            close_viewers = 'never'
+    except configparser.NoOptionError:
+        close_viewers = 'never'
+
+    # Console file settings, overriding those sent by oVirt. An empty value removes the setting.
+    vv_overrides = {}
+    if fullscreen == '1':
+        vv_overrides['fullscreen'] = '1'
+    if config.has_section('vv'):
+        for key in config.options('vv'):
+            if key not in VVOVERRIDES:
+                print("[WARNING] Configuration file (%s) has an unknown setting in the [vv] section, it will be ignored: %s" % (conf.CONFIGFILE, key))
+                continue
+            vv_overrides[key] = config.get('vv', key, raw=True).strip()
+
+    # Viewer performance profiles, one [profile:NAME] section each
+    profiles = {}
+    for section in config.sections():
+        if not section.startswith('profile:'):
+            continue
+
+        vv = {}
+        args = []
+        users = []
+        vms = []
+        maxrtt = None
+        for key in config.options(section):
+            value = config.get(section, key, raw=True).strip()
+            if key in VVOVERRIDES:
+                vv[key] = value
+            elif key == 'viewer_args':
+                try:
+                    args = shlex.split(value)
+                except ValueError:
+                    sys.exit("[ERROR] Configuration file (%s) has an invalid parameter: Section: %s, parameter: viewer_args. Check config." % (conf.CONFIGFILE, section))
+            elif key == 'users':
+                users = [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+            elif key == 'vms':
+                vms = [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+            elif key == 'max_rtt':
+                try:
+                    maxrtt = int(value)
+                except ValueError:
+                    print("[WARNING] Configuration file (%s) has an invalid max_rtt in the [%s] section, it will be ignored" % (conf.CONFIGFILE, section))
+            else:
+                print("[WARNING] Configuration file (%s) has an unknown setting in the [%s] section, it will be ignored: %s" % (conf.CONFIGFILE, section, key))
+
+        name = section[len('profile:'):].strip()
+        profiles[name] = Profile(name, vv, args, users, vms, maxrtt)
+
+    try:
+        profile = config.get('app', 'profile').strip()
+        if profile != 'auto' and profile != 'none' and profile not in profiles:
+            print("[WARNING] Configuration file (%s) refers to an undefined profile, it will be ignored: %s" % (conf.CONFIGFILE, profile))
+            profile = 'auto'
+    except configparser.NoOptionError:
+        profile = 'auto'
+
+    # Per-operation timeouts, overriding operation_timeout
+    timeouts = {}
+    if config.has_section('timeouts'):
+        for operation in config.options('timeouts'):
+            try:
+                timeouts[operation] = int(config.get('timeouts', operation))
+            except ValueError:
+                pass
+
+    try:
+        status_updates = config.get('app', 'status_updates')
+        if status_updates != 'polling' and status_updates != 'events':
+            status_updates = 'polling'
+    except configparser.NoOptionError:
+        status_updates = 'polling'
+
+    try:
+        full_sweep_interval = int(config.get('app', 'full_sweep_interval'))
+        if full_sweep_interval < UPDATESLEEPINTERVAL:
+            full_sweep_interval = UPDATESLEEPINTERVAL
+    except ValueError:
+        full_sweep_interval = 60
+    except configparser.NoOptionError:
+        full_sweep_interval = 60
+
+    try:
+        max_poll_interval = int(config.get('app', 'max_poll_interval'))
+        if max_poll_interval < UPDATESLEEPINTERVAL:
+            max_poll_interval = UPDATESLEEPINTERVAL
+    except ValueError:
+        max_poll_interval = 30
+    except configparser.NoOptionError:
+        max_poll_interval = 30
+
     try:
         remote_viewer_path = config.get('app', 'remote_viewer_path')
         if not isfile(remote_viewer_path) or not access(remote_viewer_path, X_OK):
@@ -1035,9 +1817,7 @@ def checkConfig():
         sys.exit("[ERROR] Cannot find a valid path for remote-viewer. Ensure you've installed the virt-viewer (or equivalent) package and if needed, set the app->remote_viewer_path configuration setting in your %s configuration file." % (conf.CONFIGFILE))
 
     # Config OK, storing values
-    conf.CONFIG['ovirturl'] = ovirturl
-    conf.CONFIG['cafile'] = cafile
-    conf.CONFIG['ovirtdomain'] = ovirtdomain
+    conf.CONFIG['engines'] = engines
     conf.CONFIG['applang'] = applang
     conf.CONFIG['conntimeout'] = conntimeout
     conf.CONFIG['prefproto'] = prefproto
@@ -1046,6 +1826,20 @@ def checkConfig():
     conf.CONFIG['autologout'] = autologout
     conf.CONFIG['notify_autologout'] = notify_autologout
     conf.CONFIG['remote_viewer_path'] = remote_viewer_path
+    conf.CONFIG['status_updates'] = status_updates
+    conf.CONFIG['api_workers'] = api_workers
+    conf.CONFIG['bulk_workers'] = bulk_workers
+    conf.CONFIG['operation_timeout'] = operation_timeout
+    conf.CONFIG['timeouts'] = timeouts
+    conf.CONFIG['vv_overrides'] = vv_overrides
+    conf.CONFIG['profiles'] = profiles
+    conf.CONFIG['profile'] = profile
+    conf.CONFIG['console_prefetch'] = console_prefetch == '1'
+    conf.CONFIG['snapshot_cache'] = snapshot_cache == '1'
+    conf.CONFIG['vm_listing'] = vm_listing
+    conf.CONFIG['close_viewers'] = close_viewers
+    conf.CONFIG['full_sweep_interval'] = full_sweep_interval
+    conf.CONFIG['max_poll_interval'] = max_poll_interval
 
     lang = gettext.translation(conf.CONFIG['applang'], localedir='lang', languages=[conf.CONFIG['applang']])
     return lang
@@ -1055,5 +1849,6 @@ if __name__ == '__main__':
     lang.install()
 
     app = QApplication(sys.argv)
+    preload_pixmaps()
     OvirtClient()
     sys.exit(app.exec_())
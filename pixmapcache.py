@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+from os import listdir
+from globalconf import IMGDIR
+from PyQt5.QtGui import QImage, QPixmap
+
+# Process-wide cache of decoded icons: icon name (file name under IMGDIR without
+# the .png extension) -> QPixmap. QPixmaps are implicitly shared, so the same
+# object can be set on as many QLabels as needed without copying the image.
+PIXMAPS = {}
+
+def get_pixmap(name):
+    """
+        Description: Returns the decoded icon for the given name. The file is only read and
+                     decoded the first time, further calls are served from memory.
+        Arguments: The icon name, i.e. the file name under IMGDIR without the .png extension.
+        Returns: The QPixmap of the icon.
+    """
+
+    global PIXMAPS, IMGDIR
+
+    pixmap = PIXMAPS.get(name)
+    if pixmap is None:
+        pixmap = QPixmap.fromImage(QImage('%s%s%s' % (IMGDIR, name, '.png')))
+        PIXMAPS[name] = pixmap
+    return pixmap
+
+def preload_pixmaps():
+    """
+        Description: Decodes all the icons under IMGDIR at once, so the board won't need
+                     any disk read afterwards. Requires a QApplication to exist.
+        Arguments: None
+        Returns: Nothing
+    """
+
+    global IMGDIR
+
+    for filename in listdir(IMGDIR):
+        if filename.endswith('.png'):
+            get_pixmap(filename[:-4])
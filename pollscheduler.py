@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+import threading
+from random import uniform
+from globalconf import conf, UPDATESLEEPINTERVAL, FASTPOLLINTERVAL, POLLBACKOFF, HIDDENPOLLFACTOR, MAXERRORINTERVAL, POLLJITTER
+
+# Statuses a VM only stays in for a while, the board is refreshed faster meanwhile
+TRANSITIONALSTATUSES = ('powering_up', 'powering_down', 'wait_for_launch', 'reboot_in_progress', 'migrating', 'saving_state', 'restoring_state')
+
+# Statuses a power action ends in, whether it succeeded or not
+STABLESTATUSES = ('up', 'down', 'suspended')
+
+class PollScheduler:
+    """
+        This class decides how long the status thread of an engine waits between two refreshes.
+        It polls every FASTPOLLINTERVAL seconds while any VM is in a transitional status, and
+        otherwise starts at UPDATESLEEPINTERVAL seconds and slows down exponentially as long
+        as nothing changes, up to app->max_poll_interval seconds, or HIDDENPOLLFACTOR times
+        that if the board is not visible. If the engine cannot be reached, the interval grows
+        exponentially too, up to MAXERRORINTERVAL seconds. A random jitter is added so clients
+        started at the same time don't keep polling the engine at the same time.
+    """
+
+    def __init__(self):
+        self.idle = 0                               # Consecutive refreshes in which nothing changed
+        self.errors = 0                             # Consecutive refreshes that failed
+        self.interval = UPDATESLEEPINTERVAL         # Last computed interval, in seconds
+        self.event = threading.Event()              # Set to interrupt the current wait
+        self.watched = set()                        # VM ids polled on their own after a power action
+
+    def succeeded(self, changed):
+        """
+            Description: Accounts for a successful refresh.
+            Arguments: Whether any VM changed or appeared/disappeared
+            Returns: Nothing
+        """
+
+        self.errors = 0
+        if changed:
+            self.idle = 0
+        else:
+            self.idle += 1
+
+    def failed(self):
+        """
+            Description: Accounts for a refresh that failed, i.e. because the engine is unreachable.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.errors += 1
+
+    def transitional(self, vmdata):
+        """
+            Description: Checks whether any VM is in a transitional status. VMs that are being
+                         watched after a power action are not taken into account, as they're
+                         already polled on their own.
+            Arguments: The VM id -> VmData dict of the engine
+            Returns: True if some VM will change its status on its own soon
+        """
+
+        return any(vmd.vmstatus in TRANSITIONALSTATUSES and vmid not in self.watched for vmid, vmd in list(vmdata.items()))
+
+    def next_interval(self, vmdata, hidden):
+        """
+            Description: Computes how long to wait until the next refresh.
+            Arguments: 1. vmdata: The VM id -> VmData dict of the engine
+                       2. hidden: Whether the board is not visible to the user
+            Returns: The interval in seconds
+        """
+
+        global conf
+
+        if self.errors:
+            interval = min(MAXERRORINTERVAL, UPDATESLEEPINTERVAL * POLLBACKOFF ** min(self.errors, 16))
+            # Equal jitter: half the backoff is kept, so retries still slow down, and the other half is
+            # random, so clients that lost the engine at once don't come back at once
+            self.interval = uniform(interval / 2, interval)
+            return self.interval
+
+        if self.transitional(vmdata):
+            interval = FASTPOLLINTERVAL
+        else:
+            maxinterval = conf.CONFIG['max_poll_interval']
+            if hidden:
+                maxinterval *= HIDDENPOLLFACTOR
+            interval = min(maxinterval, UPDATESLEEPINTERVAL * POLLBACKOFF ** min(self.idle, 16))
+
+        self.interval = interval * uniform(1 - POLLJITTER, 1 + POLLJITTER)
+        return self.interval
+
+    def wait(self, vmdata, hidden):
+        """
+            Description: Waits until the next refresh is due, or until wake is called.
+            Arguments: 1. vmdata: The VM id -> VmData dict of the engine
+                       2. hidden: Whether the board is not visible to the user
+            Returns: Nothing
+        """
+
+        if self.event.wait(self.next_interval(vmdata, hidden)):
+            self.event.clear()
+
+    def wake(self):
+        """
+            Description: Makes the status thread refresh right now, i.e. because the user is back
+                         at the board. The refresh cadence starts over.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.idle = 0
+        self.event.set()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+# Viewer performance profiles, one [profile:NAME] section of settings.conf each. A profile
+# overrides console file settings, as the [vv] section does, and adds remote-viewer
+# arguments, so i.e. users on slow links get a lighter SPICE session than those on the LAN.
+
+from fnmatch import fnmatchcase
+
+class Profile:
+    """
+        A named set of viewer settings
+    """
+
+    def __init__(self, name, vv, args, users, vms, maxrtt):
+        self.name = name
+        self.vv = vv                                # [virt-viewer] overrides, applied over the [vv] section
+        self.args = args                            # Additional remote-viewer arguments
+        self.users = users                          # User name patterns the profile is used for
+        self.vms = vms                              # VM name patterns the profile is used for
+        self.maxrtt = maxrtt                        # Highest engine RTT (ms) for an automatic choice, None if not automatic
+
+def choose_profile(profiles, default, username, vmname, rtt):
+    """
+        Description: Picks the profile of a viewer. The first profile matching the VM name is used,
+                     otherwise the first one matching the user name, otherwise the app->profile one.
+                     If that is 'auto', the profile with the lowest max_rtt not below the engine RTT
+                     is used, or the one with the highest max_rtt if the RTT is above all of them.
+        Arguments: 1. profiles: Dict of profile name -> Profile, in settings file order
+                   2. default: The app->profile setting: a profile name, 'auto' or 'none'
+                   3. username: The user name
+                   4. vmname: The VM name
+                   5. rtt: The round trip time to the engine of the VM in seconds, None if unknown
+        Returns: The Profile, or None if no profile applies
+    """
+
+    for profile in profiles.values():
+        if any(fnmatchcase(vmname, pattern) for pattern in profile.vms):
+            return profile
+
+    for profile in profiles.values():
+        if username and any(fnmatchcase(username, pattern) for pattern in profile.users):
+            return profile
+
+    if default != 'auto':
+        return profiles.get(default)
+
+    candidates = sorted((profile for profile in profiles.values() if profile.maxrtt is not None), key=lambda profile: profile.maxrtt)
+    if not candidates or rtt is None:
+        return None
+    for profile in candidates:
+        if rtt * 1000 <= profile.maxrtt:
+            return profile
+    return candidates[-1]
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+import ssl
+import gzip
+import threading
+from time import monotonic
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from urllib.parse import urlsplit
+
+# Methods whose requests can be sent again if the connection fails, as repeating them is harmless
+IDEMPOTENTMETHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+# Seconds a pooled connection may have been idle to send other requests (i.e, power actions) on it.
+# They're not retried, so connections oVirt may have closed meanwhile (keep-alive timeouts are usually
+# several seconds) are not used for them.
+FRESHIDLE = 2
+
+class RestError(Exception):
+    """
+        Raised when oVirt answers a raw REST request with an HTTP error
+    """
+
+    def __init__(self, code, reason):
+        Exception.__init__(self, '%s %s' % (code, reason))
+        self.code = code
+        self.reason = reason
+
+class RestSession:
+    """
+        This class sends the raw REST requests that the SDK doesn't cover (i.e, the console
+        descriptors, which need a custom Accept header) through a small pool of persistent
+        keep-alive connections. A warm connection means a single round trip per request
+        instead of a new TCP + TLS handshake every time. TLS settings mirror those used by
+        the SDK connection (same CA file, not verified, as the SDK is used with insecure=True).
+
+        Requests are authenticated with the SSO token of the SDK connection instead of the
+        user credentials, so oVirt doesn't have to validate them against the directory
+        server on each request. The token is renewed if oVirt rejects it.
+    """
+
+    def __init__(self, url, connection, cafile, timeout, stats=None, maxidle=4):
+        parts = urlsplit(url)
+        self.secure = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.basepath = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.maxidle = maxidle                      # Max number of idle connections kept open
+        self.idle = []                              # (connection, release time) of the idle connections, the most recently used last
+        self.lock = threading.Lock()
+        self.connection = connection                # SDK connection, owner of the SSO token
+        self.token = None                           # SSO token sent in the Authorization header
+        self.renewals = 0                           # Number of times the token has been renewed
+        self.stats = stats                          # EngineStats where requests are accounted, if any
+        self.headers = {'filter': 'true', 'Accept-Encoding': 'gzip'}
+
+        self.context = None
+        if self.secure:
+            self.context = ssl.create_default_context(cafile=cafile)
+            self.context.check_hostname = False
+            self.context.verify_mode = ssl.CERT_NONE
+
+    def current_token(self):
+        """
+            Description: Returns the SSO token to use, obtained from the SDK connection the first time.
+            Arguments: None
+            Returns: The token string
+        """
+
+        with self.lock:
+            token = self.token
+        if token is None:
+            token = self.connection.authenticate()
+            with self.lock:
+                self.token = token
+        return token
+
+    def renew_token(self, rejected):
+        """
+            Description: Obtains a valid SSO token after oVirt rejected one. The SDK only asks for a new
+                         token when one of its own requests is rejected, so if it still holds the
+                         rejected token, a test request is sent through it first.
+            Arguments: The rejected token
+            Returns: The new token string
+        """
+
+        token = self.connection.authenticate()
+        if token == rejected:
+            self.connection.test(raise_exception=True)
+            token = self.connection.authenticate()
+        with self.lock:
+            self.token = token
+            self.renewals += 1
+        return token
+
+    def new_connection(self):
+        """
+            Description: Opens a new connection to oVirt. The handshake happens on the first request.
+            Arguments: None
+            Returns: The HTTP(S)Connection object
+        """
+
+        if self.secure:
+            return HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self.context)
+        return HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self, maxidle=None):
+        """
+            Description: Takes an idle connection from the pool, or opens a new one if there is none.
+            Arguments: maxidle: If given, connections idle for longer than this number of seconds are
+                       not taken
+            Returns: A tuple (connection, reused)
+        """
+
+        with self.lock:
+            if self.idle and (maxidle is None or monotonic() - self.idle[-1][1] < maxidle):
+                return self.idle.pop()[0], True
+        return self.new_connection(), False
+
+    def release(self, connection):
+        """
+            Description: Gives a connection back to the pool once its response has been fully read.
+            Arguments: The connection
+            Returns: Nothing
+        """
+
+        with self.lock:
+            if len(self.idle) < self.maxidle:
+                self.idle.append((connection, monotonic()))
+                return
+        connection.close()
+
+    def request(self, method, path, headers=None, payload=None):
+        """
+            Description: Sends a request to oVirt and reads the whole response. If a pooled connection
+                         was closed by the server meanwhile, the request is retried once on a new one,
+                         as long as repeating it is harmless (see IDEMPOTENTMETHODS).
+                         If the SSO token has expired, it's renewed and the request is retried once.
+            Arguments: 1. method: The HTTP method
+                       2. path: The path relative to the API URL (i.e, '/vms/<id>/graphicsconsoles')
+                       3. headers: Additional headers for this request
+                       4. payload: The request body (bytes), if any
+            Returns: The response body (bytes). RestError is raised on HTTP errors.
+        """
+
+        start = monotonic()
+        try:
+            token = self.current_token()
+            response, body = self.exchange(method, path, headers, token, payload)
+            if response.status == 401:
+                response, body = self.exchange(method, path, headers, self.renew_token(token), payload)
+
+            if response.status >= 400:
+                raise RestError(response.status, response.reason)
+        except Exception as e:
+            if self.stats:
+                self.stats.record(monotonic() - start, e)
+            raise
+
+        if self.stats:
+            self.stats.record(monotonic() - start)
+        return body
+
+    def exchange(self, method, path, headers, token, payload=None):
+        """
+            Description: Sends a request on a pooled connection and gives the connection back.
+            Arguments: 1. method: The HTTP method
+                       2. path: The path relative to the API URL
+                       3. headers: Additional headers for this request
+                       4. token: The SSO token to authenticate with
+                       5. payload: The request body (bytes), if any
+            Returns: A tuple (response, body)
+        """
+
+        allheaders = dict(self.headers)
+        allheaders['Authorization'] = 'Bearer ' + token
+        if headers:
+            allheaders.update(headers)
+
+        # Other requests may have reached oVirt before the connection failed, so they're not
+        # sent again, and only sent on connections unlikely to have been closed meanwhile
+        idempotent = method in IDEMPOTENTMETHODS
+        connection, reused = self.acquire(None if idempotent else FRESHIDLE)
+        try:
+            response, body = self.send(connection, method, path, allheaders, payload)
+        except (HTTPException, OSError):
+            if not reused or not idempotent:
+                raise
+            connection = self.new_connection()
+            response, body = self.send(connection, method, path, allheaders, payload)
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.release(connection)
+        return response, body
+
+    def send(self, connection, method, path, headers, payload=None):
+        """
+            Description: Sends a request on a given connection, closing it if anything goes wrong.
+            Arguments: 1. connection: The connection to use
+                       2. method: The HTTP method
+                       3. path: The path relative to the API URL
+                       4. headers: All the headers of the request
+                       5. payload: The request body (bytes), if any
+            Returns: A tuple (response, body)
+        """
+
+        try:
+            connection.request(method, self.basepath + path, body=payload, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (HTTPException, OSError):
+            connection.close()
+            raise
+
+        # Compressed answers are accepted, as the SDK does
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        return response, body
+
+    def get(self, path, headers=None):
+        """
+            Description: Shortcut for GET requests.
+            Arguments: 1. path: The path relative to the API URL
+                       2. headers: Additional headers for this request
+            Returns: The response body (bytes)
+        """
+
+        return self.request('GET', path, headers)
+
+    def post(self, path, payload, headers=None):
+        """
+            Description: Shortcut for POST requests.
+            Arguments: 1. path: The path relative to the API URL
+                       2. payload: The request body (bytes)
+                       3. headers: Additional headers for this request
+            Returns: The response body (bytes)
+        """
+
+        return self.request('POST', path, headers, payload)
+
+    def close(self):
+        """
+            Description: Closes all the idle connections.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, released in idle:
+            connection.close()
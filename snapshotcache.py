@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+# The last known board of each user is stored on disk, so it can be shown right after
+# authentication while the actual VM list is being fetched. One file is kept per
+# set of configured engines and user, each row being a [engine, id, name, type, os, status] list.
+
+import os
+import json
+from hashlib import sha1
+from tempfile import mkstemp
+from globalconf import conf
+
+SNAPSHOTVERSION = 2
+
+def snapshot_path():
+    """
+        Description: Returns the snapshot file of the current user in the configured engines.
+        Arguments: None
+        Returns: The file path
+    """
+
+    global conf
+
+    key = '\n'.join('%s\n%s@%s' % (engine['url'], conf.USERNAME, engine['domain']) for engine in conf.CONFIG['engines'])
+    return os.path.join(conf.SNAPSHOTDIR, sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+def load_snapshot():
+    """
+        Description: Reads the snapshot of the current user.
+        Arguments: None
+        Returns: The list of [engine, id, name, type, os, status] rows in board order, or None if there's
+                 no usable snapshot.
+    """
+
+    try:
+        with open(snapshot_path()) as handle:
+            snapshot = json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOTVERSION:
+        return None
+    rows = snapshot.get('rows')
+    if not isinstance(rows, list) or not all(isinstance(row, list) and len(row) == 6 for row in rows):
+        return None
+    return rows
+
+def save_snapshot(path, rows):
+    """
+        Description: Stores a snapshot. The file is written aside, to a temporary file of its
+                     own, and then renamed, so a snapshot is never left half-written, even if
+                     several are stored at once. Only the owner can read it.
+        Arguments: 1. path: The snapshot file, as returned by snapshot_path
+                   2. rows: The list of [engine, id, name, type, os, status] rows in board order
+        Returns: Nothing
+    """
+
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+    # Each write has a file of its own, as a background save may overlap the one at logout
+    fd, tmppath = mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w') as handle:
+            json.dump({'version': SNAPSHOTVERSION, 'rows': rows}, handle, separators=(',', ':'))
+        os.replace(tmppath, path)
+    except Exception:
+        os.remove(tmppath)
+        raise
+
+def remove_snapshot():
+    """
+        Description: Removes the snapshot of the current user, if any.
+        Arguments: None
+        Returns: Nothing
+    """
+
+    try:
+        os.remove(snapshot_path())
+    except OSError:
+        pass
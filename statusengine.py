@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+from time import time
+from globalconf import conf, EVENTSBATCH
+from ovirtsdk4 import Error
+import vmlisting
+
+class StatusEngine:
+    """
+        This class fetches the status of all the VMs the user has permissions on with one
+        single request per sweep, and compares them with the rows currently shown on the
+        board so only the rows that really changed are reported back. The VmPool list is
+        fetched too, so VMs and VmPools that appeared or disappeared are reported as well.
+
+        If the 'events' status update mode is configured, the engine's event feed is tailed
+        instead and only the VMs referenced by new events are queried. A full sweep is
+        still done every 'full_sweep_interval' seconds as a safety net.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine                        # Engine the VMs belong to
+        self.eventsusable = True                    # False once the events feed turned out to be unreadable
+        self.sweepcalls = 0                         # API calls issued during the last sweep
+        self.totalcalls = 0                         # API calls issued since the engine was created
+        self.sweeps = 0                             # Number of sweeps performed so far
+        self.lasteventid = None                     # Index of the last event seen in the events feed
+        self.lastfullsweep = 0                      # Timestamp of the last full sweep
+
+    def count_call(self):
+        """
+            Description: Accounts for one request sent to oVirt.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.sweepcalls += 1
+        self.totalcalls += 1
+
+    def fetch_vms(self):
+        """
+            Description: Gets every VM in one request, with just the fields the client uses.
+            Arguments: None
+            Returns: A dict of VM id -> VmRecord
+        """
+
+        self.count_call()
+        return dict((vm.id, vm) for vm in vmlisting.list_vms(self.engine))
+
+    def fetch_vmpools(self):
+        """
+            Description: Gets every VmPool in one request.
+            Arguments: None
+            Returns: A dict of VmPool id -> VmRecord
+        """
+
+        self.count_call()
+        return dict((vmpool.id, vmpool) for vmpool in vmlisting.list_vmpools(self.engine))
+
+    def fetch_vm(self, vmid):
+        """
+            Description: Gets a single VM, with just the fields the client uses.
+            Arguments: The VM id
+            Returns: The VmRecord, or None if the VM doesn't exist or the user has no access to it anymore
+        """
+
+        self.count_call()
+        vms = vmlisting.list_vms(self.engine, search='id=%s' % (vmid))
+        return vms[0] if vms else None
+
+    def sweep(self, vmdata):
+        """
+            Description: Performs a full sweep of the VM statuses and of the VM and VmPool
+                         memberships. The in-memory board data is not modified here, the
+                         caller decides what to do with the changes.
+            Arguments: vmdata: The VM id -> VmData dict currently shown on the board.
+            Returns: A tuple (changes, membership) as described in update.
+                     ovirtsdk4.Error is propagated on connection problems.
+        """
+
+        self.sweeps += 1
+
+        vms = self.fetch_vms()
+        vmpools = self.fetch_vmpools()
+
+        changes = []
+        removed = []
+        for vmid, vmd in vmdata.items():
+            if vmd.vmtype == 'vm':
+                if vmid not in vms:
+                    removed.append(vmid)
+                elif vms[vmid].status != vmd.vmstatus:
+                    changes.append((vmid, vms[vmid].status))
+            elif vmid not in vmpools:
+                removed.append(vmid)
+
+        newvms = [vm for vmid, vm in vms.items() if vmid not in vmdata]
+        newvmpools = [vmpool for vmpoolid, vmpool in vmpools.items() if vmpoolid not in vmdata]
+
+        return changes, self.membership(newvms, newvmpools, removed)
+
+    def membership(self, newvms, newvmpools, removed):
+        """
+            Description: Packs the membership changes found in a sweep.
+            Arguments: 1. newvms: VmRecords of the VMs that are not on the board yet
+                       2. newvmpools: VmRecords of the VmPools that are not on the board yet
+                       3. removed: Ids of the board rows that no longer exist
+            Returns: A tuple (newvms, newvmpools, removed), or None if nothing changed
+        """
+
+        if newvms or newvmpools or removed:
+            return newvms, newvmpools, removed
+        return None
+
+    def events_enabled(self):
+        """
+            Description: Checks whether the events feed should be used. If it's configured but the
+                         feed cannot be read (i.e, the user has no permissions on it), the 'polling'
+                         mode will be used for this engine for the rest of the session.
+            Arguments: None
+            Returns: True if the events feed is usable, False otherwise.
+        """
+
+        global conf
+
+        if conf.CONFIG['status_updates'] != 'events' or not self.eventsusable:
+            return False
+
+        if self.lasteventid is None:
+            try:
+                # Events are returned newest first, so we just need the first one
+                self.count_call()
+                with self.engine.stats.measure():
+                    events = self.engine.ovirtconn.events_service().list(max=1)
+                self.lasteventid = int(events[0].id) if events else 0
+            except Error:
+                self.eventsusable = False
+                return False
+        return True
+
+    def poll_events(self, vmdata):
+        """
+            Description: Reads the events that happened since the last known event index and
+                         queries only the VMs referenced by them.
+            Arguments: vmdata: The VM id -> VmData dict currently shown on the board.
+            Returns: A tuple (changes, membership) as described in update. If there were too many
+                     events to process them one by one, None is returned instead so a full sweep
+                     is done. ovirtsdk4.Error is propagated on connection problems.
+        """
+
+        self.count_call()
+        with self.engine.stats.measure():
+            events = self.engine.ovirtconn.events_service().list(from_=self.lasteventid, max=EVENTSBATCH)
+        if not events:
+            return [], None
+
+        self.lasteventid = max([self.lasteventid] + [int(event.id) for event in events])
+        if len(events) >= EVENTSBATCH:
+            # We may have missed some events, resynchronize with a full sweep
+            return None
+
+        vmids = set(event.vm.id for event in events if event.vm is not None and event.vm.id)
+        if not vmids:
+            return [], None
+
+        self.count_call()
+        vms = dict((vm.id, vm) for vm in vmlisting.list_vms(self.engine, search=' or '.join('id=%s' % (vmid) for vmid in vmids)))
+
+        changes = []
+        newvms = []
+        removed = []
+        for vmid in vmids:
+            if vmid not in vmdata:
+                if vmid in vms:
+                    # A new VM the user has access to
+                    newvms.append(vms[vmid])
+            elif vmid not in vms:
+                # A VM that has been removed or the user has no access to anymore
+                removed.append(vmid)
+            elif vms[vmid].status != vmdata[vmid].vmstatus:
+                changes.append((vmid, vms[vmid].status))
+
+        # VmPools are not referenced by events, they're only checked on full sweeps
+        return changes, self.membership(newvms, [], removed)
+
+    def update(self, vmdata):
+        """
+            Description: Entry point for the background thread. Depending on the configured mode
+                         and the time elapsed since the last full sweep, it will either tail the
+                         events feed or perform a full sweep.
+            Arguments: vmdata: The VM id -> VmData dict currently shown on the board.
+            Returns: A tuple (changes, membership): changes is a list of (vmid, newstatus) for rows
+                     whose status changed, membership is None if no VM or VmPool has appeared or
+                     disappeared, or a tuple (newvms, newvmpools, removed) otherwise.
+                     ovirtsdk4.Error is propagated on connection problems.
+        """
+
+        global conf
+
+        self.sweepcalls = 0
+
+        if self.events_enabled() and time() - self.lastfullsweep < conf.CONFIG['full_sweep_interval']:
+            result = self.poll_events(vmdata)
+            if result is not None:
+                return result
+
+        result = self.sweep(vmdata)
+        self.lastfullsweep = time()
+        return result
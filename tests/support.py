@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Fixtures of the tests that need an oVirt engine: the fake engine of the benchmark is
+# started on a local port and the client is configured and logged in against it, the
+# same way the Credentials dialog does, under the offscreen Qt platform.
+
+import os
+import sys
+import unittest
+from time import monotonic
+from tempfile import mkdtemp
+from shutil import rmtree
+
+TESTSDIR = os.path.dirname(os.path.abspath(__file__))
+ROOTDIR = os.path.dirname(TESTSDIR)
+sys.path.insert(0, ROOTDIR)
+sys.path.insert(0, os.path.join(ROOTDIR, 'benchmark'))
+os.chdir(ROOTDIR)                                   # Translations are loaded from the relative 'lang' dir
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from fakeengine import FakeEngine
+from globalconf import conf
+from engines import Engine, connect_engines
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEventLoop
+import ovirtclient
+
+APP = QApplication.instance() or QApplication(sys.argv)
+ovirtclient.preload_pixmaps()
+
+class EngineTestCase(unittest.TestCase):
+    """
+        Starts a fake engine with NUMVMS VMs and NUMPOOLS VmPools for the test case and logs
+        in to it. The settings file only has the options needed to reach it and the SETTINGS
+        of the test case, so every other setting has its default value. The console prefetch
+        is disabled so only the requests of the tests are sent.
+    """
+
+    NUMVMS = 20
+    NUMPOOLS = 2
+    SETTINGS = ''                                   # Additional sections of the settings file
+
+    @classmethod
+    def setUpClass(cls):
+        global conf
+
+        cls.workdir = mkdtemp(prefix='ovirtclient-tests-')
+        cls.engine = FakeEngine(cls.NUMVMS, cls.NUMPOOLS).start()
+
+        cafile = os.path.join(cls.workdir, 'ca.crt')
+        open(cafile, 'w').close()
+        conf.CONFIGFILE = os.path.join(cls.workdir, 'settings.conf')
+        with open(conf.CONFIGFILE, 'w') as handle:
+            handle.write('[ovirt]\nurl=%s\ndomain=internal\ncafile=%s\n\n' % (cls.engine.url, cafile))
+            handle.write('[app]\nremote_viewer_path=/bin/true\nconsole_prefetch=0\n\n')
+            handle.write(cls.SETTINGS)
+        conf.USERCREDSFILE = os.path.join(cls.workdir, 'creds')
+        conf.SNAPSHOTDIR = os.path.join(cls.workdir, 'snapshots')
+        ovirtclient.checkConfig().install()
+
+        settings = conf.CONFIG['engines'][0]
+        cls.ovirt = Engine(settings['name'], settings['url'], settings['cafile'], settings['domain'])
+        failures = connect_engines([cls.ovirt], 'test', 'test', int(conf.CONFIG['conntimeout']))
+        if failures:
+            cls.engine.stop()
+            raise unittest.SkipTest('Cannot authenticate to the fake engine: %s' % (failures[cls.ovirt.name]))
+        conf.ENGINES = {cls.ovirt.name: cls.ovirt}
+        conf.USERNAME = 'test'
+        conf.PASSWORD = 'test'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ovirt.close()
+        cls.engine.stop()
+        rmtree(cls.workdir, ignore_errors=True)
+
+    def wait_for(self, predicate, timeout=30):
+        """
+            Description: Runs the Qt event loop until a condition is met, so the callbacks of the
+                         worker pool are delivered.
+            Arguments: 1. predicate: Callable returning True once the operation is over
+                       2. timeout: Maximum number of seconds to wait
+            Returns: Nothing
+        """
+
+        deadline = monotonic() + timeout
+        while not predicate():
+            if monotonic() > deadline:
+                self.fail('Operation did not complete in %d seconds' % (timeout))
+            APP.processEvents(QEventLoop.AllEvents, 10)
+
+class ClientTestCase(EngineTestCase):
+    """
+        An EngineTestCase with an OvirtClient whose board has been loaded, without the status
+        thread, so the tests decide when statuses are refreshed.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.client = ovirtclient.OvirtClient()
+        cls.client.refreshing = True                # So loading the board doesn't start the status threads
+        cls.client.load_vms()
+        deadline = monotonic() + 30
+        while cls.client.loading and monotonic() < deadline:
+            APP.processEvents(QEventLoop.AllEvents, 10)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.logout(reconnect=False)
+        cls.client.deleteLater()
+        APP.processEvents()
+        super().tearDownClass()
+
+    def running_vm(self):
+        """
+            Description: Picks a running VM on the board.
+            Arguments: None
+            Returns: The VM id
+        """
+
+        return next(vmid for vmid, vmd in self.client.enginevmdata[self.ovirt.name].items() if vmd.vmtype == 'vm' and vmd.vmstatus == 'up')
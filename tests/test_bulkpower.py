@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the bulk power actions against the fake engine.
+
+import unittest
+
+from support import ClientTestCase
+from globalconf import conf
+
+class BulkPowerTest(ClientTestCase):
+    """
+        Power actions of several VMs are sent concurrently. A latency is forced so the overlap
+        can be measured.
+    """
+
+    NUMPOOLS = 0
+    LATENCY = 0.05
+
+    def test_concurrent(self):
+        name = self.ovirt.name
+        vms = [(self.ovirt, vmid, vmd.vmname) for vmid, vmd in self.client.enginevmdata[name].items() if vmd.vmtype == 'vm' and vmd.vmstatus == 'down'][:conf.CONFIG['bulk_workers']]
+        self.assertGreater(len(vms), 1)
+
+        self.engine.latency = self.LATENCY
+        self.engine.reset_calls()
+        try:
+            results, elapsed, curvmstatus = self.client.bulk_power_action(vms, 'down')
+        finally:
+            self.engine.latency = 0.0
+
+        self.assertEqual([(vmname, e) for engine, vmname, e in results], [(vmname, None) for engine, vmid, vmname in vms])
+        self.assertEqual(self.engine.calls['vm_action'], len(vms))
+        self.assertEqual(curvmstatus, 'down')
+        self.assertLess(elapsed, self.LATENCY * len(vms) / 2)
+
+if __name__ == '__main__':
+    unittest.main()
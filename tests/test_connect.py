@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of connections that time out against the fake engine.
+
+import os
+import unittest
+
+from support import ClientTestCase
+from globalconf import conf
+from apiworkers import OperationTimeout
+from latency import ConnectTiming
+
+def viewer_files():
+    """
+        Description: Lists the console files held in memory by this process.
+        Arguments: None
+        Returns: A list of file descriptors
+    """
+
+    files = []
+    for fd in os.listdir('/proc/self/fd'):
+        try:
+            if os.readlink('/proc/self/fd/' + fd).startswith('/memfd:viewer.vv'):
+                files.append(fd)
+        except OSError:
+            pass
+    return files
+
+class ConnectTimeoutTest(ClientTestCase):
+    """
+        A console file arriving after its connection timed out is released, as it holds the
+        console ticket. A latency is forced so the connection times out.
+    """
+
+    NUMPOOLS = 0
+
+    def viewer_file_failed(self, key, vmname, e):
+        # Replaces the failure callback of the client, which shows a message box
+        self.errors.append(e)
+        self.client.viewers.release(key)
+        self.client.connecting.pop(key)
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), 'needs /proc to find the console files')
+    def test_late_console_file(self):
+        vmid = self.running_vm()
+        key = (self.ovirt.name, vmid)
+        self.ovirt.consolecache.invalidate(vmid)
+        before = len(viewer_files())
+
+        self.errors = []
+        timeouts = conf.CONFIG['timeouts']
+        self.engine.latency = 0.2
+        conf.CONFIG['timeouts'] = dict(timeouts, connect=0.1)
+        self.client.viewer_file_failed = self.viewer_file_failed
+        try:
+            self.client.viewers.reserve(key)
+            self.client.connecting[key] = ConnectTiming('VM-0001', self.ovirt.name)
+            self.client.connect2machine(key, 'VM-0001')
+            self.wait_for(lambda: self.errors)
+            self.wait_for(lambda: not conf.EXECUTOR.tasks)
+        finally:
+            del self.client.viewer_file_failed
+            conf.CONFIG['timeouts'] = timeouts
+            self.engine.latency = 0.0
+
+        self.assertEqual(len(self.errors), 1)
+        self.assertIsInstance(self.errors[0], OperationTimeout)
+        self.assertEqual(len(viewer_files()), before)
+        self.assertNotIn(key, self.client.viewers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the request counters of an engine.
+
+import unittest
+
+from support import ClientTestCase
+from engines import EngineStats
+
+class EngineStatsTest(unittest.TestCase):
+    """
+        Latencies and errors accounted for each request
+    """
+
+    def test_record(self):
+        stats = EngineStats()
+        self.assertEqual(stats.average(), 0.0)
+        self.assertIsNone(stats.rtt())
+
+        stats.record(0.2)
+        stats.record(0.1)
+        stats.record(0.05, ValueError('down'))
+        self.assertEqual((stats.requests, stats.errors, stats.lasterror), (3, 1, 'down'))
+        self.assertAlmostEqual(stats.average(), 0.35 / 3)
+        self.assertEqual((stats.maxtime, stats.lasttime), (0.2, 0.05))
+        # Failed requests are left out of the RTT estimate
+        self.assertEqual(stats.rtt(), 0.1)
+
+    def test_measure(self):
+        stats = EngineStats()
+        with stats.measure():
+            pass
+        with self.assertRaises(ValueError):
+            with stats.measure():
+                raise ValueError('down')
+        self.assertEqual((stats.requests, stats.errors, stats.lasterror), (2, 1, 'down'))
+
+class EngineCountersTest(ClientTestCase):
+    """
+        Requests sent to the fake engine while logging in and loading the board
+    """
+
+    NUMPOOLS = 0
+
+    def test_counters(self):
+        stats = self.ovirt.stats
+        self.assertGreater(stats.requests, 0)
+        self.assertEqual(stats.errors, 0, stats.lasterror)
+        self.assertLessEqual(stats.rtt(), stats.average())
+
+if __name__ == '__main__':
+    unittest.main()
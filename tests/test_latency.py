@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the connect path timings: stages, log lines and the rolling histogram shown in
+# the About dialog.
+
+import json
+import unittest
+
+from support import ClientTestCase
+from globalconf import LATENCYBUCKETS
+from latency import CONNECTSTAGES, ConnectTiming, LatencyHistogram
+
+def sample(seconds):
+    """
+        Description: Builds the timing of a connection whose ticket took some time.
+        Arguments: The seconds of the 'ticket' stage, which is the whole connection
+        Returns: The ConnectTiming
+    """
+
+    timing = ConnectTiming('VM-0001', 'localhost')
+    timing.stages['ticket'] = seconds
+    timing.last = timing.started + seconds
+    return timing
+
+class ConnectTimingTest(unittest.TestCase):
+    """
+        Stages of one connection and its log line
+    """
+
+    def test_stages_add_up(self):
+        timing = ConnectTiming('VM-0001', 'localhost')
+        for stage in ('queue', 'ticket', 'ticket', 'vvfetch'):
+            timing.mark(stage)
+        self.assertEqual(list(timing.stages), ['queue', 'ticket', 'vvfetch'])
+        self.assertAlmostEqual(sum(timing.stages.values()), timing.elapsed('total'))
+        self.assertEqual(timing.elapsed('spawn'), 0.0)
+
+    def test_logline(self):
+        timing = sample(0.25)
+        timing.profile = 'wan'
+        line = timing.logline('viewer_failed')
+        self.assertTrue(line.startswith('[LATENCY] '))
+        record = json.loads(line[len('[LATENCY] '):])
+        self.assertEqual((record['event'], record['vm'], record['engine'], record['profile'], record['outcome']), ('connect', 'VM-0001', 'localhost', 'wan', 'viewer_failed'))
+        self.assertEqual(set(key for key in record if key.endswith('_ms')), set(stage + '_ms' for stage in CONNECTSTAGES + ('total',)))
+        self.assertEqual((record['ticket_ms'], record['total_ms'], record['spawn_ms']), (250.0, 250.0, 0.0))
+
+class LatencyHistogramTest(unittest.TestCase):
+    """
+        Percentiles and buckets of the last connections
+    """
+
+    def setUp(self):
+        self.histogram = LatencyHistogram(10)
+        for tenths in range(1, 21):
+            self.histogram.add(sample(tenths * 0.1))
+
+    def test_rolling(self):
+        # Only the last 10 connections are kept: 1.1 to 2.0 seconds
+        self.assertEqual(len(self.histogram), 10)
+        self.assertAlmostEqual(self.histogram.percentile('total', 0), 1.1)
+
+    def test_percentiles(self):
+        self.assertAlmostEqual(self.histogram.percentile('ticket', 0.5), 1.5)
+        self.assertAlmostEqual(self.histogram.percentile('total', 0.95), 2.0)
+        self.assertEqual(self.histogram.percentile('vvfetch', 0.95), 0.0)
+        self.assertEqual(LatencyHistogram().percentile('total', 0.5), 0.0)
+
+    def test_buckets(self):
+        buckets = self.histogram.buckets()
+        self.assertEqual(len(buckets), len(LATENCYBUCKETS) + 1)
+        self.assertEqual(sum(buckets), 10)
+        self.assertEqual(buckets[LATENCYBUCKETS.index(2500)], 10)
+
+class ConnectStagesTest(ClientTestCase):
+    """
+        Stages timed by the worker while fetching a console file from the fake engine
+    """
+
+    NUMPOOLS = 0
+
+    def test_worker_stages(self):
+        timing = ConnectTiming('VM-0001', self.ovirt.name)
+        self.client.fetch_viewer_file(self.ovirt, self.running_vm(), None, timing).close()
+        self.assertEqual(list(timing.stages), ['queue', 'ticket', 'vvfetch', 'vvwrite'])
+        self.assertAlmostEqual(sum(timing.stages.values()), timing.elapsed('total'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the refresh cadence decided by the poll scheduler.
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from globalconf import conf, UPDATESLEEPINTERVAL, FASTPOLLINTERVAL, POLLBACKOFF, HIDDENPOLLFACTOR, MAXERRORINTERVAL, POLLJITTER
+from pollscheduler import PollScheduler
+
+MAXPOLLINTERVAL = 30
+
+class PollSchedulerTest(unittest.TestCase):
+    """
+        Intervals between refreshes, jitter included
+    """
+
+    def setUp(self):
+        self.maxpollinterval = conf.CONFIG.get('max_poll_interval')
+        conf.CONFIG['max_poll_interval'] = MAXPOLLINTERVAL
+        self.scheduler = PollScheduler()
+        self.vmdata = dict(('vm%d' % (i), SimpleNamespace(vmstatus='up' if i % 2 else 'down')) for i in range(10))
+
+    def tearDown(self):
+        if self.maxpollinterval is None:
+            del conf.CONFIG['max_poll_interval']
+        else:
+            conf.CONFIG['max_poll_interval'] = self.maxpollinterval
+
+    def idle_intervals(self, refreshes, hidden=False):
+        intervals = []
+        for i in range(refreshes):
+            intervals.append(self.scheduler.next_interval(self.vmdata, hidden))
+            self.scheduler.succeeded(False)
+        return intervals
+
+    def test_steady_state_slows_down(self):
+        intervals = self.idle_intervals(10)
+        self.assertLessEqual(intervals[0], UPDATESLEEPINTERVAL * (1 + POLLJITTER))
+        self.assertGreater(intervals[1], intervals[0])
+        self.assertLessEqual(max(intervals), MAXPOLLINTERVAL * (1 + POLLJITTER))
+        self.assertGreaterEqual(intervals[-1], MAXPOLLINTERVAL * (1 - POLLJITTER))
+
+    def test_change_starts_over(self):
+        self.idle_intervals(10)
+        self.scheduler.succeeded(True)
+        self.assertLessEqual(self.scheduler.next_interval(self.vmdata, False), UPDATESLEEPINTERVAL * (1 + POLLJITTER))
+
+    def test_hidden(self):
+        intervals = self.idle_intervals(10, True)
+        self.assertGreater(max(intervals), MAXPOLLINTERVAL * (1 + POLLJITTER))
+        self.assertLessEqual(max(intervals), MAXPOLLINTERVAL * HIDDENPOLLFACTOR * (1 + POLLJITTER))
+
+    def test_transitional(self):
+        self.idle_intervals(10)
+        self.vmdata['vm0'].vmstatus = 'powering_up'
+        self.assertLessEqual(self.scheduler.next_interval(self.vmdata, False), FASTPOLLINTERVAL * (1 + POLLJITTER))
+
+        # Watched VMs are polled on their own
+        self.scheduler.watched.add('vm0')
+        self.assertGreater(self.scheduler.next_interval(self.vmdata, False), FASTPOLLINTERVAL * (1 + POLLJITTER))
+
+    def test_error_backoff(self):
+        bounds = []
+        for i in range(20):
+            self.scheduler.failed()
+            interval = self.scheduler.next_interval(self.vmdata, False)
+            bound = min(MAXERRORINTERVAL, UPDATESLEEPINTERVAL * POLLBACKOFF ** (i + 1))
+            # Equal jitter, between half the backoff and the whole of it
+            self.assertGreaterEqual(interval, bound / 2)
+            self.assertLessEqual(interval, bound)
+            bounds.append(bound)
+        self.assertEqual(bounds[-1], MAXERRORINTERVAL)
+
+        self.scheduler.succeeded(False)
+        self.assertLessEqual(self.scheduler.next_interval(self.vmdata, False), MAXPOLLINTERVAL * (1 + POLLJITTER))
+
+    def test_wake(self):
+        self.idle_intervals(10)
+        self.scheduler.wake()
+        self.assertTrue(self.scheduler.event.is_set())
+        self.assertLessEqual(self.scheduler.next_interval(self.vmdata, False), UPDATESLEEPINTERVAL * (1 + POLLJITTER))
+
+if __name__ == '__main__':
+    unittest.main()
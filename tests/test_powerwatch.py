@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the per-VM watch started after a power action, against the fake engine.
+
+import threading
+import unittest
+from time import monotonic
+
+from support import ClientTestCase
+from globalconf import VMWATCHINTERVAL
+
+class PowerWatchTest(ClientTestCase):
+    """
+        The row of a VM follows its status after a power action, well before the next refresh
+    """
+
+    def down_vm(self):
+        return next(vmid for vmid, vmd in self.client.enginevmdata[self.ovirt.name].items() if vmd.vmtype == 'vm' and vmd.vmstatus == 'down')
+
+    def tearDown(self):
+        self.engine.transitiontime = None
+
+    def test_power_on(self):
+        vmid = self.down_vm()
+        self.engine.transitiontime = 0.1
+
+        self.engine.reset_calls()
+        start = monotonic()
+        self.client.power_action(self.ovirt, vmid, 'down')
+        self.client.watch_vm(self.ovirt, vmid, 'up', 'down')
+        elapsed = monotonic() - start
+
+        self.assertEqual(self.client.enginevmdata[self.ovirt.name][vmid].vmstatus, 'up')
+        self.assertLess(elapsed, VMWATCHINTERVAL * 3)
+        # Single-VM requests only
+        self.assertEqual(set(self.engine.calls), set(['vm_action', 'vms_list']))
+        self.assertNotIn(vmid, self.ovirt.scheduler.watched)
+
+    def test_failing_start(self):
+        # A VM failing to start goes back to down, the watch must end then too
+        vmid = self.down_vm()
+        self.client.power_action(self.ovirt, vmid, 'down')
+        timer = threading.Timer(VMWATCHINTERVAL * 1.5, self.engine.set_status, (vmid, 'down'))
+        timer.start()
+        start = monotonic()
+        try:
+            self.client.watch_vm(self.ovirt, vmid, 'up', 'down')
+        finally:
+            timer.cancel()
+        elapsed = monotonic() - start
+
+        self.assertEqual(self.client.enginevmdata[self.ovirt.name][vmid].vmstatus, 'down')
+        self.assertLess(elapsed, VMWATCHINTERVAL * 4)
+
+if __name__ == '__main__':
+    unittest.main()
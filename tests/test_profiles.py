@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the viewer performance profiles: how they're read from the settings file, how
+# the profile of a viewer is chosen and how it's applied to its console file.
+
+import unittest
+
+from support import ClientTestCase
+from globalconf import conf
+from profiles import Profile, choose_profile
+import vvfile
+
+PROFILES = {'lan': Profile('lan', {'color-depth': ''}, [], [], [], 20),
+            'wan': Profile('wan', {'enable-usbredir': '0', 'disable-channels': 'smartcard'}, ['--spice-preferred-compression=lz4'], ['remote*'], [], 300),
+            'lab': Profile('lab', {'monitors': '0'}, [], [], ['lab-*'], None)}
+
+class ChooseProfileTest(unittest.TestCase):
+    """
+        Precedence of VM patterns, user patterns and app->profile
+    """
+
+    def name(self, default, username, vmname, rtt):
+        profile = choose_profile(PROFILES, default, username, vmname, rtt)
+        return profile.name if profile else None
+
+    def test_vm_patterns_first(self):
+        self.assertEqual(self.name('auto', 'remote1', 'lab-01', 0.001), 'lab')
+
+    def test_user_patterns_before_default(self):
+        self.assertEqual(self.name('lan', 'remote1', 'VM-0001', 0.001), 'wan')
+
+    def test_default(self):
+        self.assertEqual(self.name('lab', 'admin', 'VM-0001', 0.001), 'lab')
+        self.assertIsNone(self.name('none', 'admin', 'VM-0001', 0.001))
+
+    def test_automatic(self):
+        # The lowest max_rtt not below the RTT, the highest one above all of them
+        self.assertEqual([self.name('auto', 'admin', 'VM-0001', rtt) for rtt in (0.005, 0.02, 0.1, 2)], ['lan', 'lan', 'wan', 'wan'])
+
+    def test_automatic_unknown_rtt(self):
+        self.assertIsNone(self.name('auto', 'admin', 'VM-0001', None))
+        self.assertIsNone(choose_profile({'lab': PROFILES['lab']}, 'auto', 'admin', 'VM-0001', 0.001))
+
+class ProfileViewerFileTest(ClientTestCase):
+    """
+        Profiles read from the settings file and applied to console files
+    """
+
+    NUMPOOLS = 0
+    SETTINGS = ('[profile:wan]\nenable-usbredir = 0\ndisable-channels = smartcard;usbredir\n'
+                'viewer_args = --spice-preferred-compression=lz4 "--title=slow link"\nusers = remote*, guest\nmax_rtt = 300\n')
+
+    def test_settings(self):
+        profile = conf.CONFIG['profiles']['wan']
+        self.assertEqual(profile.vv, {'enable-usbredir': '0', 'disable-channels': 'smartcard;usbredir'})
+        self.assertEqual(profile.args, ['--spice-preferred-compression=lz4', '--title=slow link'])
+        self.assertEqual(profile.users, ['remote*', 'guest'])
+        self.assertEqual(profile.maxrtt, 300)
+        self.assertEqual(conf.CONFIG['profile'], 'auto')
+
+    def test_rtt(self):
+        rtt = self.ovirt.stats.rtt()
+        self.assertIsNotNone(rtt)
+        self.assertLessEqual(rtt, self.ovirt.stats.average())
+
+    def test_console_file(self):
+        vmid = self.running_vm()
+        ticket = self.client.get_viewer_ticket(self.ovirt, vmid)
+        viewerfile = self.client.store_vv_file(self.ovirt, vmid, ticket, conf.CONFIG['profiles']['wan'])
+        try:
+            with open(viewerfile.path, 'rb') as handle:
+                viewer = vvfile.parse_vv(handle.read())[vvfile.VVSECTION]
+        finally:
+            viewerfile.close()
+        self.assertEqual(viewer['enable-usbredir'], '0')
+        self.assertEqual(viewer['disable-channels'], 'smartcard;usbredir')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the pooled REST session: requests failing on a reused connection after being
+# sent are only sent again if that's harmless.
+
+import socket
+import threading
+import unittest
+from time import monotonic
+from http.client import HTTPConnection
+
+from support import ClientTestCase
+from restsession import FRESHIDLE
+
+class RequestRetryTest(ClientTestCase):
+    """
+        Reused connections go to a server that reads the request and closes without answering,
+        as oVirt would if it failed meanwhile
+    """
+
+    NUMPOOLS = 0
+
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(5)
+        self.received = []
+        thread = threading.Thread(target=self.serve)
+        thread.daemon = True
+        thread.start()
+
+        self.session = self.ovirt.restsession
+        self.vmid = self.running_vm()
+        self.engine.reset_calls()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.close()
+        self.engine.set_status(self.vmid, 'up')
+
+    def serve(self):
+        while True:
+            try:
+                client, address = self.server.accept()
+            except OSError:
+                return
+            self.received.append(client.recv(65536))
+            client.close()
+
+    def broken(self, idle=0):
+        """
+            Description: Makes the broken server the next idle connection of the session.
+            Arguments: Seconds the connection has been idle for
+            Returns: Nothing
+        """
+
+        self.session.idle.append((HTTPConnection('127.0.0.1', self.server.getsockname()[1], timeout=5), monotonic() - idle))
+
+    def test_get_retried(self):
+        self.broken()
+        self.session.get('/vms/%s/graphicsconsoles' % (self.vmid))
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.engine.calls['graphicsconsoles_list'], 1)
+
+    def test_power_action_not_retried(self):
+        self.broken()
+        with self.assertRaises(Exception):
+            self.ovirt.vm_action(self.vmid, 'shutdown')
+        self.assertEqual(len(self.received), 1)
+        self.assertFalse(self.engine.calls['vm_action'])
+
+    def test_power_action_fresh_connection(self):
+        # Power actions must not take connections idle for long, as they're not retried
+        self.broken(FRESHIDLE + 1)
+        self.ovirt.vm_action(self.vmid, 'shutdown')
+        self.assertEqual(len(self.received), 0)
+        self.assertEqual(self.engine.calls['vm_action'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the on-disk snapshot of the board.
+
+import os
+import sys
+import json
+import threading
+import unittest
+from tempfile import mkdtemp
+from shutil import rmtree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshotcache import SNAPSHOTVERSION, save_snapshot
+
+class SaveSnapshotTest(unittest.TestCase):
+    """
+        Snapshots are written atomically, only readable by the owner
+    """
+
+    def setUp(self):
+        self.workdir = mkdtemp(prefix='ovirtclient-tests-')
+        self.path = os.path.join(self.workdir, 'snapshots', 'user.json')
+
+    def tearDown(self):
+        rmtree(self.workdir, ignore_errors=True)
+
+    def rows(self, count):
+        return [['localhost', str(i), 'VM-%04d' % (i), 'vm', 'other', 'up'] for i in range(count)]
+
+    def test_save(self):
+        save_snapshot(self.path, self.rows(3))
+        with open(self.path) as handle:
+            self.assertEqual(json.load(handle), {'version': SNAPSHOTVERSION, 'rows': self.rows(3)})
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['user.json'])
+
+    def test_concurrent_saves(self):
+        # i.e. a background save and the one at logout
+        counts = [1000 + i for i in range(8)]
+        threads = [threading.Thread(target=save_snapshot, args=(self.path, self.rows(count))) for count in counts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(self.path) as handle:
+            self.assertIn(len(json.load(handle)['rows']), counts)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['user.json'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the status refresh against the fake engine: in steady state it must report
+# nothing, so the board is never reloaded, and VMs that appear or disappear must only
+# insert or remove their own row.
+
+import unittest
+
+from support import ClientTestCase
+from globalconf import conf
+
+class StatusEngineTest(ClientTestCase):
+    """
+        StatusEngine.update and how its results are applied to the board
+    """
+
+    def setUp(self):
+        self.name = self.ovirt.name
+        self.model = self.client.model
+        self.counters = {'inserted': 0, 'removed': 0, 'reset': 0}
+        self.model.rowsInserted.connect(self.rows_inserted)
+        self.model.rowsRemoved.connect(self.rows_removed)
+        self.model.modelReset.connect(self.model_reset)
+
+    def tearDown(self):
+        self.model.rowsInserted.disconnect(self.rows_inserted)
+        self.model.rowsRemoved.disconnect(self.rows_removed)
+        self.model.modelReset.disconnect(self.model_reset)
+        conf.CONFIG['status_updates'] = 'polling'
+
+    def rows_inserted(self, parent, first, last):
+        self.counters['inserted'] += last - first + 1
+
+    def rows_removed(self, parent, first, last):
+        self.counters['removed'] += last - first + 1
+
+    def model_reset(self):
+        self.counters['reset'] += 1
+
+    def update(self):
+        """
+            Description: Runs one status refresh and applies its membership changes to the board,
+                         as the status thread does.
+            Arguments: None
+            Returns: The (changes, membership) tuple of StatusEngine.update
+        """
+
+        changes, membership = self.ovirt.statusengine.update(self.client.enginevmdata[self.name])
+        if membership:
+            self.client.update_membership(self.name, *membership)
+        return changes, membership
+
+    def assert_steady(self):
+        for i in range(5):
+            self.assertEqual(self.update(), ([], None), 'sweep %d' % (i))
+        self.assertEqual(self.counters, {'inserted': 0, 'removed': 0, 'reset': 0})
+
+    def test_steady_state_polling(self):
+        self.assert_steady()
+
+    def test_steady_state_events(self):
+        conf.CONFIG['status_updates'] = 'events'
+        self.assert_steady()
+
+    def test_membership(self):
+        rows = self.model.rowCount()
+
+        # Sorted among the existing VMs, so it's inserted mid-board
+        vmid = self.engine.add_vm('VM-0001-test')
+        changes, membership = self.update()
+        self.assertIsNotNone(membership)
+        self.assertEqual(self.model.rowCount(), rows + 1)
+        self.assertIn((self.name, vmid), self.client.vmdata)
+        row = self.model.row_of((self.name, vmid))
+        self.assertEqual(self.model.vms[row].key, (self.name, vmid))
+        self.assertEqual(self.model.sortkeys, sorted(self.model.sortkeys))
+        self.assertEqual(self.model.sortkeys, [vmd.sortkey for vmd in self.model.vms])
+
+        self.engine.remove_vm(vmid)
+        changes, membership = self.update()
+        self.assertIsNotNone(membership)
+        self.assertEqual(self.model.rowCount(), rows)
+        self.assertNotIn((self.name, vmid), self.client.vmdata)
+        self.assertEqual(self.model.sortkeys, [vmd.sortkey for vmd in self.model.vms])
+
+        self.assertEqual(self.counters, {'inserted': 1, 'removed': 1, 'reset': 0})
+
+    def test_status_change(self):
+        vmid = self.running_vm()
+        self.engine.set_status(vmid, 'down')
+        try:
+            self.assertEqual(self.update(), ([(vmid, 'down')], None))
+        finally:
+            self.engine.set_status(vmid, 'up')
+        self.assertEqual(self.counters['reset'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
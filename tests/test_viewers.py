@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the viewers left running at logout. Run them from the root of the repository
+# with: python3 -m unittest discover tests
+
+import os
+import sys
+import unittest
+from time import monotonic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import viewers
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent
+
+APP = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+class DetachTest(unittest.TestCase):
+    """
+        Viewers detached at logout keep running and keep their console file for a while,
+        their QProcess objects are released.
+    """
+
+    def setUp(self):
+        self.supervisor = viewers.ViewerSupervisor()
+        self.vvfile = viewers.ViewerFile(b'[virt-viewer]\ntype=spice\n')
+        self.session = self.supervisor.start(('engine', 'vm'), 'VM-0001', '/bin/sleep', ['5'], self.vvfile)
+        self.assertTrue(self.session.process.waitForStarted(5000))
+        self.pid = self.session.process.processId()
+
+    def tearDown(self):
+        self.vvfile.close()
+        try:
+            os.kill(self.pid, 9)
+        except OSError:
+            pass
+
+    def wait_for(self, condition, timeout=5):
+        deadline = monotonic() + timeout
+        while not condition():
+            if monotonic() > deadline:
+                self.fail('Timed out')
+            APP.processEvents()
+
+    def test_file_kept_while_starting(self):
+        process = self.session.process
+        self.supervisor.detach_all()
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+        self.assertTrue(sip.isdeleted(process))
+        os.kill(self.pid, 0)                        # Still running
+        self.assertEqual(self.supervisor.sessions, {})
+        self.assertIsNotNone(self.vvfile.fd or self.vvfile.tmppath)
+
+    def test_file_released_after_grace(self):
+        grace = viewers.VIEWERFILEGRACE
+        viewers.VIEWERFILEGRACE = 0.2
+        try:
+            self.supervisor.detach_all()
+        finally:
+            viewers.VIEWERFILEGRACE = grace
+        self.wait_for(lambda: not self.supervisor.detached)
+        self.assertIsNone(self.vvfile.fd)
+        self.assertIsNone(self.vvfile.tmppath)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the lean VM and VmPool listing parser.
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ovirtsdk4 import Error
+from vmlisting import lean_parse
+
+VMS = (b'<vms><vm href="/ovirt-engine/api/vms/1" id="1"><name>VM-0001</name><status>up</status>'
+       b'<os><type>rhel_7x64</type><boot><devices><device>hd</device></devices></boot></os>'
+       b'<disk_attachments href="/ovirt-engine/api/vms/1/diskattachments"/></vm>'
+       b'<vm href="/ovirt-engine/api/vms/2" id="2"><name>VM-0002</name><status>down</status>'
+       b'<original_template id="0"><name>Blank</name></original_template></vm></vms>')
+
+class LeanParseTest(unittest.TestCase):
+    """
+        Only the fields used by the client are kept, malformed answers fail as the SDK would
+    """
+
+    def test_vms(self):
+        records = [(vm.id, vm.name, vm.status, vm.ostype) for vm in lean_parse(VMS, 'vm')]
+        self.assertEqual(records, [('1', 'VM-0001', 'up', 'rhel_7x64'), ('2', 'VM-0002', 'down', None)])
+
+    def test_vmpools(self):
+        records = lean_parse(b'<vm_pools><vm_pool id="3"><name>pool</name><vm id="4"/></vm_pool></vm_pools>', 'vm_pool')
+        self.assertEqual([(vmpool.id, vmpool.name, vmpool.status) for vmpool in records], [('3', 'pool', None)])
+
+    def test_empty(self):
+        self.assertEqual(lean_parse(b'<vms/>', 'vm'), [])
+
+    def test_malformed(self):
+        for body in (VMS[:len(VMS) // 2], b'<html><body>Service Unavailable</body>', b'', b'Service Unavailable'):
+            with self.assertRaises(Error):
+                lean_parse(body, 'vm')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+
+# Tests of the console file parser and of the [vv] overrides. Run them from the root of
+# the repository with: python3 -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vvfile
+
+# A console file as sent by oVirt
+VV = (b'[virt-viewer]\ntype=spice\nhost=127.0.0.1\nport=5900\npassword=secret\n'
+      b'delete-this-file=1\nfullscreen=0\ntitle=VM-0001:%d\ntoggle-fullscreen=shift+f11\n'
+      b'release-cursor=shift+f12\nsecure-attention=ctrl+alt+end\ntls-port=5901\n'
+      b'enable-smartcard=0\nenable-usb-autoshare=1\nusb-filter=-1,-1,-1,-1,0\n'
+      b'secure-channels=main;inputs;cursor;playback;record;display;smartcard;usbredir\n'
+      b'\n[ovirt]\nhost=127.0.0.1:443\nvm-guid=00000000-0000-0000-0000-000000000001\n')
+
+OVERRIDES = {'fullscreen': '1', 'usb-filter': '', 'monitors': '0,1', 'proxy': ''}
+
+class RewriteVvTest(unittest.TestCase):
+    """
+        How the [vv] overrides are applied to a console file
+    """
+
+    def setUp(self):
+        self.original = vvfile.parse_vv(VV)
+        self.rewritten = vvfile.rewrite_vv(VV, OVERRIDES)
+        self.sections = vvfile.parse_vv(self.rewritten)
+        self.viewer = self.sections[vvfile.VVSECTION]
+
+    def test_overridden_in_place(self):
+        self.assertEqual(self.viewer['fullscreen'], '1')
+        self.assertEqual([line.split(b'=')[0] for line in self.rewritten.splitlines()].count(b'fullscreen'), 1)
+        self.assertEqual(list(self.viewer).index('fullscreen'), list(self.original[vvfile.VVSECTION]).index('fullscreen'))
+
+    def test_missing_setting_added(self):
+        self.assertEqual(self.viewer['monitors'], '0,1')
+
+    def test_empty_value_removes(self):
+        self.assertNotIn('usb-filter', self.viewer)
+        self.assertNotIn('proxy', self.viewer)
+
+    def test_rest_of_file_kept(self):
+        unchanged = lambda settings: dict((key, value) for key, value in settings.items() if key not in OVERRIDES)
+        self.assertEqual(unchanged(self.viewer), unchanged(self.original[vvfile.VVSECTION]))
+        self.assertEqual(self.sections['ovirt'], self.original['ovirt'])
+
+    def test_rewrite_twice(self):
+        # Overriding a value that is already set must not break, i.e. fullscreen=1 sent by oVirt
+        self.assertEqual(vvfile.parse_vv(vvfile.rewrite_vv(self.rewritten, OVERRIDES)), self.sections)
+
+    def test_repeated_key_written_once(self):
+        viewer = vvfile.parse_vv(vvfile.rewrite_vv(b'[virt-viewer]\ntype=spice\nhost=h\nfullscreen=0\nfullscreen=0\n', {'fullscreen': '1'}))[vvfile.VVSECTION]
+        self.assertEqual(viewer, {'type': 'spice', 'host': 'h', 'fullscreen': '1'})
+
+    def test_required_settings(self):
+        with self.assertRaises(vvfile.VvError):
+            vvfile.rewrite_vv(b'[virt-viewer]\ntype=spice\n', OVERRIDES)
+
+class ParseVvTest(unittest.TestCase):
+    """
+        Parsing and building console files
+    """
+
+    def test_round_trip(self):
+        original = vvfile.parse_vv(VV)
+        self.assertEqual(vvfile.parse_vv(vvfile.serialize_vv(original)), original)
+
+    def test_comments_and_blank_lines(self):
+        self.assertEqual(vvfile.parse_vv(b'# comment\n\n[virt-viewer]\n; comment\ntype=spice\n'), {vvfile.VVSECTION: {'type': 'spice'}})
+
+    def test_malformed(self):
+        for data in (b'[virt-viewer\ntype=spice\n', b'type=spice\n', b'[virt-viewer]\ntype\n'):
+            with self.assertRaises(vvfile.VvError):
+                vvfile.parse_vv(data)
+
+if __name__ == '__main__':
+    unittest.main()
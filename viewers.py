@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+# The remote-viewer processes are run as QProcess children of the GUI thread. Their exit
+# is notified by the Qt event loop, so no thread is needed to wait for them, and all the
+# bookkeeping of the open viewers happens in the GUI thread. The console file of each
+# viewer is kept in memory and released when the viewer exits. Viewers are left running
+# when the client quits, unless they're closed on purpose (app->close_viewers).
+
+import os
+from time import monotonic
+from tempfile import mkstemp
+from collections import deque
+from globalconf import VIEWERHISTORY, VIEWERCLOSETIMEOUT, VIEWERFILEGRACE
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+class ViewerFile:
+    """
+        A console (.vv) file handed to a viewer. It's stored in an anonymous in-memory file
+        (memfd) that the viewer inherits and opens through /proc/self/fd, so nothing is
+        written to disk. Where memfd is not available, a temporary file only readable by
+        the user is used instead. Either way, it's gone once close is called.
+    """
+
+    def __init__(self, contents):
+        self.fd = None                              # memfd descriptor, None if a temporary file is used
+        self.tmppath = None                         # Temporary file, None if a memfd is used
+
+        if hasattr(os, 'memfd_create'):
+            try:
+                self.fd = os.memfd_create('viewer.vv')
+            except OSError:
+                self.fd = None
+
+        if self.fd is not None:
+            view = memoryview(contents)
+            while view:
+                view = view[os.write(self.fd, view):]
+            self.path = '/proc/self/fd/%d' % (self.fd)
+        else:
+            fd, self.tmppath = mkstemp(prefix='viewer-', suffix='.vv')
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(contents)
+            self.path = self.tmppath
+
+    def set_inheritable(self, inheritable):
+        """
+            Description: Lets the next started process inherit the memfd, so /proc/self/fd refers to it
+                         in that process too. It must be unset right after the process is started, so
+                         other processes don't get it.
+            Arguments: Whether the memfd is inherited
+            Returns: Nothing
+        """
+
+        if self.fd is not None:
+            os.set_inheritable(self.fd, inheritable)
+
+    def close(self):
+        """
+            Description: Releases the memfd, or removes the temporary file.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if self.tmppath is not None:
+            try:
+                os.remove(self.tmppath)
+            except OSError:
+                pass
+            self.tmppath = None
+
+class ViewerProcess(QProcess):
+    """
+        A remote-viewer process. Unlike a plain QProcess, it can be left running when the
+        client quits.
+    """
+
+    def detach(self):
+        """
+            Description: Stops supervising the process. Qt kills the processes that are still
+                         running when their QProcess is destroyed, this one is considered not
+                         running anymore so it's spared.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.setProcessState(QProcess.NotRunning)
+
+class ViewerSession:
+    """
+        One remote-viewer process opened for a VM
+    """
+
+    def __init__(self, key, vmname, process, vvfile):
+        self.key = key                              # Board key of the VM
+        self.vmname = vmname
+        self.process = process                      # ViewerProcess running remote-viewer
+        self.vvfile = vvfile                        # ViewerFile the viewer was started with
+        self.started = monotonic()                  # When the process was started
+        self.running = None                         # When the process was found running, None until then
+        self.finished = None                        # When the process exited, None while it runs
+        self.exitcode = None                        # Exit code, None while it runs or if it crashed or failed to start
+        self.error = None                           # QProcess error description if it crashed or failed to start
+        self.closing = False                        # Whether the client asked the viewer to close
+
+    @property
+    def lifetime(self):
+        """ Seconds the viewer has been (or was) open. """
+        return (self.finished if self.finished is not None else monotonic()) - self.started
+
+class ViewerSupervisor(QObject):
+    """
+        This class tracks every viewer opened by the client. A VM is reserved when the user
+        clicks on 'connect', before its console file has been fetched, so it can't be opened
+        twice. Finished sessions are kept for a while, so their lifetime can be reviewed.
+    """
+
+    exited = pyqtSignal(object)                     # Emitted with the ViewerSession when a viewer exits
+    launched = pyqtSignal(object)                   # Emitted with the ViewerSession when a viewer process is running
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+        self.sessions = {}                          # Board key -> running ViewerSession
+        self.reserved = set()                       # Board keys whose viewer is being prepared
+        self.history = deque(maxlen=VIEWERHISTORY)  # Finished ViewerSessions, the most recent last
+        self.detached = []                          # Detached ViewerSessions whose console file is still kept
+
+    def __contains__(self, key):
+        return key in self.sessions or key in self.reserved
+
+    def __len__(self):
+        return len(self.sessions) + len(self.reserved)
+
+    def reserve(self, key):
+        """
+            Description: Marks a VM as having a viewer, while its console file is being fetched.
+            Arguments: The board key of the VM
+            Returns: False if the VM already has a viewer, True otherwise
+        """
+
+        if key in self:
+            return False
+        self.reserved.add(key)
+        return True
+
+    def release(self, key):
+        """
+            Description: Cancels a reservation, i.e. because the console file could not be fetched.
+            Arguments: The board key of the VM
+            Returns: Nothing
+        """
+
+        self.reserved.discard(key)
+
+    def start(self, key, vmname, program, arguments, vvfile):
+        """
+            Description: Runs a viewer. Its output is forwarded to the client's, so it's not buffered
+                         in memory for as long as the viewer runs. The console file is released when
+                         the viewer exits.
+            Arguments: 1. key: The board key of the VM
+                       2. vmname: The VM name
+                       3. program: The remote-viewer binary
+                       4. arguments: List of arguments
+                       5. vvfile: The ViewerFile referenced by the arguments
+            Returns: The ViewerSession
+        """
+
+        self.reserved.discard(key)
+
+        process = ViewerProcess(self)
+        process.setProcessChannelMode(QProcess.ForwardedChannels)
+        session = ViewerSession(key, vmname, process, vvfile)
+        self.sessions[key] = session
+
+        process.started.connect(lambda: self.process_started(session))
+        process.finished.connect(lambda exitcode, exitstatus: self.process_finished(session, exitcode, exitstatus))
+        process.errorOccurred.connect(lambda error: self.process_error(session, error))
+
+        # The process is forked within start, so only this viewer inherits the file
+        vvfile.set_inheritable(True)
+        try:
+            process.start(program, arguments)
+        finally:
+            vvfile.set_inheritable(False)
+        return session
+
+    def process_started(self, session):
+        """
+            Description: Invoked by Qt once a viewer process is running, i.e. remote-viewer has
+                         been executed.
+            Arguments: The ViewerSession
+            Returns: Nothing
+        """
+
+        session.running = monotonic()
+        self.launched.emit(session)
+
+    def process_finished(self, session, exitcode, exitstatus):
+        """
+            Description: Invoked by Qt when a viewer exits.
+            Arguments: 1. session: The ViewerSession
+                       2. exitcode: The exit code of the process
+                       3. exitstatus: QProcess.NormalExit or QProcess.CrashExit
+            Returns: Nothing
+        """
+
+        if exitstatus == QProcess.NormalExit:
+            session.exitcode = exitcode
+        elif not session.closing:
+            session.error = session.process.errorString()
+        self.session_over(session)
+
+    def process_error(self, session, error):
+        """
+            Description: Invoked by Qt when a viewer fails. Only the failure to start is handled
+                         here, other errors are followed by the finished signal.
+            Arguments: 1. session: The ViewerSession
+                       2. error: The QProcess.ProcessError
+            Returns: Nothing
+        """
+
+        if error == QProcess.FailedToStart:
+            session.error = session.process.errorString()
+            self.session_over(session)
+
+    def session_over(self, session):
+        """
+            Description: Moves a finished session to the history and notifies it.
+            Arguments: The ViewerSession
+            Returns: Nothing
+        """
+
+        if session.finished is not None:
+            return
+        session.finished = monotonic()
+        if self.sessions.get(session.key) is session:
+            del self.sessions[session.key]
+        self.history.append(session)
+        session.vvfile.close()
+        session.process.deleteLater()
+        self.exited.emit(session)
+
+    def detach_all(self):
+        """
+            Description: Stops supervising every running viewer, so they keep running after the
+                         client quits or the user logs out. Their QProcess objects are released.
+                         A viewer may not have read its console file yet if it was just started,
+                         so each file is kept until VIEWERFILEGRACE seconds after its viewer was
+                         started. If the client quits before, the viewer still holds the memfd it
+                         inherited, but a temporary file is left behind.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        for session in list(self.sessions.values()):
+            session.process.finished.disconnect()
+            session.process.errorOccurred.disconnect()
+            session.process.started.disconnect()
+            session.process.detach()
+            session.process.deleteLater()
+
+            remaining = VIEWERFILEGRACE - (monotonic() - session.started)
+            if remaining > 0:
+                self.detached.append(session)
+                QTimer.singleShot(int(remaining * 1000), lambda session=session: self.release_file(session))
+            else:
+                session.vvfile.close()
+        self.sessions = {}
+
+    def release_file(self, session):
+        """
+            Description: Releases the console file of a detached viewer once it has had time to
+                         read it.
+            Arguments: The ViewerSession
+            Returns: Nothing
+        """
+
+        if session in self.detached:
+            self.detached.remove(session)
+            session.vvfile.close()
+
+    def close_all(self):
+        """
+            Description: Asks every running viewer to close, and kills those still running after
+                         VIEWERCLOSETIMEOUT milliseconds. Used when the client quits, so no console
+                         is left open for the next user.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        sessions = list(self.sessions.values())
+        for session in sessions:
+            session.closing = True
+            session.process.terminate()
+        for session in sessions:
+            if not session.process.waitForFinished(VIEWERCLOSETIMEOUT):
+                session.process.kill()
+                session.process.waitForFinished(VIEWERCLOSETIMEOUT)
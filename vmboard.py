@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+from bisect import bisect_left
+from globalconf import conf, CELLCOLOR, SELECTEDCELLCOLOR, CELLPADDING, TEXTCOLOR, ROWHEIGHT, STALEOPACITY
+from pixmapcache import get_pixmap
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QSize
+
+# Board columns. VmPools use the status column to show the 'grab' button and leave the
+# connect column empty.
+COLOS, COLNAME, COLSTATUS, COLCONNECT = range(4)
+
+class VmTableModel(QAbstractTableModel):
+    """
+        This class exposes the VmData records shown on the board to a QTableView. Rows are
+        kept in board order (VmPools first, then VMs, both sorted by name) and can be
+        reconciled with a new list, so only inserted, removed or changed rows are signaled.
+        The sort keys of the rows are kept in a parallel list, so the row of a VM is found,
+        and new VMs are inserted at their place, with a binary search instead of re-sorting.
+        While the rows come from the on-disk snapshot and not from oVirt, the model is stale
+        and its rows are disabled.
+    """
+
+    def __init__(self, client):
+        QAbstractTableModel.__init__(self, client)
+        self.client = client                        # OvirtClient, used for tooltips and opened viewers
+        self.vms = []                               # VmData objects in board order
+        self.sortkeys = []                          # Sort key of each row, in the same order
+        self.bykey = {}                             # Board key (engine, VM id) -> VmData
+        self.stale = False                          # Whether the rows come from the last known snapshot
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.vms)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 4
+
+    def flags(self, index):
+        # Stale rows are shown but can't be clicked or selected until oVirt confirms them
+        if self.stale:
+            return Qt.NoItemFlags
+        return QAbstractTableModel.flags(self, index)
+
+    def row_of(self, key):
+        """
+            Description: Finds the board row of a VM.
+            Arguments: The board key of the VM
+            Returns: The row number, or None if the VM is not on the board
+        """
+
+        vmd = self.bykey.get(key)
+        if vmd is None:
+            return None
+        return bisect_left(self.sortkeys, vmd.sortkey)
+
+    def insert_vm(self, vmd):
+        """
+            Description: Inserts a new row at its sorted position.
+            Arguments: The VmData of the row, with its sort key set
+            Returns: Nothing
+        """
+
+        if vmd.key in self.bykey:
+            return
+        row = bisect_left(self.sortkeys, vmd.sortkey)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.vms.insert(row, vmd)
+        self.sortkeys.insert(row, vmd.sortkey)
+        self.bykey[vmd.key] = vmd
+        self.endInsertRows()
+
+    def remove_vm(self, key):
+        """
+            Description: Removes the row of a VM, if it's on the board.
+            Arguments: The board key of the VM
+            Returns: Nothing
+        """
+
+        row = self.row_of(key)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.vms[row]
+        del self.sortkeys[row]
+        del self.bykey[key]
+        self.endRemoveRows()
+
+    def icon_for(self, vmd, column):
+        """
+            Description: Depending on the column and the kind of row, returns which icon
+                         and tooltip should be shown.
+            Arguments: 1. vmd: The VmData of the row
+                       2. column: The column number
+            Returns: A tuple (iconname, tooltip), or None if the cell has no icon.
+        """
+
+        if column == COLOS:
+            if vmd.vmtype == 'vmpool':
+                return vmd.vmos, '<b>' + _('vmpool') + '</b>'
+            return vmd.vmos, '<b>%s</b> OS' % (vmd.vmos.capitalize())
+
+        if vmd.vmtype == 'vmpool':
+            if column == COLSTATUS:
+                return 'grab', _('grab_vm_vmpool')
+            return None
+
+        if column == COLSTATUS:
+            return vmd.vmstatus, self.client.toggle_action_text(vmd.vmstatus)
+        if column == COLCONNECT:
+            if vmd.key in self.client.viewers:
+                return 'viewer', _('viewer_already_opened')
+            return 'connect', _('connect')
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        vmd = self.vms[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == COLNAME:
+                if len(conf.ENGINES) > 1:
+                    # Several engines may have VMs with the same name
+                    return '%s\n(%s)' % (vmd.vmname, vmd.vmengine)
+                return vmd.vmname
+        elif role == Qt.DecorationRole:
+            icon = self.icon_for(vmd, column)
+            if icon:
+                return get_pixmap(icon[0])
+        elif role == Qt.ToolTipRole:
+            icon = self.icon_for(vmd, column)
+            if icon:
+                return '<span style="color:#B9B900">%s</span>' % (icon[1])
+        elif role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def changed(self, old, new):
+        """
+            Description: Checks whether a row needs to be repainted.
+            Arguments: The old and the new VmData of the row
+            Returns: True if any rendered attribute differs
+        """
+
+        return old.vmname != new.vmname or old.vmstatus != new.vmstatus or old.vmos != new.vmos or old.vmtype != new.vmtype
+
+    def reconcile(self, vmdatalist):
+        """
+            Description: Replaces the board content with a new list of VmData, signaling only
+                         the rows that were removed, inserted or changed.
+            Arguments: The new list of VmData, in board order.
+            Returns: Nothing
+        """
+
+        newids = [vmd.key for vmd in vmdatalist]
+        newset = set(newids)
+
+        if not self.vms:
+            # Nothing to reconcile with, a reset is much cheaper than inserting rows
+            self.beginResetModel()
+            self.vms = list(vmdatalist)
+            self.endResetModel()
+            self.update_index()
+            return
+
+        # Removed VMs, bottom-up so row numbers stay valid
+        for row in reversed(range(len(self.vms))):
+            if self.vms[row].key not in newset:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.vms[row]
+                self.endRemoveRows()
+
+        # The remaining rows must keep their relative order. That's not the case if a
+        # VM has been renamed, and then we just reset the model.
+        oldset = set(vmd.key for vmd in self.vms)
+        if [key for key in newids if key in oldset] != [vmd.key for vmd in self.vms]:
+            self.beginResetModel()
+            self.vms = list(vmdatalist)
+            self.endResetModel()
+            self.update_index()
+            return
+
+        # New VMs, consecutive ones are inserted at once
+        row = 0
+        while row < len(vmdatalist):
+            if row < len(self.vms) and self.vms[row].key == newids[row]:
+                row += 1
+                continue
+            last = row
+            while last + 1 < len(vmdatalist) and newids[last + 1] not in oldset:
+                last += 1
+            self.beginInsertRows(QModelIndex(), row, last)
+            self.vms[row:row] = vmdatalist[row:last + 1]
+            self.endInsertRows()
+            row = last + 1
+
+        # Existing VMs, only repainted if something has changed
+        for row, vmd in enumerate(vmdatalist):
+            old = self.vms[row]
+            self.vms[row] = vmd
+            if self.changed(old, vmd):
+                self.dataChanged.emit(self.index(row, 0), self.index(row, 3))
+
+        self.update_index()
+
+    def set_stale(self, stale):
+        """
+            Description: Marks the rows as stale (last known snapshot) or current (fetched from oVirt).
+                         All rows are repainted if this changes.
+            Arguments: True if the rows are stale
+            Returns: Nothing
+        """
+
+        if stale == self.stale:
+            return
+        self.stale = stale
+        if self.vms:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.vms) - 1, 3))
+
+    def clear(self):
+        """
+            Description: Removes every row at once, i.e. when the user logs out.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.beginResetModel()
+        self.vms = []
+        self.stale = False
+        self.endResetModel()
+        self.update_index()
+
+    def update_index(self):
+        """
+            Description: Rebuilds the sort keys and the board key -> VmData map after the rows have
+                         been replaced.
+            Arguments: None
+            Returns: Nothing
+        """
+
+        self.sortkeys = [vmd.sortkey for vmd in self.vms]
+        self.bykey = dict((vmd.key, vmd) for vmd in self.vms)
+
+    def refresh_vm(self, key):
+        """
+            Description: Signals that a VM row must be repainted, i.e. because its status has
+                         changed or a viewer has been opened or closed for it.
+            Arguments: The board key of the VM
+            Returns: Nothing
+        """
+
+        row = self.row_of(key)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, 3))
+
+class VmItemDelegate(QStyledItemDelegate):
+    """
+        Paints the board cells: a dark padded box with either the VM name or the
+        icon of the cell centered in it. Only visible cells are ever painted.
+        Stale rows are dimmed, selected rows are highlighted.
+    """
+
+    def paint(self, painter, option, index):
+        painter.save()
+
+        if index.model().stale:
+            painter.setOpacity(STALEOPACITY)
+
+        rect = option.rect.adjusted(0, CELLPADDING, 0, -CELLPADDING)
+        painter.fillRect(rect, QColor(SELECTEDCELLCOLOR if option.state & QStyle.State_Selected else CELLCOLOR))
+
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            size = pixmap.size()
+            if size.width() > rect.width() or size.height() > rect.height():
+                size = size.scaled(rect.size(), Qt.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(rect.center())
+            painter.drawPixmap(target, pixmap)
+
+        text = index.data(Qt.DisplayRole)
+        if text:
+            painter.setPen(QColor(TEXTCOLOR))
+            painter.drawText(rect, Qt.AlignCenter | Qt.TextWordWrap, text)
+
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROWHEIGHT)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+# VM and VmPool listings. The board only needs the id, name, status and OS type of each
+# VM, so instead of building full SDK objects (disks, NICs, display, custom properties...)
+# the raw XML answer is parsed incrementally and only those fields are kept. The SDK
+# path is kept as a fallback, see the app->vm_listing setting.
+
+from io import BytesIO
+from http.client import HTTPException
+from urllib.parse import urlencode
+import xml.etree.ElementTree as ET
+from globalconf import conf
+from restsession import RestError
+from ovirtsdk4 import Error
+
+class VmRecord:
+    """
+        The fields of a VM or a VmPool the client uses. VmPools have no status nor OS type.
+    """
+
+    __slots__ = ('id', 'name', 'status', 'ostype')
+
+    def __init__(self, id, name, status=None, ostype=None):
+        self.id = id
+        self.name = name
+        self.status = status
+        self.ostype = ostype
+
+def lean_parse(body, tag):
+    """
+        Description: Parses a raw oVirt collection, keeping only the fields the client uses.
+                     Each element is discarded as soon as it has been read, so the whole
+                     document is never held in memory.
+        Arguments: 1. body: The raw XML answer (bytes)
+                   2. tag: The tag of the collection items ('vm' or 'vm_pool')
+        Returns: A list of VmRecord. ovirtsdk4.Error is raised if the answer is not valid XML,
+                 i.e. if it was truncated, as the SDK would raise.
+    """
+
+    try:
+        return lean_records(body, tag)
+    except ET.ParseError as e:
+        raise Error('Malformed %s list: %s' % (tag, e))
+
+def lean_records(body, tag):
+    """
+        Description: Reads the items of a raw oVirt collection, see lean_parse.
+        Arguments: 1. body: The raw XML answer (bytes)
+                   2. tag: The tag of the collection items ('vm' or 'vm_pool')
+        Returns: A list of VmRecord. xml.etree.ElementTree.ParseError is raised if the answer is
+                 not valid XML.
+    """
+
+    records = []
+    path = []
+    root = None
+    record = None
+    for event, elem in ET.iterparse(BytesIO(body), events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            path.append(elem.tag)
+            if len(path) == 2 and elem.tag == tag:
+                record = VmRecord(elem.get('id'), None)
+            continue
+
+        depth = len(path)
+        if record is not None:
+            if depth == 2:
+                records.append(record)
+                record = None
+                root.clear()
+            elif depth == 3 and elem.tag == 'name':
+                record.name = elem.text
+            elif depth == 3 and elem.tag == 'status':
+                record.status = elem.text
+            elif depth == 4 and elem.tag == 'type' and path[2] == 'os':
+                record.ostype = elem.text
+        path.pop()
+
+    return records
+
+def lean_get(engine, path, query=None):
+    """
+        Description: Sends a raw GET request to oVirt. Connection and HTTP errors are converted
+                     to ovirtsdk4.Error, as the SDK would raise.
+        Arguments: 1. engine: The Engine to send the request to
+                   2. path: The path relative to the API URL
+                   3. query: Dict of query parameters
+        Returns: The response body (bytes)
+    """
+
+    if query:
+        path += '?' + urlencode(query)
+    try:
+        return engine.restsession.get(path, {'Accept': 'application/xml', 'All-Content': 'false'})
+    except RestError as e:
+        raise Error('%s: %s' % (path, e.reason), code=e.code)
+    except (HTTPException, OSError) as e:
+        raise Error('%s: %s' % (path, e))
+
+def sdk_vm_record(vm):
+    """
+        Description: Converts an SDK VM object into a VmRecord.
+        Arguments: The oVirt VM object
+        Returns: The VmRecord
+    """
+
+    return VmRecord(vm.id, vm.name, vm.status.value if vm.status else None, vm.os.type if vm.os else None)
+
+def list_vms(engine, search=None):
+    """
+        Description: Lists the VMs the user has permissions on.
+        Arguments: 1. engine: The Engine to list the VMs of
+                   2. search: Optional oVirt search query (i.e, 'id=xxx or id=yyy')
+        Returns: A list of VmRecord. ovirtsdk4.Error is raised on connection problems.
+    """
+
+    global conf
+
+    if conf.CONFIG['vm_listing'] == 'sdk':
+        vms_service = engine.ovirtconn.vms_service()
+        with engine.stats.measure():
+            return [sdk_vm_record(vm) for vm in vms_service.list(search=search, all_content=False)]
+
+    return lean_parse(lean_get(engine, '/vms', {'search': search} if search else None), 'vm')
+
+def list_vmpools(engine):
+    """
+        Description: Lists the VmPools the user has permissions on.
+        Arguments: The Engine to list the VmPools of
+        Returns: A list of VmRecord. ovirtsdk4.Error is raised on connection problems.
+    """
+
+    global conf
+
+    if conf.CONFIG['vm_listing'] == 'sdk':
+        vmpools_service = engine.ovirtconn.vm_pools_service()
+        with engine.stats.measure():
+            return [VmRecord(vmpool.id, vmpool.name) for vmpool in vmpools_service.list()]
+
+    return lean_parse(lean_get(engine, '/vmpools'), 'vm_pool')
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file may be used under the terms of the GNU General Public License
+# version 3.0 as published by the Free Software Foundation and appearing in
+# the file LICENSE included in the packaging of this file.  Please review the
+# following information to ensure the GNU General Public License version 3.0
+# requirements will be met: http://www.gnu.org/copyleft/gpl.html.
+#
+# If you do not wish to use this file under the terms of the GPL version 3.0
+# then you may purchase a commercial license.  For more information contact
+# info@riverbankcomputing.com.
+#
+# This file is provided AS IS with NO WARRANTY OF ANY KIND, INCLUDING THE
+# WARRANTY OF DESIGN, MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE.
+
+# Console (.vv) files, as returned by oVirt and read by remote-viewer. They're INI files
+# (GKeyFile, actually): the connection settings go in the [virt-viewer] section, followed
+# by an optional [ovirt] section. The settings of the [vv] section of settings.conf are
+# applied to the [virt-viewer] section in a single pass over the lines of the file, so
+# the viewer behaves the same on every site regardless of the engine defaults.
+
+VVSECTION = 'virt-viewer'
+
+# [virt-viewer] keys that can be overridden from settings.conf
+VVOVERRIDES = ('fullscreen', 'enable-usbredir', 'enable-usb-autoshare', 'usb-filter', 'enable-smartcard',
+               'secure-channels', 'disable-channels', 'proxy', 'delete-this-file', 'monitors',
+               'color-depth', 'disable-effects', 'release-cursor', 'toggle-fullscreen', 'secure-attention')
+
+# [virt-viewer] keys without which no connection can be opened
+VVREQUIRED = ('type', 'host')
+
+class VvError(ValueError):
+    """
+        Raised when a console file is malformed or lacks required settings
+    """
+
+def iter_vv(text):
+    """
+        Description: Reads a console file line by line.
+        Arguments: The file contents (str)
+        Returns: A generator of (section, key, value, line) tuples, one per line. Section headers
+                 are given with key None, comments and blank lines with section, key and value None.
+                 VvError is raised on malformed lines.
+    """
+
+    section = None
+    for lineno, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped[0] in '#;':
+            yield None, None, None, line
+        elif stripped[0] == '[':
+            if stripped[-1] != ']':
+                raise VvError('line %d: malformed section header' % (lineno))
+            section = stripped[1:-1].strip()
+            yield section, None, None, line
+        else:
+            key, sep, value = line.partition('=')
+            if not sep or section is None:
+                raise VvError('line %d: not a key=value line within a section' % (lineno))
+            yield section, key.strip(), value.strip(), line
+
+def parse_vv(data):
+    """
+        Description: Parses a console file.
+        Arguments: The file contents (bytes)
+        Returns: A dict of section name -> dict of key -> value, both in file order. VvError is
+                 raised if the file is malformed.
+    """
+
+    sections = {}
+    for section, key, value, line in iter_vv(data.decode('utf-8')):
+        if section is None:
+            continue
+        settings = sections.setdefault(section, {})
+        if key is not None:
+            settings[key] = value
+    return sections
+
+def serialize_vv(sections):
+    """
+        Description: Builds a console file.
+        Arguments: A dict of section name -> dict of key -> value, as returned by parse_vv
+        Returns: The file contents (bytes)
+    """
+
+    lines = []
+    for section, settings in sections.items():
+        lines.append('[%s]' % (section))
+        lines.extend('%s=%s' % (key, value) for key, value in settings.items())
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+def rewrite_vv(data, overrides):
+    """
+        Description: Applies overrides to the [virt-viewer] section of a console file in a single
+                     pass. Overridden keys are replaced in place, missing ones are added at the end
+                     of the section, and keys overridden with an empty value are removed. Any other
+                     line is kept as is. The file is validated along the way.
+        Arguments: 1. data: The file contents (bytes)
+                   2. overrides: A dict of key -> value
+        Returns: The rewritten contents (bytes). VvError is raised if the file is malformed or
+                 lacks any of the VVREQUIRED keys.
+    """
+
+    lines = []
+    found = set()
+    pending = None                                  # Overrides not applied yet, while in [virt-viewer]
+
+    for section, key, value, line in iter_vv(data.decode('utf-8')):
+        if key is None and section is not None and pending:
+            # Leaving [virt-viewer], the overrides not found in it are appended
+            lines.extend('%s=%s' % (pkey, pvalue) for pkey, pvalue in pending.items() if pvalue)
+            pending = None
+        if section == VVSECTION:
+            if key is None:
+                if section is not None and pending is None:
+                    pending = dict(overrides)
+            else:
+                found.add(key)
+                if key in overrides:
+                    # Repeated keys are only written once
+                    override = pending.pop(key, None)
+                    if override:
+                        lines.append('%s=%s' % (key, override))
+                    continue
+        lines.append(line)
+
+    if pending:
+        lines.extend('%s=%s' % (pkey, pvalue) for pkey, pvalue in pending.items() if pvalue)
+
+    missing = [key for key in VVREQUIRED if key not in found]
+    if missing:
+        raise VvError('[%s] lacks %s' % (VVSECTION, ', '.join(missing)))
+    return ('\n'.join(lines) + '\n').encode('utf-8')